@@ -0,0 +1,266 @@
+"""
+Alertes sur la fenêtre à venir (tâche planifiée, plusieurs sites).
+
+Trois types d'alerte dans les N semaines à venir :
+
+    conflit              la bande précédente est encore dans la salle à l'entrée
+    vide_court           la salle est vide mais le vide réel (entre la sortie
+                         précédente et l'entrée) est inférieur au vide sanitaire
+    sur_dimensionnement  plusieurs salles vides à une entrée, en régime de croisière
+
+Les alertes sont lues dans le planning en cache (moteur.calculer_planning) à
+travers un index trié par date : une fenêtre se résout par dichotomie. Un état
+persistant (fichier JSON) retient par site la clé des paramètres, la fin de la
+dernière fenêtre vérifiée et les alertes déjà émises : d'un jour à l'autre seuls
+les jours entrés dans la fenêtre sont examinés, et un nouveau passage le même
+jour ne recalcule rien. Les paramètres d'un site changent : toute sa fenêtre est
+revérifiée, sans réémettre les alertes identiques.
+
+L'horizon des paramètres n'intervient pas : le planning lu va jusqu'à la fin de
+l'année qui suit la fenêtre d'au moins un cycle (parametres_fenetre), ce qui
+garde la même clé de cache d'un jour à l'autre.
+
+    python cli.py alertes --site nb_e=5 --etat alertes_etat.json --journal alertes.jsonl
+"""
+import hashlib
+import json
+import os
+import urllib.request
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from moteur import (
+    CYCLE_TRUIE_ATTENDU,
+    TYPES_SALLES,
+    cle_parametres,
+    parametres_depuis_cle,
+    calculer_planning,
+)
+from export import valeur_json
+
+SEMAINES_DEFAUT = 4
+
+TYPES_ALERTES = ('conflit', 'vide_court', 'sur_dimensionnement')
+
+# ============================================================================
+# INDEX DES ALERTES D'UN PLANNING
+# ============================================================================
+
+def _bandes_precedentes(historique):
+    """id_unique d'une occupation -> bande sortie de la salle juste avant elle"""
+    return {suivante['id_unique']: entree['bande'] for entree, suivante in zip(historique, historique[1:])}
+
+@lru_cache(maxsize=64)
+def _index_en_cache(cle):
+    params = parametres_depuis_cle(cle)
+    planning = calculer_planning(params)
+    vide_sanitaire = params['vide_sanitaire']
+    salles = planning['salles_disponibilite']
+
+    precedentes = {}
+    alertes = []
+    for c in planning['conflits']:
+        salle = (c['type_salle'], c['salle'])
+        if salle not in precedentes:
+            precedentes[salle] = _bandes_precedentes(salles[c['type_salle']][c['salle'] - 1]['historique'])
+        vide_reel = vide_sanitaire - c['jours_chevauchement']
+        alerte = {
+            'alerte': 'conflit' if vide_reel < 0 else 'vide_court',
+            'type_salle': c['type_salle'],
+            'date': c['date_entree'],
+            'salle': c['salle'],
+            'bande': c['bande'],
+            'bande_precedente': precedentes[salle].get(c['id'])
+        }
+        if vide_reel < 0:
+            alerte['jours_chevauchement'] = -vide_reel
+        else:
+            alerte['vide_reel'] = vide_reel
+        alertes.append(alerte)
+
+    alertes.extend(
+        {'alerte': 'sur_dimensionnement', 'type_salle': s['type_salle'], 'date': s['date'], 'nb_vides': s['nb_vides']}
+        for s in planning['sur_dim'] if s['en_regime_croisiere']
+    )
+
+    ordre = {type_salle: i for i, type_salle in enumerate(TYPES_SALLES.values())}
+    alertes.sort(key=lambda a: (a['date'], ordre[a['type_salle']]))
+    return [a['date'] for a in alertes], alertes
+
+def index_alertes(params):
+    """
+    Alertes de tout le planning, triées par date (mises en cache comme le planning).
+
+    Returns:
+        tuple (dates, alertes) ; les deux listes sont partagées et ne doivent pas être modifiées
+    """
+    return _index_en_cache(cle_parametres(params))
+
+def parametres_fenetre(params, fin):
+    """
+    Paramètres dont l'horizon couvre toutes les occupations entrées jusqu'à fin.
+
+    L'horizon demandé est remplacé par le 31 décembre de l'année de
+    fin + un cycle de truie (+ jours avant saillie) : l'affectation ne dépend
+    pas des occupations postérieures, et la clé ne change qu'une fois par an.
+    """
+    limite = fin + timedelta(days=CYCLE_TRUIE_ATTENDU + params['jours_avant_saillie'])
+    return dict(params, date_horizon=datetime(limite.year, 12, 31))
+
+def alertes_fenetre(params, debut, fin, debut_inclus=True):
+    """Alertes datées de debut à fin (inclus ; debut exclu si debut_inclus est faux), quel que soit l'horizon"""
+    dates, alertes = index_alertes(parametres_fenetre(params, fin))
+    i = bisect_left(dates, debut) if debut_inclus else bisect_right(dates, debut)
+    return alertes[i:bisect_right(dates, fin)]
+
+def cle_alerte(site, alerte):
+    """Identifiant de déduplication : même site, même type, même salle, même date"""
+    return '|'.join((
+        str(site), alerte['alerte'], alerte['type_salle'], f"{alerte['date']:%Y-%m-%d}",
+        str(alerte.get('salle', '')), str(alerte.get('bande', ''))
+    ))
+
+def empreinte_parametres(params):
+    """Empreinte stable des paramètres, horizon exclu (changement de configuration d'un site)"""
+    conduite = {nom: valeur for nom, valeur in params.items() if nom != 'date_horizon'}
+    return hashlib.sha1(repr(cle_parametres(conduite)).encode()).hexdigest()
+
+# ============================================================================
+# ÉTAT PERSISTANT
+# ============================================================================
+
+def charger_etat(chemin):
+    """État des vérifications précédentes ({} si le fichier n'existe pas encore)"""
+    if chemin is None or not os.path.exists(chemin):
+        return {}
+    with open(chemin, encoding='utf-8') as fichier:
+        return json.load(fichier)
+
+def enregistrer_etat(chemin, etat):
+    """Écrit l'état (remplacement atomique : une tâche interrompue laisse l'état précédent)"""
+    temporaire = f"{chemin}.tmp"
+    with open(temporaire, 'w', encoding='utf-8') as fichier:
+        json.dump(etat, fichier, ensure_ascii=False, indent=1)
+    os.replace(temporaire, chemin)
+
+# ============================================================================
+# DESTINATIONS
+# ============================================================================
+
+class JournalAlertes:
+    """Alertes ajoutées à un fichier JSON Lines, une ligne par alerte"""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self._fichier = open(chemin, 'a', encoding='utf-8')
+
+    def __str__(self):
+        return f"journal {self.chemin}"
+
+    def emettre(self, alerte):
+        self._fichier.write(json.dumps(alerte, default=valeur_json, ensure_ascii=False))
+        self._fichier.write('\n')
+
+    def fermer(self):
+        self._fichier.close()
+
+class WebhookAlertes:
+    """
+    Alertes envoyées en un seul POST JSON ({'alertes': [...]}) à la fermeture ;
+    une erreur d'envoi (OSError) est relevée par verifier_alertes ('echecs').
+    """
+
+    def __init__(self, url, delai=10):
+        self.url = url
+        self.delai = delai
+        self._alertes = []
+
+    def __str__(self):
+        return f"webhook {self.url}"
+
+    def emettre(self, alerte):
+        self._alertes.append(alerte)
+
+    def fermer(self):
+        if not self._alertes:
+            return
+        corps = json.dumps({'alertes': self._alertes}, default=valeur_json, ensure_ascii=False).encode('utf-8')
+        requete = urllib.request.Request(self.url, data=corps, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(requete, timeout=self.delai):
+            pass
+
+# ============================================================================
+# VÉRIFICATION PLANIFIÉE
+# ============================================================================
+
+def verifier_alertes(sites, date, semaines=SEMAINES_DEFAUT, etat=None, puits=()):
+    """
+    Vérifie la fenêtre [date, date + semaines] de chaque site et émet les nouvelles alertes.
+
+    Args:
+        sites: liste de (nom, params)
+        etat: dict chargé par charger_etat, mis à jour en place (None : tout vérifier, sans mémoire)
+        puits: destinations (emettre(alerte), fermer()), chacune fermée en fin de
+            vérification même si une autre a échoué
+
+    Returns:
+        dict avec 'alertes' (nouvelles alertes, chacune avec son 'site'), 'fenetre'
+        ({'debut', 'fin'}), 'sites_verifies' (sites dont au moins un jour a été
+        examiné) et 'echecs' (liste de {'puits', 'erreur'} : destinations dont
+        l'émission ou la fermeture a levé une OSError ; les alertes y sont
+        néanmoins marquées émises dans l'état)
+    """
+    etat = {} if etat is None else etat
+    fin = date + timedelta(weeks=semaines)
+    jour = f"{date:%Y-%m-%d}"
+    nouvelles = []
+    sites_verifies = 0
+
+    for nom, params in sites:
+        empreinte = empreinte_parametres(params)
+        precedent = etat.get(str(nom), {})
+        # Alertes passées oubliées ; celles d'une configuration précédente restent dédupliquées
+        emises = {cle: date_alerte for cle, date_alerte in precedent.get('emises', {}).items() if date_alerte >= jour}
+
+        deja_vu = None
+        if precedent.get('parametres') == empreinte:
+            deja_vu = datetime.strptime(precedent['fin'], '%Y-%m-%d')
+
+        if deja_vu is not None and deja_vu >= fin:
+            candidates = []
+        elif deja_vu is not None and deja_vu >= date:
+            candidates = alertes_fenetre(params, deja_vu, fin, debut_inclus=False)
+            sites_verifies += 1
+        else:
+            candidates = alertes_fenetre(params, date, fin)
+            sites_verifies += 1
+
+        for alerte in candidates:
+            cle = cle_alerte(nom, alerte)
+            if cle not in emises:
+                emises[cle] = f"{alerte['date']:%Y-%m-%d}"
+                nouvelles.append(dict(alerte, site=nom))
+
+        fin_verifiee = fin if deja_vu is None else max(fin, deja_vu)
+        etat[str(nom)] = {'parametres': empreinte, 'fin': f"{fin_verifiee:%Y-%m-%d}", 'emises': emises}
+
+    # Une destination en erreur n'empêche ni l'émission vers les autres ni leur fermeture
+    echecs = []
+    for p in puits:
+        erreur = None
+        try:
+            for alerte in nouvelles:
+                p.emettre(alerte)
+        except OSError as exc:
+            erreur = exc
+        finally:
+            try:
+                p.fermer()
+            except OSError as exc:
+                erreur = erreur or exc
+        if erreur is not None:
+            echecs.append({'puits': str(p), 'erreur': str(erreur)})
+
+    return {'alertes': nouvelles, 'fenetre': {'debut': date, 'fin': fin}, 'sites_verifies': sites_verifies,
+            'echecs': echecs}
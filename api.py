@@ -0,0 +1,287 @@
+"""
+API HTTP/JSON locale : mêmes calculs que l'interface, servis depuis le cache du moteur.
+
+    python cli.py api --port 8600
+
+    GET /dimensionnement?intervalle=21&vide=5
+    GET /etats?intervalle=21&vide=5&date=2026-01-15
+    GET /affectations?intervalle=21&vide=5&debut=2026-01-01&fin=2026-03-31
+    GET /sante
+
+Paramètres de conduite communs (optionnels, mêmes valeurs par défaut que la CLI) :
+date_saillie, jours_avant_saillie, horizon, duree_as ... duree_e, nb_as ... nb_e.
+
+Serveur asyncio mono-processus, sans dépendance externe. Les calculs passent
+par un seul fil de travail ; une requête identique à un calcul en cours attend
+ce calcul au lieu d'en lancer un second (coalescence), et les réponses
+sérialisées sont conservées dans un cache LRU.
+"""
+import asyncio
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+
+from moteur import (
+    DATE_SAILLIE_B1_DEFAUT,
+    INTERVALLES_POSSIBLES,
+    TYPES_SALLES,
+    calculer_dimensionnement,
+    parametres_conduite,
+    cle_parametres,
+    calculer_planning,
+    extraire_etats_salles,
+)
+from export import iterer_affectations, valeur_json
+
+TAILLE_CACHE_REPONSES = 512
+TAILLE_MAX_ENTETES = 100
+
+STATUTS_HTTP = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error'
+}
+
+class ErreurRequete(ValueError):
+    """Paramètre de requête absent ou invalide (réponse 400)"""
+
+# ============================================================================
+# LECTURE DES PARAMÈTRES
+# ============================================================================
+
+def _valeur(requete, nom):
+    valeurs = requete.get(nom)
+    return valeurs[-1] if valeurs else None
+
+def _entier(requete, nom, defaut=None):
+    texte = _valeur(requete, nom)
+    if texte is None:
+        return defaut
+    try:
+        return int(texte)
+    except ValueError:
+        raise ErreurRequete(f"'{nom}' doit être un entier (reçu : {texte})")
+
+def _date(requete, nom, defaut=None):
+    texte = _valeur(requete, nom)
+    if texte is None:
+        return defaut
+    try:
+        return datetime.strptime(texte, '%Y-%m-%d')
+    except ValueError:
+        raise ErreurRequete(f"'{nom}' doit être une date AAAA-MM-JJ (reçu : {texte})")
+
+def _intervalle_et_vide(requete):
+    intervalle_bandes = _entier(requete, 'intervalle', 21)
+    if intervalle_bandes not in INTERVALLES_POSSIBLES:
+        raise ErreurRequete(f"'intervalle' doit valoir {', '.join(map(str, INTERVALLES_POSSIBLES))}")
+    vide_sanitaire = _entier(requete, 'vide', 5)
+    if vide_sanitaire < 0:
+        raise ErreurRequete("'vide' doit être positif")
+    return intervalle_bandes, vide_sanitaire
+
+def parametres_depuis_requete(requete):
+    """Paramètres du moteur à partir de la chaîne de requête (dict de listes, cf. parse_qs)"""
+    intervalle_bandes, vide_sanitaire = _intervalle_et_vide(requete)
+
+    durees = {}
+    nb_salles = {}
+    for code in TYPES_SALLES:
+        duree = _entier(requete, f'duree_{code.lower()}')
+        if duree is not None:
+            durees[code] = duree
+        nb = _entier(requete, f'nb_{code.lower()}')
+        if nb is not None:
+            if nb < 1:
+                raise ErreurRequete(f"'nb_{code.lower()}' doit être au moins 1")
+            nb_salles[code] = nb
+
+    return parametres_conduite(
+        intervalle_bandes, vide_sanitaire,
+        _date(requete, 'date_saillie', DATE_SAILLIE_B1_DEFAUT),
+        jours_avant_saillie=_entier(requete, 'jours_avant_saillie', 5),
+        durees=durees,
+        nb_salles=nb_salles,
+        date_horizon=_date(requete, 'horizon')
+    )
+
+def _encoder(donnees):
+    return json.dumps(donnees, default=valeur_json, ensure_ascii=False).encode('utf-8')
+
+# ============================================================================
+# ROUTES
+# ============================================================================
+# Chaque route retourne (cle_cache, calcul) : calcul() produit le corps JSON encodé.
+
+def route_dimensionnement(requete):
+    intervalle_bandes, vide_sanitaire = _intervalle_et_vide(requete)
+
+    def calcul():
+        nb_bandes, nb_optimal, durees_optimales, vides_reels = calculer_dimensionnement(
+            intervalle_bandes, vide_sanitaire
+        )
+        return _encoder({
+            'intervalle_bandes': intervalle_bandes,
+            'vide_sanitaire': vide_sanitaire,
+            'nb_bandes': nb_bandes,
+            'nb_salles': nb_optimal,
+            'durees': durees_optimales,
+            'vides': vides_reels
+        })
+
+    return ('dimensionnement', intervalle_bandes, vide_sanitaire), calcul
+
+def route_etats(requete):
+    params = parametres_depuis_requete(requete)
+    date = _date(requete, 'date')
+    if date is None:
+        date = datetime.combine(datetime.now().date(), datetime.min.time())
+
+    def calcul():
+        planning = calculer_planning(params)
+        return _encoder({
+            'date': date,
+            'etats': extraire_etats_salles(planning['salles_disponibilite'], date),
+            'nb_conflits': len(planning['conflits']),
+            'nb_sur_dimensionnements': len(planning['sur_dim']),
+            'regime_croisiere': planning['dates_regime']
+        })
+
+    return ('etats', cle_parametres(params), date), calcul
+
+def route_affectations(requete):
+    params = parametres_depuis_requete(requete)
+    date_debut = _date(requete, 'debut')
+    date_fin = _date(requete, 'fin')
+
+    def calcul():
+        planning = calculer_planning(params)
+        return _encoder({
+            'debut': date_debut,
+            'fin': date_fin,
+            'affectations': list(iterer_affectations(planning['salles_disponibilite'], date_debut, date_fin))
+        })
+
+    return ('affectations', cle_parametres(params), date_debut, date_fin), calcul
+
+ROUTES = {
+    '/dimensionnement': route_dimensionnement,
+    '/etats': route_etats,
+    '/affectations': route_affectations
+}
+
+# ============================================================================
+# SERVEUR
+# ============================================================================
+
+class ServeurAPI:
+    """Serveur HTTP/1.1 minimal (GET/HEAD, connexions persistantes) au-dessus d'asyncio"""
+
+    def __init__(self, taille_cache=TAILLE_CACHE_REPONSES):
+        self.taille_cache = taille_cache
+        self._reponses = OrderedDict()   # cle -> corps JSON encodé
+        self._en_cours = {}              # cle -> futur du calcul en cours
+        self._executeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix='calcul')
+
+    def _terminer(self, cle, futur):
+        del self._en_cours[cle]
+        if not futur.cancelled() and futur.exception() is None:
+            self._reponses[cle] = futur.result()
+            if len(self._reponses) > self.taille_cache:
+                self._reponses.popitem(last=False)
+
+    async def obtenir(self, cle, calcul):
+        """Corps de réponse pour cle : depuis le cache, le calcul en cours, ou un nouveau calcul"""
+        corps = self._reponses.get(cle)
+        if corps is not None:
+            self._reponses.move_to_end(cle)
+            return corps
+
+        futur = self._en_cours.get(cle)
+        if futur is None:
+            futur = asyncio.get_running_loop().run_in_executor(self._executeur, calcul)
+            self._en_cours[cle] = futur
+            futur.add_done_callback(lambda f: self._terminer(cle, f))
+
+        # shield : un client qui se déconnecte n'annule pas le calcul des autres
+        return await asyncio.shield(futur)
+
+    async def repondre(self, methode, cible):
+        """Retourne (statut, corps) pour une requête"""
+        if methode not in ('GET', 'HEAD'):
+            return 405, _encoder({'erreur': f"Méthode non supportée : {methode}"})
+
+        url = urlsplit(cible)
+        if url.path == '/sante':
+            return 200, _encoder({'statut': 'ok'})
+
+        route = ROUTES.get(url.path)
+        if route is None:
+            return 404, _encoder({'erreur': f"Route inconnue : {url.path}", 'routes': sorted(ROUTES)})
+
+        try:
+            cle, calcul = route(parse_qs(url.query))
+            return 200, await self.obtenir(cle, calcul)
+        except ErreurRequete as exc:
+            return 400, _encoder({'erreur': str(exc)})
+        except Exception as exc:
+            return 500, _encoder({'erreur': f"{type(exc).__name__} : {exc}"})
+
+    async def traiter_connexion(self, lecteur, ecrivain):
+        try:
+            while True:
+                ligne = await lecteur.readline()
+                if not ligne:
+                    break
+                try:
+                    methode, cible, version = ligne.decode('latin-1').split()
+                except ValueError:
+                    self._ecrire(ecrivain, 400, _encoder({'erreur': "Requête HTTP invalide"}), False)
+                    break
+
+                entetes = {}
+                for _ in range(TAILLE_MAX_ENTETES):
+                    ligne_entete = await lecteur.readline()
+                    if ligne_entete in (b'\r\n', b'\n', b''):
+                        break
+                    nom, _, valeur = ligne_entete.decode('latin-1').partition(':')
+                    entetes[nom.strip().lower()] = valeur.strip()
+
+                # Corps éventuel ignoré (API en lecture seule)
+                longueur = int(entetes.get('content-length', 0) or 0)
+                if longueur:
+                    await lecteur.readexactly(longueur)
+
+                persistante = (version == 'HTTP/1.1' and entetes.get('connection', '').lower() != 'close')
+                statut, corps = await self.repondre(methode, cible)
+                self._ecrire(ecrivain, statut, corps, persistante, avec_corps=(methode != 'HEAD'))
+                await ecrivain.drain()
+
+                if not persistante:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            ecrivain.close()
+
+    def _ecrire(self, ecrivain, statut, corps, persistante, avec_corps=True):
+        entetes = (
+            f"HTTP/1.1 {statut} {STATUTS_HTTP[statut]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(corps)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            f"Connection: {'keep-alive' if persistante else 'close'}\r\n"
+            "\r\n"
+        )
+        ecrivain.write(entetes.encode('latin-1') + (corps if avec_corps else b''))
+
+async def servir(hote='127.0.0.1', port=8600):
+    """Démarre le serveur et traite les requêtes jusqu'à interruption"""
+    serveur_api = ServeurAPI()
+    serveur = await asyncio.start_server(serveur_api.traiter_connexion, hote, port, backlog=1024)
+    async with serveur:
+        await serveur.serve_forever()
@@ -1,7 +1,30 @@
+import io
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
-import plotly.graph_objects as go
+
+# pandas et plotly sont importés à la demande (afficher_tableau, creer_jauge_salle) :
+# la sidebar et le diagnostic s'affichent avant leur chargement.
+from moteur import (
+    DATE_SAILLIE_B1_DEFAUT,
+    INTERVALLES_POSSIBLES,
+    TYPES_SALLES,
+    calculer_dimensionnement,
+    parametres_conduite,
+    salles_config_depuis,
+    cle_parametres,
+    calculer_planning,
+    prechauffer_configurations_standard,
+    extraire_etats_salles,
+    calculer_deficit_capacite,
+)
+from export import (
+    FORMATS_EXPORT, TYPES_MIME, exporter_octets, iterer_affectations,
+    iterer_affectations_glissantes, parametres_export,
+)
+from evenements import lire_evenements, PlanningReconcilie
+from optimiseur import optimiser_configuration
+from scenarios import comparer_scenarios, resume_etats
+from capacite import CAPACITE_DEFAUT, calculer_capacite
 
 # ============================================================================
 # SECTION 1 : PARAMÈTRES CONFIGURABLES
@@ -46,7 +69,7 @@ with st.sidebar:
     # Date de référence
     DATE_SAILLIE_B1 = st.date_input(
         "Date de SAILLIE de la Bande 1",
-        value=datetime(2025, 7, 25),
+        value=DATE_SAILLIE_B1_DEFAUT,
         help="Point de référence temporel pour la simulation"
     )
     
@@ -79,104 +102,11 @@ with st.sidebar:
     
     st.subheader("🤖 Calculs automatiques")
     
-    import math
-    
-    # Calcul du nombre de bandes
-    nb_bandes_calcule = round(147 / INTERVALLE_BANDES)
-    NB_BANDES = nb_bandes_calcule
+    # Calcul du nombre de bandes, des salles, des durées et des vides résultants
+    NB_BANDES, nb_optimal, durees_optimales, vides_reels = calculer_dimensionnement(INTERVALLE_BANDES, VIDE_SANITAIRE)
     
     st.info(f"**Nombre de bandes :** {NB_BANDES} bandes")
     
-    # ========================================================================
-    # CONTRAINTES PHYSIOLOGIQUES
-    # ========================================================================
-    
-    DUREE_AS_FIXE = 35      # Fixe
-    DUREE_PS_FIXE = 35      # Fixe
-    DUREE_M_VISEE = 35      # Cible (flexible 32-35j)
-    
-    # ========================================================================
-    # CALCUL DIRECT : Nb salles + vide résultant
-    # ========================================================================
-    
-    # 1. Attente Saillie (35j fixe)
-    nb_salles_as = math.ceil((DUREE_AS_FIXE + VIDE_SANITAIRE) / INTERVALLE_BANDES)
-    vide_as = (nb_salles_as * INTERVALLE_BANDES) - DUREE_AS_FIXE
-    duree_as_finale = DUREE_AS_FIXE
-    
-    # 2. Post-Sevrage (42j fixe)
-    nb_salles_ps = math.ceil((DUREE_PS_FIXE + VIDE_SANITAIRE) / INTERVALLE_BANDES)
-    vide_ps = (nb_salles_ps * INTERVALLE_BANDES) - DUREE_PS_FIXE
-    duree_ps_finale = DUREE_PS_FIXE
-    
-    # 3. Maternité (vise 35j)
-    nb_salles_m = math.ceil((DUREE_M_VISEE + VIDE_SANITAIRE) / INTERVALLE_BANDES)
-    # On calcule d'abord le vide possible avec ce nombre de salles
-    vide_m_brut = (nb_salles_m * INTERVALLE_BANDES) - DUREE_M_VISEE
-    
-    # 4. Gestante (ajustée pour cycle 147j)
-    # On part d'une estimation puis on ajuste Maternité pour boucler
-    duree_g_estimee = 147 - DUREE_AS_FIXE - DUREE_M_VISEE
-    nb_salles_g = math.ceil((duree_g_estimee + VIDE_SANITAIRE) / INTERVALLE_BANDES)
-    vide_g = (nb_salles_g * INTERVALLE_BANDES) - duree_g_estimee
-    
-    # Ajustement de Maternité pour cycle exact de 147j
-    duree_m_finale = 147 - DUREE_AS_FIXE - duree_g_estimee
-    
-    # Si Maternité sort des limites 32-35j, on ajuste Gestante
-    if duree_m_finale < 32:
-        duree_m_finale = 32
-        duree_g_finale = 147 - DUREE_AS_FIXE - duree_m_finale
-        # Recalculer nb salles Gestante
-        nb_salles_g = math.ceil((duree_g_finale + VIDE_SANITAIRE) / INTERVALLE_BANDES)
-        vide_g = (nb_salles_g * INTERVALLE_BANDES) - duree_g_finale
-        # Re-ajuster Maternité
-        duree_m_finale = 147 - DUREE_AS_FIXE - duree_g_finale
-    elif duree_m_finale > 35:
-        duree_m_finale = 35
-        duree_g_finale = 147 - DUREE_AS_FIXE - duree_m_finale
-        nb_salles_g = math.ceil((duree_g_finale + VIDE_SANITAIRE) / INTERVALLE_BANDES)
-        vide_g = (nb_salles_g * INTERVALLE_BANDES) - duree_g_finale
-        duree_m_finale = 147 - DUREE_AS_FIXE - duree_g_finale
-    else:
-        duree_g_finale = duree_g_estimee
-    
-    vide_m = (nb_salles_m * INTERVALLE_BANDES) - duree_m_finale
-    
-    # 5. Engraissement (max 152 - PS)
-    duree_e_max = 152 - DUREE_PS_FIXE
-    nb_salles_e = math.ceil((duree_e_max + VIDE_SANITAIRE) / INTERVALLE_BANDES)
-    duree_e_finale = min((nb_salles_e * INTERVALLE_BANDES) - VIDE_SANITAIRE, duree_e_max)
-    vide_e = (nb_salles_e * INTERVALLE_BANDES) - duree_e_finale
-    
-    # ========================================================================
-    # STOCKAGE DES RÉSULTATS
-    # ========================================================================
-    
-    nb_optimal = {
-        'AS': nb_salles_as,
-        'G': nb_salles_g,
-        'M': nb_salles_m,
-        'PS': nb_salles_ps,
-        'E': nb_salles_e
-    }
-    
-    durees_optimales = {
-        'AS': duree_as_finale,
-        'G': duree_g_finale,
-        'M': duree_m_finale,
-        'PS': duree_ps_finale,
-        'E': duree_e_finale
-    }
-    
-    vides_reels = {
-        'AS': vide_as,
-        'G': vide_g,
-        'M': vide_m,
-        'PS': vide_ps,
-        'E': vide_e
-    }
-    
     
     
     # Totaux et validations
@@ -219,6 +149,19 @@ with st.sidebar:
         """)
     elif all(3 <= v <= 7 for v in vides_reels.values()):
         st.success("🎯 **Configuration optimale** : Tous les vides sanitaires sont entre 3 et 7 jours !")
+
+    # Recherche conjointe des durées et nombres de salles (optimiseur.py)
+    optimum = optimiser_configuration(INTERVALLE_BANDES, VIDE_SANITAIRE)
+    if optimum is not None and optimum['total_salles'] < total_salles:
+        st.info(f"""
+        🧮 **Optimiseur** : {optimum['total_salles']} salles au lieu de {total_salles}
+        (Maternité {optimum['durees']['M']}j, Gestante {optimum['durees']['G']}j, Engraissement {optimum['durees']['E']}j)
+        """)
+        if st.button("Appliquer la configuration optimisée", use_container_width=True):
+            for code in optimum['durees']:
+                st.session_state[f'duree_{code.lower()}_applique'] = optimum['durees'][code]
+                st.session_state[f'nb_{code.lower()}_applique'] = optimum['nb_salles'][code]
+            st.rerun()
     
     st.markdown("---")
 
@@ -331,10 +274,31 @@ with st.sidebar:
         else:
             delta_produits = circuit_produits - 152
             st.metric("**Produits**", f"{circuit_produits:.0f}j", delta=f"+{delta_produits:.0f}j", delta_color="inverse", help="Circuit produits")
+
+    st.markdown("---")
+    st.subheader("📓 Journal des événements")
+    FICHIER_JOURNAL = st.file_uploader(
+        "Entrées/sorties réelles (CSV ou JSONL)",
+        type=['csv', 'jsonl'],
+        help="Colonnes : date, evenement (entree, sortie, hors_service), type_salle, bande, cycle, salle, date_fin"
+    )
 # Convertir dates en datetime
 DATE_SAILLIE_B1 = datetime.combine(DATE_SAILLIE_B1, datetime.min.time())
 DATE_SIMULATION = datetime.combine(DATE_SIMULATION, datetime.min.time())
-CYCLE_TRUIE_ATTENDU = 147
+
+# Paramètres transmis au moteur de simulation
+PARAMS = parametres_conduite(
+    INTERVALLE_BANDES, VIDE_SANITAIRE, DATE_SAILLIE_B1,
+    jours_avant_saillie=JOURS_AVANT_SAILLIE,
+    durees={
+        'AS': DUREE_ATTENTE_SAILLIE,
+        'G': DUREE_GESTANTE,
+        'M': DUREE_MATERNITE,
+        'PS': DUREE_POST_SEVRAGE,
+        'E': DUREE_ENGRAISSEMENT
+    },
+    nb_salles=nb_salles_reelles
+)
 
 st.title("🐷 Simulateur de Gestion des Salles - Élevage Porcin")
 
@@ -422,294 +386,42 @@ COULEURS_BANDES = [
     '#F8B739', '#52B788', '#E63946', '#06FFA5'
 ]
 
-def calculer_toutes_occupations_truies():
+# ============================================================================
+# SECTION 4 : VISUALISATION
+# ============================================================================
+
+def signature_jauge(etat_salle, num_salle, type_salle, date_simulation):
     """
-    Calcule TOUTES les occupations truies.
-    Point de référence = Date de SAILLIE
-    Cycle = 147 jours à partir de la saillie
+    Tout ce qu'affiche la jauge d'une salle, à la précision affichée (None si pas de jauge).
+    Deux salles ou deux jours de même signature ont exactement la même figure.
     """
-    occupations = []
-    
-    for bande in range(1, NB_BANDES + 1):
-        # Date de saillie de cette bande
-        date_saillie_bande = DATE_SAILLIE_B1 + timedelta(days=(bande - 1) * INTERVALLE_BANDES)
-        
-        # Calculer plusieurs cycles (147j)
-        for cycle in range(50):
-            date_saillie_cycle = date_saillie_bande + timedelta(days=cycle * CYCLE_TRUIE_ATTENDU)
-            
-            if date_saillie_cycle > datetime.now() + timedelta(days=365):
-                break
-            
-            # Attente Saillie (commence AVANT la saillie)
-            date_entree_as = date_saillie_cycle - timedelta(days=JOURS_AVANT_SAILLIE)
-            date_sortie_as = date_entree_as + timedelta(days=DUREE_ATTENTE_SAILLIE)
-            
-            occupations.append({
-                'bande': bande,
-                'cycle': cycle,
-                'type_salle': 'Attente Saillie',
-                'date_entree': date_entree_as,
-                'date_sortie': date_sortie_as,
-                'duree_totale': DUREE_ATTENTE_SAILLIE,
-                'id_unique': f"B{bande}_C{cycle}_AS"
-            })
-            
-            # Gestante (commence après AS)
-            date_entree_g = date_sortie_as
-            date_sortie_g = date_entree_g + timedelta(days=DUREE_GESTANTE)
-            
-            occupations.append({
-                'bande': bande,
-                'cycle': cycle,
-                'type_salle': 'Gestante',
-                'date_entree': date_entree_g,
-                'date_sortie': date_sortie_g,
-                'duree_totale': DUREE_GESTANTE,
-                'id_unique': f"B{bande}_C{cycle}_G"
-            })
-            
-            # Maternité (commence après Gestante = mise bas)
-            date_mise_bas = date_sortie_g
-            date_sevrage = date_mise_bas + timedelta(days=DUREE_MATERNITE)
-            
-            occupations.append({
-                'bande': bande,
-                'cycle': cycle,
-                'type_salle': 'Maternité',
-                'date_entree': date_mise_bas,
-                'date_sortie': date_sevrage,
-                'duree_totale': DUREE_MATERNITE,
-                'date_sevrage': date_sevrage,
-                'id_unique': f"B{bande}_C{cycle}_M"
-            })
-    
-    return occupations
-
-def calculer_toutes_occupations_produits():
-    """Calcule TOUTES les occupations produits"""
-    occupations = []
-    
-    for bande in range(1, NB_BANDES + 1):
-        # Date de saillie de cette bande
-        date_saillie_bande = DATE_SAILLIE_B1 + timedelta(days=(bande - 1) * INTERVALLE_BANDES)
-        # Le cycle commence à l'ENTRÉE en AS, pas à la saillie !
-        date_entree_as_bande = date_saillie_bande - timedelta(days=JOURS_AVANT_SAILLIE)
-        
-        for cycle in range(50):
-            # Cycle commence à l'entrée AS (147j à partir de l'entrée AS)
-            date_debut_cycle = date_entree_as_bande + timedelta(days=cycle * CYCLE_TRUIE_ATTENDU)
-            
-            # Date de sevrage = début du cycle + 147j
-            date_sevrage = date_debut_cycle + timedelta(days=CYCLE_TRUIE_ATTENDU)
-            
-            if date_sevrage > datetime.now() + timedelta(days=365):
-                break
-            
-            # Post-Sevrage (les porcelets entrent le jour du sevrage)
-            occupations.append({
-                'bande': bande,
-                'cycle': cycle,
-                'type_salle': 'Post-Sevrage',
-                'date_entree': date_sevrage,
-                'date_sortie': date_sevrage + timedelta(days=DUREE_POST_SEVRAGE),
-                'duree_totale': DUREE_POST_SEVRAGE,
-                'date_sevrage': date_sevrage,
-                'id_unique': f"B{bande}_S{cycle}_PS"
-            })
-            
-            # Engraissement (entre immédiatement après PS)
-            date_entree_e = date_sevrage + timedelta(days=DUREE_POST_SEVRAGE)
-            occupations.append({
-                'bande': bande,
-                'cycle': cycle,
-                'type_salle': 'Engraissement',
-                'date_entree': date_entree_e,
-                'date_sortie': date_entree_e + timedelta(days=DUREE_ENGRAISSEMENT),
-                'duree_totale': DUREE_ENGRAISSEMENT,
-                'date_sevrage': date_sevrage,
-                'id_unique': f"B{bande}_S{cycle}_E"
-            })
-    
-    return occupations
+    # Date affichée dans la jauge seulement en simulation
+    libelle_date = date_simulation.strftime('%d/%m/%Y') if date_simulation.date() != datetime.now().date() else None
+    statut = etat_salle['statut']
 
-# ============================================================================
-# SECTION 3 : AFFECTATION AVEC VIDE SANITAIRE DE 7 JOURS
-# ============================================================================
+    if statut == 'occupée':
+        return (statut, type_salle, num_salle, libelle_date, etat_salle['bande'],
+                round(etat_salle['progression'], 1), int(etat_salle['jours_dans_salle']), int(etat_salle['duree_totale']))
+    if statut == 'vide_sanitaire':
+        return (statut, type_salle, num_salle, libelle_date, etat_salle['jours_vide_ecoules'],
+                etat_salle['jours_vide_restants'], VIDE_SANITAIRE)
+    if statut == 'disponible':
+        return (statut, type_salle, num_salle, libelle_date, etat_salle['jours_disponible'], etat_salle['prochaine_bande'])
+    return None
 
-def affecter_salles_simple(toutes_occupations):
-    """Affectation simple : chaque bande prend LA salle vide avec respect du vide sanitaire de 7j"""
-    date_actuelle = DATE_SIMULATION
-    
-    salles_config = {
-        'Attente Saillie': NB_SALLES_ATTENTE,
-        'Gestante': NB_SALLES_GESTANTE,
-        'Maternité': NB_SALLES_MATERNITE,
-        'Post-Sevrage': NB_SALLES_PS,
-        'Engraissement': NB_SALLES_ENGRAISSEMENT
-    }
-    
-    toutes_occupations_triees = sorted(toutes_occupations, key=lambda x: x['date_entree'])
-    
-    salles_disponibilite = {}
-    for type_salle, nb_salles in salles_config.items():
-        salles_disponibilite[type_salle] = [
-            {'num_salle': i, 'date_liberation': datetime(2000, 1, 1), 'historique': [], 'premiere_utilisation': None}
-            for i in range(nb_salles)
-        ]
-    
-    conflits = []
-    sur_dimensionnements = []
-    
-    # Tracker quand chaque type de salle atteint le régime de croisière
-    dates_regime_croisiere = {}
-    
-    for occ in toutes_occupations_triees:
-        type_salle = occ['type_salle']
-        date_entree = occ['date_entree']
-        date_sortie = occ['date_sortie']
-        
-        salles = salles_disponibilite[type_salle]
-        # Une salle est vide si date_liberation (sortie + 7j de vide) <= date_entree
-        salles_vides = [s for s in salles if s['date_liberation'] <= date_entree]
-        
-        # Vérifier si toutes les salles de ce type ont déjà été utilisées
-        toutes_salles_utilisees = all(s['premiere_utilisation'] is not None for s in salles)
-        
-        # Si toutes utilisées et pas encore noté la date de régime de croisière
-        if toutes_salles_utilisees and type_salle not in dates_regime_croisiere:
-            dates_regime_croisiere[type_salle] = date_entree
-        
-        if len(salles_vides) == 0:
-            conflits.append({
-                'type_salle': type_salle,
-                'bande': occ['bande'],
-                'date_entree': date_entree,
-                'id': occ['id_unique']
-            })
-            salle_choisie = min(salles, key=lambda s: s['date_liberation'])
-        
-        elif len(salles_vides) > 1:
-            # Enregistrer le surdimensionnement seulement si en régime de croisière
-            sur_dimensionnements.append({
-                'type_salle': type_salle,
-                'nb_vides': len(salles_vides),
-                'date': date_entree,
-                'en_regime_croisiere': toutes_salles_utilisees
-            })
-            # Prendre celle libérée le PLUS TÔT pour rotation équilibrée
-            salle_choisie = min(salles_vides, key=lambda s: s['date_liberation'])
-        
-        else:
-            salle_choisie = salles_vides[0]
-        
-        # Marquer la première utilisation
-        if salle_choisie['premiere_utilisation'] is None:
-            salle_choisie['premiere_utilisation'] = date_entree
-        
-        # IMPORTANT : date_liberation = date_sortie + 7 jours de vide sanitaire
-        salle_choisie['date_liberation'] = date_sortie + timedelta(days=VIDE_SANITAIRE)
-        salle_choisie['historique'].append({
-            'id_unique': occ['id_unique'],
-            'date_entree': date_entree,
-            'date_sortie': date_sortie,
-            'date_liberation': date_sortie + timedelta(days=VIDE_SANITAIRE),
-            'bande': occ['bande'],
-            'duree_totale': occ['duree_totale']
-        })
-    
-    # Filtrer les surdimensionnements pour ne garder que ceux en régime de croisière
-    sur_dim_reel = [s for s in sur_dimensionnements if s['en_regime_croisiere']]
-    
-    etat_salles = {}
-    
-    for type_salle, nb_salles in salles_config.items():
-        etat_salles[type_salle] = []
-        
-        for num_salle in range(nb_salles):
-            salle_info = salles_disponibilite[type_salle][num_salle]
-            historique = salle_info['historique']
-            
-            if not historique:
-                etat_salles[type_salle].append({'statut': 'jamais_utilisee'})
-                continue
-            
-            occupation_actuelle = None
-            for occ_hist in historique:
-                if occ_hist['date_entree'] <= date_actuelle < occ_hist['date_sortie']:
-                    occupation_actuelle = occ_hist
-                    break
-            
-            if occupation_actuelle:
-                jours_dans_salle = (date_actuelle - occupation_actuelle['date_entree']).days
-                
-                etat_salles[type_salle].append({
-                    'statut': 'occupée',
-                    'bande': occupation_actuelle['bande'],
-                    'date_entree': occupation_actuelle['date_entree'],
-                    'date_sortie': occupation_actuelle['date_sortie'],
-                    'jours_dans_salle': jours_dans_salle,
-                    'duree_totale': occupation_actuelle['duree_totale'],
-                    'progression': (jours_dans_salle / occupation_actuelle['duree_totale'] * 100),
-                    'id_unique': occupation_actuelle['id_unique']
-                })
-            else:
-                occupations_passees = [h for h in historique if h['date_sortie'] <= date_actuelle]
-                
-                if occupations_passees:
-                    dernier_occ = max(occupations_passees, key=lambda h: h['date_sortie'])
-                    
-                    # Vérifier si en vide sanitaire ou déjà disponible
-                    date_fin_vide = dernier_occ['date_liberation']
-                    
-                    if date_actuelle < date_fin_vide:
-                        # En cours de vide sanitaire
-                        jours_vide_ecoules = (date_actuelle - dernier_occ['date_sortie']).days
-                        jours_vide_restants = (date_fin_vide - date_actuelle).days
-                        
-                        etat_salles[type_salle].append({
-                            'statut': 'vide_sanitaire',
-                            'date_liberation': dernier_occ['date_sortie'],
-                            'date_disponible': date_fin_vide,
-                            'jours_vide_ecoules': jours_vide_ecoules,
-                            'jours_vide_restants': jours_vide_restants,
-                            'derniere_bande': dernier_occ['bande'],
-                            'prochaine_entree': None,
-                            'prochaine_bande': None
-                        })
-                    else:
-                        # Vide sanitaire terminé, salle disponible
-                        jours_vide_total = (date_actuelle - dernier_occ['date_sortie']).days
-                        
-                        occupations_futures = [h for h in historique if h['date_entree'] > date_actuelle]
-                        prochaine_occ = min(occupations_futures, key=lambda h: h['date_entree']) if occupations_futures else None
-                        
-                        etat_salles[type_salle].append({
-                            'statut': 'disponible',
-                            'date_liberation': dernier_occ['date_sortie'],
-                            'date_disponible': date_fin_vide,
-                            'jours_disponible': (date_actuelle - date_fin_vide).days,
-                            'derniere_bande': dernier_occ['bande'],
-                            'prochaine_entree': prochaine_occ['date_entree'] if prochaine_occ else None,
-                            'prochaine_bande': prochaine_occ['bande'] if prochaine_occ else None
-                        })
-                else:
-                    etat_salles[type_salle].append({'statut': 'jamais_utilisee'})
-    
-    return etat_salles, conflits, sur_dim_reel, dates_regime_croisiere
+@st.cache_resource(max_entries=2000, show_spinner=False)
+def jauge_en_cache(signature):
+    """
+    Figure d'une signature de jauge, construite une seule fois (partagée entre
+    sessions, ne pas modifier). Seule la construction est évitée : st.plotly_chart
+    sérialise et envoie encore chaque jauge à chaque exécution.
+    """
+    import plotly.graph_objects as go
 
-# ============================================================================
-# SECTION 4 : VISUALISATION
-# ============================================================================
+    statut, type_salle, num_salle, libelle_date = signature[:4]
 
-def creer_jauge_salle(etat_salle, num_salle, type_salle, date_simulation):
-    """Crée une jauge pour une salle"""
-    
-    if etat_salle['statut'] == 'occupée':
-        bande = etat_salle['bande']
-        progression = etat_salle['progression']
-        jours = etat_salle['jours_dans_salle']
-        duree = etat_salle['duree_totale']
+    if statut == 'occupée':
+        bande, progression, jours, duree = signature[4:]
         couleur = COULEURS_BANDES[(bande - 1) % len(COULEURS_BANDES)]
         
         fig = go.Figure(go.Indicator(
@@ -718,7 +430,7 @@ def creer_jauge_salle(etat_salle, num_salle, type_salle, date_simulation):
             number={'suffix': "%", 'font': {'size': 36, 'color': couleur}},
             delta={'reference': 100, 'suffix': "%", 'font': {'size': 18}},
             title={
-                'text': f"<b>{type_salle} {num_salle}</b><br><span style='font-size:20px; color:{couleur}'>Bande {bande}</span><br><span style='font-size:16px; color:#666'>Jour {int(jours)}/{int(duree)}</span>",
+                'text': f"<b>{type_salle} {num_salle}</b><br><span style='font-size:20px; color:{couleur}'>Bande {bande}</span><br><span style='font-size:16px; color:#666'>Jour {jours}/{duree}</span>",
                 'font': {'size': 22}
             },
             gauge={
@@ -735,39 +447,20 @@ def creer_jauge_salle(etat_salle, num_salle, type_salle, date_simulation):
                 }
             }
         ))
+        position_date = 0.55
         
-        fig.update_layout(
-            height=320,
-            margin=dict(l=20, r=20, t=90, b=20),
-            paper_bgcolor='white',
-            font={'family': "Arial"}
-        )
-        
-        # Ajouter date DANS la jauge si simulation
-        if date_simulation.date() != datetime.now().date():
-            fig.add_annotation(
-                text=f"{date_simulation.strftime('%d/%m/%Y')}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.55,
-                showarrow=False,
-                font=dict(size=11, color="#666"),
-                bgcolor="white",
-                opacity=0.9
-            )
-        
-    elif etat_salle['statut'] == 'vide_sanitaire':
-        jours_ecoules = etat_salle['jours_vide_ecoules']
-        jours_restants = etat_salle['jours_vide_restants']
+    elif statut == 'vide_sanitaire':
+        jours_ecoules, jours_restants, vide_sanitaire = signature[4:]
         couleur = '#9E9E9E'  
         
-        progression_vide = (jours_ecoules / VIDE_SANITAIRE * 100)
+        progression_vide = (jours_ecoules / vide_sanitaire * 100)
         
         fig = go.Figure(go.Indicator(
             mode="gauge+number",
             value=progression_vide,
             number={'suffix': "%", 'font': {'size': 36, 'color': couleur}},
             title={
-                'text': f"<b>{type_salle} {num_salle}</b><br><span style='font-size:20px; color:{couleur}'>🧹 Vide sanitaire</span><br><span style='font-size:16px; color:#666'>{jours_ecoules}j / {VIDE_SANITAIRE}j (reste {jours_restants}j)</span>",
+                'text': f"<b>{type_salle} {num_salle}</b><br><span style='font-size:20px; color:{couleur}'>🧹 Vide sanitaire</span><br><span style='font-size:16px; color:#666'>{jours_ecoules}j / {vide_sanitaire}j (reste {jours_restants}j)</span>",
                 'font': {'size': 22}
             },
             gauge={
@@ -784,28 +477,10 @@ def creer_jauge_salle(etat_salle, num_salle, type_salle, date_simulation):
                 }
             }
         ))
-        
-        fig.update_layout(
-            height=320,
-            margin=dict(l=20, r=20, t=90, b=20),
-            paper_bgcolor='white',
-            font={'family': "Arial"}
-        )
-        
-        # Ajouter date DANS la jauge si simulation
-        if date_simulation.date() != datetime.now().date():
-            fig.add_annotation(
-                text=f"{date_simulation.strftime('%d/%m/%Y')}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.55,
-                showarrow=False,
-                font=dict(size=11, color="#666"),
-                bgcolor="white",
-                opacity=0.9
-            )
+        position_date = 0.55
     
-    elif etat_salle['statut'] == 'disponible':
-        jours_dispo = etat_salle['jours_disponible']
+    else:
+        jours_dispo, prochaine_bande = signature[4:]
         couleur = '#4CAF50'  # Vert pour disponible
         
         fig = go.Figure(go.Indicator(
@@ -813,35 +488,65 @@ def creer_jauge_salle(etat_salle, num_salle, type_salle, date_simulation):
             value=jours_dispo,
             number={'suffix': "j", 'font': {'size': 36, 'color': couleur}},
             title={
-                'text': f"<b>{type_salle} {num_salle}</b><br><span style='font-size:20px; color:{couleur}'>✅ Disponible</span><br><span style='font-size:16px; color:#999'>Prochaine: B{etat_salle['prochaine_bande'] if etat_salle['prochaine_bande'] else '?'}</span>",
+                'text': f"<b>{type_salle} {num_salle}</b><br><span style='font-size:20px; color:{couleur}'>✅ Disponible</span><br><span style='font-size:16px; color:#999'>Prochaine: B{prochaine_bande if prochaine_bande else '?'}</span>",
                 'font': {'size': 22}
             }
         ))
+        position_date = 0.45
         
-        fig.update_layout(
-            height=320,
-            margin=dict(l=20, r=20, t=90, b=20),
-            paper_bgcolor='white',
-            font={'family': "Arial"}
+    fig.update_layout(
+        height=320,
+        margin=dict(l=20, r=20, t=90, b=20),
+        paper_bgcolor='white',
+        font={'family': "Arial"}
+    )
+    
+    # Ajouter date DANS la jauge si simulation
+    if libelle_date is not None:
+        fig.add_annotation(
+            text=libelle_date,
+            xref="paper", yref="paper",
+            x=0.5, y=position_date,
+            showarrow=False,
+            font=dict(size=11, color="#666"),
+            bgcolor="white",
+            opacity=0.9
         )
-        
-        # Ajouter date DANS la jauge si simulation
-        if date_simulation.date() != datetime.now().date():
-            fig.add_annotation(
-                text=f"{date_simulation.strftime('%d/%m/%Y')}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.45,
-                showarrow=False,
-                font=dict(size=11, color="#666"),
-                bgcolor="white",
-                opacity=0.9
-            )
-        
-    else:
-        return None
     
     return fig
 
+def creer_jauge_salle(etat_salle, num_salle, type_salle, date_simulation):
+    """Jauge d'une salle (figure mise en cache par signature), None si la salle n'en a pas"""
+    signature = signature_jauge(etat_salle, num_salle, type_salle, date_simulation)
+    if signature is None:
+        return None
+    return jauge_en_cache(signature)
+
+def afficher_salle_sans_jauge(etat_salle, num_salle, type_salle):
+    """Message affiché à la place de la jauge (salle hors service ou jamais utilisée)"""
+    if etat_salle['statut'] == 'hors_service':
+        st.warning(f"{type_salle} {num_salle} : 🚧 Hors service jusqu'au {etat_salle['date_sortie'].strftime('%d/%m/%Y')}")
+    else:
+        st.info(f"{type_salle} {num_salle} : Jamais utilisée")
+
+def afficher_tableau(lignes):
+    """Affiche une liste de dicts sous forme de tableau"""
+    import pandas as pd
+    st.dataframe(pd.DataFrame(lignes), use_container_width=True, hide_index=True)
+
+def resultat_sur_demande(nom, cle, libelle, calcul):
+    """
+    Résultat calculé au clic sur le bouton `libelle`, gardé dans la session tant
+    que `cle` (paramètres du calcul) ne change pas ; None avant le premier clic.
+    Les reruns de l'application ne recalculent rien.
+    """
+    if st.button(libelle, key=f"bouton_{nom}", use_container_width=True):
+        st.session_state[nom] = (cle, calcul())
+    memorise = st.session_state.get(nom)
+    if memorise is None or memorise[0] != cle:
+        return None
+    return memorise[1]
+
 def afficher_jauges_par_deux(etats_salles, type_salle, prefix):
     """Affiche les jauges deux par deux"""
     for i in range(0, len(etats_salles), 2):
@@ -853,7 +558,7 @@ def afficher_jauges_par_deux(etats_salles, type_salle, prefix):
             if fig:
                 st.plotly_chart(fig, use_container_width=True, key=f"{prefix}_{i}")
             else:
-                st.info(f"{type_salle} {i+1} : Jamais utilisée")
+                afficher_salle_sans_jauge(etat, i+1, type_salle)
         
         if i + 1 < len(etats_salles):
             with cols[1]:
@@ -862,7 +567,7 @@ def afficher_jauges_par_deux(etats_salles, type_salle, prefix):
                 if fig:
                     st.plotly_chart(fig, use_container_width=True, key=f"{prefix}_{i+1}")
                 else:
-                    st.info(f"{type_salle} {i+2} : Jamais utilisée")
+                    afficher_salle_sans_jauge(etat, i+2, type_salle)
 
 def afficher_jauges_par_trois(etats_salles, type_salle, prefix):
     """Affiche les jauges trois par trois"""
@@ -875,7 +580,7 @@ def afficher_jauges_par_trois(etats_salles, type_salle, prefix):
             if fig:
                 st.plotly_chart(fig, use_container_width=True, key=f"{prefix}_{i}")
             else:
-                st.info(f"{type_salle} {i+1} : Jamais utilisée")
+                afficher_salle_sans_jauge(etat, i+1, type_salle)
 
 # ============================================================================
 # SECTION 5 : INTERFACE PRINCIPALE
@@ -884,19 +589,47 @@ def afficher_jauges_par_trois(etats_salles, type_salle, prefix):
 date_actuelle = DATE_SIMULATION
 st.info(f"📅 **Date actuelle** : {date_actuelle.strftime('%d/%m/%Y %H:%M')}")
 
-with st.spinner("Calcul des occupations..."):
-    toutes_occupations_truies = calculer_toutes_occupations_truies()
-    toutes_occupations_produits = calculer_toutes_occupations_produits()
-    toutes_occupations = toutes_occupations_truies + toutes_occupations_produits
+def lire_journal_importe(params, fichier_journal):
+    """Événements du journal importé (CSV, ou JSON Lines si .jsonl)"""
+    format_journal = 'jsonl' if fichier_journal.name.endswith('.jsonl') else 'csv'
+    return lire_evenements(io.StringIO(fichier_journal.getvalue().decode('utf-8'), newline=''), format_journal, params)
 
-etat_salles, conflits, sur_dim, dates_regime = affecter_salles_simple(toutes_occupations)
+def calculer_planning_reconcilie(params, fichier_journal):
+    """
+    Planning corrigé par le journal importé. Le planning réconcilié est conservé
+    dans la session : à chaque nouvel import, seules les occupations postérieures
+    à la première date modifiée sont réaffectées.
+    """
+    evenements = lire_journal_importe(params, fichier_journal)
+
+    cle = cle_parametres(params)
+    reconcilie = st.session_state.get('planning_reconcilie')
+    if reconcilie is None or st.session_state.get('planning_reconcilie_cle') != cle:
+        reconcilie = PlanningReconcilie(params, evenements)
+        st.session_state['planning_reconcilie'] = reconcilie
+        st.session_state['planning_reconcilie_cle'] = cle
+    else:
+        reconcilie.mettre_a_jour(evenements)
+    return reconcilie.planning()
 
+# Planning mis en cache par le moteur (partagé entre sessions, ne pas modifier)
 with st.spinner("Calcul des occupations..."):
-    toutes_occupations_truies = calculer_toutes_occupations_truies()
-    toutes_occupations_produits = calculer_toutes_occupations_produits()
-    toutes_occupations = toutes_occupations_truies + toutes_occupations_produits
+    planning = None
+    if FICHIER_JOURNAL is not None:
+        try:
+            planning = calculer_planning_reconcilie(PARAMS, FICHIER_JOURNAL)
+        except (UnicodeDecodeError, ValueError) as exc:
+            st.error(f"❌ Journal ignoré : {exc}")
+    journal_applique = planning is not None
+    if planning is None:
+        planning = calculer_planning(PARAMS)
 
-etat_salles, conflits, sur_dim, dates_regime = affecter_salles_simple(toutes_occupations)
+toutes_occupations = planning['occupations']
+salles_disponibilite = planning['salles_disponibilite']
+conflits, sur_dim, dates_regime = planning['conflits'], planning['sur_dim'], planning['dates_regime']
+
+salles_config = salles_config_depuis(PARAMS)
+etat_salles = extraire_etats_salles(salles_disponibilite, date_actuelle)
 
 with st.expander("📊 Diagnostic de la configuration", expanded=True):
     col1, col2, col3 = st.columns(3)
@@ -1010,12 +743,245 @@ with st.expander("📊 Diagnostic de la configuration", expanded=True):
     
     # Afficher les tableaux
     st.markdown("**🐖 Circuit Truies**")
-    df_truies = pd.DataFrame(donnees_truies)
-    st.dataframe(df_truies, use_container_width=True, hide_index=True)
+    afficher_tableau(donnees_truies)
     
     st.markdown("**🐷 Circuit Produits**")
-    df_produits = pd.DataFrame(donnees_produits)
-    st.dataframe(df_produits, use_container_width=True, hide_index=True)
+    afficher_tableau(donnees_produits)
+
+# ============================================================================
+# EXPLICATION DES CONFLITS : chronologie du déficit de capacité
+# ============================================================================
+
+chronologie_deficit = calculer_deficit_capacite(toutes_occupations, salles_config, VIDE_SANITAIRE)
+types_en_deficit = {t: c for t, c in chronologie_deficit.items() if c['deficit_max'] > 0}
+
+with st.expander("🔍 Explication des conflits", expanded=bool(conflits)):
+    if not types_en_deficit:
+        st.success("✅ Aucun déficit de salles sur l'horizon simulé")
+    else:
+        st.caption("Besoin = nombre de bandes présentes ou en vide sanitaire simultanément. "
+                   "Le déficit indique combien de salles manquent et pendant combien de jours.")
+
+        lignes_resume = []
+        for type_salle, chrono in types_en_deficit.items():
+            lignes_resume.append({
+                'Type': type_salle,
+                'Salles': chrono['salles'],
+                'Besoin max': chrono['besoin_max'],
+                'Salles manquantes': chrono['deficit_max'],
+                'Jours en déficit': chrono['jours_deficit'],
+                'Premier déficit': chrono['premier_deficit'].strftime('%d/%m/%Y'),
+                'Suggestion': f"➕ {chrono['deficit_max']} salle(s)"
+            })
+        afficher_tableau(lignes_resume)
+
+        lignes_periodes = []
+        for type_salle, chrono in types_en_deficit.items():
+            for periode in chrono['periodes']:
+                lignes_periodes.append({
+                    'Type': type_salle,
+                    'Du': periode['debut'].strftime('%d/%m/%Y'),
+                    'Au': periode['fin'].strftime('%d/%m/%Y'),
+                    'Besoin': periode['besoin'],
+                    'Manque': periode['deficit'],
+                    'Jours': periode['jours']
+                })
+        st.markdown("**📅 Périodes de déficit**")
+        afficher_tableau(lignes_periodes)
+
+    if conflits:
+        lignes_conflits = [{
+            'Type': c['type_salle'],
+            'Bande': c['bande'],
+            'Entrée': c['date_entree'].strftime('%d/%m/%Y'),
+            'Salle forcée': c['salle'],
+            'Salle libre le': c['date_liberation_salle'].strftime('%d/%m/%Y'),
+            'Chevauchement': f"{c['jours_chevauchement']}j"
+        } for c in conflits]
+        st.markdown("**⚠️ Conflits d'affectation**")
+        afficher_tableau(lignes_conflits)
+
+# ============================================================================
+# EXPORT DU PLANNING
+# ============================================================================
+
+with st.expander("📥 Export du planning", expanded=False):
+    st.caption("Affectation complète (salle, bande, cycle, entrée, sortie, fin du vide) sur la fenêtre choisie")
+
+    col_exp1, col_exp2, col_exp3 = st.columns(3)
+    with col_exp1:
+        format_export = st.selectbox("Format", options=list(FORMATS_EXPORT),
+                                     format_func=lambda f: f.upper(), key="format_export")
+    with col_exp2:
+        debut_export = st.date_input("Du", value=DATE_SAILLIE_B1.date(), key="debut_export")
+    with col_exp3:
+        fin_export = st.date_input("Au", value=PARAMS['date_horizon'].date(), key="fin_export")
+
+    def lignes_export(debut, fin):
+        """Affectations de la fenêtre, quel que soit l'horizon de la simulation"""
+        if not journal_applique:
+            return iterer_affectations_glissantes(PARAMS, debut, fin)
+        if fin <= PARAMS['date_horizon']:
+            return iterer_affectations(salles_disponibilite, debut, fin)
+        # Fenêtre au-delà de l'horizon : planning réconcilié prolongé jusqu'à sa fin
+        params_export = parametres_export(PARAMS, fin)
+        evenements = lire_journal_importe(params_export, FICHIER_JOURNAL)
+        return iterer_affectations(PlanningReconcilie(params_export, evenements).planning()['salles_disponibilite'],
+                                   debut, fin)
+
+    # Fichier construit au clic seulement, pour ce planning (journal compris) et cette fenêtre
+    journal = hash(FICHIER_JOURNAL.getvalue()) if journal_applique else None
+    octets_export = resultat_sur_demande(
+        'export_planning',
+        (cle_parametres(PARAMS), journal, format_export, debut_export, fin_export),
+        "⚙️ Préparer le fichier",
+        lambda: exporter_octets(lignes_export(
+            datetime.combine(debut_export, datetime.min.time()),
+            datetime.combine(fin_export, datetime.min.time())
+        ), format_export)
+    )
+    if octets_export is not None:
+        st.download_button(
+            "📥 Télécharger le planning",
+            data=octets_export,
+            file_name=f"planning_salles_{debut_export:%Y%m%d}_{fin_export:%Y%m%d}.{format_export}",
+            mime=TYPES_MIME[format_export],
+            use_container_width=True
+        )
+
+# ============================================================================
+# COMPARAISON DE SCÉNARIOS
+# ============================================================================
+
+with st.expander("⚖️ Comparaison de scénarios", expanded=False):
+    st.caption("Le scénario A est la configuration actuelle (planning théorique). Les flux d'occupations "
+               "et les affectations communs à plusieurs scénarios ne sont calculés qu'une fois.")
+    nb_variantes = st.number_input("Nombre de scénarios à comparer à A", min_value=1, max_value=4,
+                                   value=1, step=1, key="nb_variantes")
+
+    scenarios_compares = [("A", PARAMS)]
+    for i in range(int(nb_variantes)):
+        lettre = chr(ord('B') + i)
+        st.markdown(f"**Scénario {lettre}**")
+        cols_scenario = st.columns(2 + len(TYPES_SALLES))
+        with cols_scenario[0]:
+            intervalle_scenario = st.selectbox("Intervalle", options=INTERVALLES_POSSIBLES,
+                                               index=INTERVALLES_POSSIBLES.index(INTERVALLE_BANDES),
+                                               key=f"scenario_{lettre}_intervalle")
+        with cols_scenario[1]:
+            vide_scenario = st.number_input("Vide", min_value=3, max_value=7, value=VIDE_SANITAIRE,
+                                            key=f"scenario_{lettre}_vide")
+
+        # Même intervalle et même vide : on part des durées et salles actuelles, sinon du dimensionnement
+        meme_base = (intervalle_scenario, vide_scenario) == (INTERVALLE_BANDES, VIDE_SANITAIRE)
+        _, nb_base, _, _ = calculer_dimensionnement(intervalle_scenario, vide_scenario)
+        nb_scenario = {}
+        for col, (code, nom) in zip(cols_scenario[2:], TYPES_SALLES.items()):
+            with col:
+                nb_scenario[code] = st.number_input(
+                    nom, min_value=1, max_value=40,
+                    value=PARAMS['nb_salles'][code] if meme_base else nb_base[code],
+                    key=f"scenario_{lettre}_nb_{code}_{intervalle_scenario}_{vide_scenario}"
+                )
+
+        scenarios_compares.append((lettre, parametres_conduite(
+            intervalle_scenario, vide_scenario, DATE_SAILLIE_B1,
+            jours_avant_saillie=JOURS_AVANT_SAILLIE,
+            durees=PARAMS['durees'] if meme_base else None,
+            nb_salles=nb_scenario,
+            date_horizon=PARAMS['date_horizon']
+        )))
+
+    resultats_scenarios = resultat_sur_demande(
+        'comparaison_scenarios',
+        (tuple(cle_parametres(params) for _, params in scenarios_compares), date_actuelle),
+        "⚖️ Comparer les scénarios",
+        lambda: comparer_scenarios(scenarios_compares, date_actuelle)
+    )
+    if resultats_scenarios is None:
+        st.caption("Cliquez sur « Comparer les scénarios » pour calculer la comparaison.")
+    else:
+        def avec_ecart(resultat, cle, format_valeur="{}"):
+            valeur = format_valeur.format(resultat['indicateurs'][cle])
+            ecart = resultat['ecarts'][cle]
+            if resultat is resultats_scenarios[0] or not ecart:
+                return valeur
+            return f"{valeur} ({ecart:+})" if isinstance(ecart, int) else f"{valeur} ({ecart:+.0%})"
+
+        st.markdown("**📊 Indicateurs (écart par rapport à A)**")
+        afficher_tableau([{
+            'Scénario': r['nom'],
+            'Intervalle': f"{r['params']['intervalle_bandes']}j",
+            'Vide': f"{r['params']['vide_sanitaire']}j",
+            'Salles': avec_ecart(r, 'total_salles'),
+            'Conflits': avec_ecart(r, 'conflits'),
+            'Jours de chevauchement': avec_ecart(r, 'jours_chevauchement'),
+            'Surdimensionnements': avec_ecart(r, 'sur_dimensionnements'),
+            'Occupation au jour J': avec_ecart(r, 'taux_occupation', "{:.0%}")
+        } for r in resultats_scenarios])
+
+        st.markdown(f"**🏠 États des salles au {date_actuelle.strftime('%d/%m/%Y')}** (occupées / vide sanitaire / disponibles)")
+        resumes = [(r['nom'], resume_etats(r['etats'])) for r in resultats_scenarios]
+        afficher_tableau([
+            {'Type': nom_type, **{
+                nom: f"{resume[nom_type]['occupée']} / {resume[nom_type]['vide_sanitaire']} / {resume[nom_type]['disponible']}"
+                for nom, resume in resumes
+            }}
+            for nom_type in TYPES_SALLES.values()
+        ])
+
+with st.expander("🐷 Capacité en places", expanded=False):
+    st.caption("Effectifs par bande et places par salle : une bande occupe autant de cases qu'il lui en faut, "
+               "éventuellement réparties sur plusieurs salles (une seule bande par salle).")
+    cols_troupeau = st.columns(2)
+    with cols_troupeau[0]:
+        nb_truies = st.number_input("Truies présentes", min_value=1, max_value=20000, value=1000, step=50, key="cap_truies")
+    with cols_troupeau[1]:
+        porcelets_par_truie = st.number_input("Porcelets sevrés par truie", min_value=1, max_value=20, value=12, key="cap_porcelets")
+
+    capacite_salles = {}
+    cols_capacite = st.columns(len(TYPES_SALLES))
+    for col, (code, nom) in zip(cols_capacite, TYPES_SALLES.items()):
+        with col:
+            st.markdown(f"**{nom}**")
+            capacite_salles[code] = {
+                'places_par_case': st.number_input("Places / case", min_value=1, max_value=100,
+                                                   value=CAPACITE_DEFAUT[code]['places_par_case'], key=f"cap_places_{code}"),
+                'cases_par_salle': st.number_input("Cases / salle", min_value=1, max_value=200,
+                                                   value=CAPACITE_DEFAUT[code]['cases_par_salle'], key=f"cap_cases_{code}")
+            }
+
+    resultat_capacite = resultat_sur_demande(
+        'capacite_places',
+        (cle_parametres(PARAMS), int(nb_truies), int(porcelets_par_truie),
+         tuple((code, tuple(sorted(c.items()))) for code, c in capacite_salles.items())),
+        "🐷 Calculer l'affectation en places",
+        lambda: calculer_capacite(PARAMS, int(nb_truies), int(porcelets_par_truie), capacite_salles)
+    )
+    if resultat_capacite is None:
+        st.caption("Cliquez sur « Calculer l'affectation en places » pour simuler les effectifs.")
+    else:
+        afficher_tableau([{
+            'Type': nom,
+            'Effectif / bande': resultat_capacite['effectifs'][code],
+            'Salles': resultat_capacite['indicateurs'][nom]['salles'],
+            'Places': resultat_capacite['indicateurs'][nom]['places'],
+            'Salles / bande': f"{resultat_capacite['indicateurs'][nom]['salles_par_bande']:.1f}",
+            'Remplissage': f"{resultat_capacite['indicateurs'][nom]['taux_remplissage']:.0%}",
+            'Occupation des places': f"{resultat_capacite['indicateurs'][nom]['taux_occupation']:.0%}"
+        } for code, nom in TYPES_SALLES.items()])
+
+        for code, deficit in resultat_capacite['deficits'].items():
+            st.warning(f"⚠️ {TYPES_SALLES[code]} : une bande occupe {deficit['cases_par_bande']} cases, une salle "
+                       f"n'en compte que {deficit['cases_par_salle']} ({deficit['places_manquantes']} places manquantes "
+                       f"par salle) - {deficit['salles_par_bande']} salles par bande")
+
+        if resultat_capacite['conflits']:
+            st.warning(f"⚠️ {len(resultat_capacite['conflits'])} entrées de bande sans assez de places libres "
+                       f"(première : {resultat_capacite['conflits'][0]['type_salle']} le "
+                       f"{resultat_capacite['conflits'][0]['date_entree'].strftime('%d/%m/%Y')})")
+        else:
+            st.success("✅ Toutes les bandes sont logées")
 st.markdown("---")
 
 # Affichage Circuit Truies
@@ -1066,4 +1032,7 @@ with col1:
     for i in range(min(7, NB_BANDES)):
         with cols[i]:
             couleur = COULEURS_BANDES[i % len(COULEURS_BANDES)]
-            st.markdown(f"<div style='background-color:{couleur}; padding:15px; text-align:center; color:white; font-weight:bold; border-radius:10px; margin:4px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);'>Bande {i+1}</div>", unsafe_allow_html=True)
\ No newline at end of file
+            st.markdown(f"<div style='background-color:{couleur}; padding:15px; text-align:center; color:white; font-weight:bold; border-radius:10px; margin:4px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);'>Bande {i+1}</div>", unsafe_allow_html=True)
+
+# Une fois la page affichée : préparer les plannings par défaut des autres intervalles
+prechauffer_configurations_standard(DATE_SAILLIE_B1, VIDE_SANITAIRE)
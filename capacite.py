@@ -0,0 +1,296 @@
+"""
+Modèle de capacité au niveau des animaux : effectifs par bande, places par salle.
+
+Le moteur traite une salle comme occupée ou libre et une bande comme indivisible.
+Ici chaque occupation porte un effectif (truies, ou porcelets/porcs issus de la
+bande) et chaque salle un nombre de cases d'un nombre de places donné. Une bande
+occupe autant de cases qu'il en faut et peut donc être répartie sur plusieurs
+salles ; une salle reste réservée à une seule bande (tout plein / tout vide).
+
+Le choix des salles parmi les salles vides est un problème de recouvrement
+(bin packing) : on prend les plus grandes salles tant que le reste de la bande
+ne tient pas dans une seule, puis la plus petite salle qui contient ce reste
+(meilleur ajustement). Les animaux remplissent les salles choisies une par une.
+"""
+import math
+from bisect import bisect_left, bisect_right, insort
+from datetime import timedelta
+
+from moteur import (
+    TYPES_SALLES,
+    DATE_LIBERATION_INITIALE,
+    calculer_toutes_occupations,
+)
+
+# Places par case et cases par salle, par code de type de salle : une salle
+# loge une bande d'un troupeau de 1000 truies conduit en 7 bandes (21 jours)
+CAPACITE_DEFAUT = {
+    'AS': {'places_par_case': 1, 'cases_par_salle': 150},    # truies bloquées à la saillie
+    'G': {'places_par_case': 10, 'cases_par_salle': 15},     # truies en groupe
+    'M': {'places_par_case': 1, 'cases_par_salle': 150},     # une truie et sa portée par case
+    'PS': {'places_par_case': 25, 'cases_par_salle': 72},
+    'E': {'places_par_case': 12, 'cases_par_salle': 144}
+}
+
+PORCELETS_SEVRES_PAR_TRUIE = 12
+TAUX_PERTES_POST_SEVRAGE = 0.03
+
+TYPES_TRUIES = ('AS', 'G', 'M')
+
+# ============================================================================
+# EFFECTIFS ET SALLES
+# ============================================================================
+
+def effectifs_par_bande(nb_truies, nb_bandes, porcelets_par_truie=PORCELETS_SEVRES_PAR_TRUIE,
+                        taux_pertes_ps=TAUX_PERTES_POST_SEVRAGE):
+    """
+    Effectif d'une bande dans chaque type de salle.
+
+    Returns:
+        dict code -> nombre d'animaux (truies pour AS/G/M, porcelets puis porcs pour PS/E)
+    """
+    truies = math.ceil(nb_truies / nb_bandes)
+    porcelets = truies * porcelets_par_truie
+    return {
+        'AS': truies,
+        'G': truies,
+        'M': truies,
+        'PS': porcelets,
+        'E': math.floor(porcelets * (1 - taux_pertes_ps))
+    }
+
+def _capacite(capacite, code):
+    """Capacité d'un type de salle (complète CAPACITE_DEFAUT) ; ValueError si une valeur est inférieure à 1"""
+    cap = dict(CAPACITE_DEFAUT[code], **(capacite or {}).get(code, {}))
+    for cle in ('places_par_case', 'cases_par_salle'):
+        if cap[cle] < 1:
+            raise ValueError(f"{TYPES_SALLES[code]} : {cle} doit être au moins 1 (reçu : {cap[cle]})")
+    if cap.get('salles') and min(cap['salles']) < 1:
+        raise ValueError(f"{TYPES_SALLES[code]} : chaque salle doit compter au moins une case")
+    return cap
+
+def cases_necessaires(effectif, places_par_case):
+    return math.ceil(effectif / places_par_case)
+
+def salles_physiques(params, capacite=None):
+    """
+    Parc de salles par code : liste du nombre de cases de chaque salle.
+
+    Une liste explicite capacite[code]['salles'] est reprise telle quelle ;
+    sinon, autant de salles que le moteur (params['nb_salles']), chacune de
+    cases_par_salle cases. Le nombre de salles n'est jamais ajusté aux
+    effectifs : une bande trop grande pour une salle est signalée par
+    deficits_salles et en prend plusieurs (conflits si elles manquent).
+    """
+    parc = {}
+    for code in TYPES_SALLES:
+        cap = _capacite(capacite, code)
+        parc[code] = list(cap['salles']) if cap.get('salles') else [cap['cases_par_salle']] * params['nb_salles'][code]
+    return parc
+
+def deficits_salles(effectifs, parc, capacite=None):
+    """
+    Types de salle dont la plus grande salle ne loge pas une bande entière.
+
+    Returns:
+        dict code -> {'cases_par_bande', 'cases_par_salle' (plus grande salle),
+        'cases_manquantes', 'places_manquantes', 'salles_par_bande' (salles de
+        cette taille nécessaires pour une bande)}
+    """
+    deficits = {}
+    for code, tailles in parc.items():
+        places_par_case = _capacite(capacite, code)['places_par_case']
+        cases = cases_necessaires(effectifs[code], places_par_case)
+        plus_grande = max(tailles, default=0)
+        if cases > plus_grande:
+            deficits[code] = {
+                'cases_par_bande': cases,
+                'cases_par_salle': plus_grande,
+                'cases_manquantes': cases - plus_grande,
+                'places_manquantes': effectifs[code] - plus_grande * places_par_case,
+                'salles_par_bande': math.ceil(cases / plus_grande) if plus_grande else None
+            }
+    return deficits
+
+def choisir_salles(libres, cases_demandees):
+    """
+    Salles vides à réserver pour cases_demandees cases.
+
+    Args:
+        libres: salles vides, de la libérée le plus tôt à la plus récente
+
+    Returns:
+        liste des salles choisies (capacité totale éventuellement insuffisante)
+    """
+    # Par capacité croissante ; à capacité égale, la salle libérée le plus tôt
+    candidates = sorted(((salle['cases'], rang), salle) for rang, salle in enumerate(libres))
+    cles = [cle for cle, _ in candidates]
+
+    choix = []
+    reste = cases_demandees
+    while reste > 0 and candidates:
+        i = bisect_left(cles, (reste, -1))
+        if i < len(candidates):
+            # Le reste tient dans une salle : la plus petite qui suffit
+            choix.append(candidates[i][1])
+            break
+        # Sinon la plus grande salle, et on continue
+        _, salle = candidates.pop()
+        cles.pop()
+        choix.append(salle)
+        reste -= salle['cases']
+    return choix
+
+# ============================================================================
+# AFFECTATION EN PLACES
+# ============================================================================
+
+class AllocateurPlaces:
+    """
+    Affectation d'occupations avec effectifs sur un parc de salles de tailles
+    quelconques. Même index trié des (date_liberation, num_salle) que
+    moteur.Allocateur : les salles vides à une date s'obtiennent par dichotomie.
+
+    Quand les salles vides ne suffisent pas, les salles occupées libérées le plus
+    tôt sont prises en plus et l'occupation est comptée en conflit.
+    """
+
+    def __init__(self, parc, capacite, vide_sanitaire, unite=timedelta(days=1)):
+        self.delta_vide = vide_sanitaire * unite
+        self.unite = unite
+        self.places_par_case = {}
+        self.salles = {}
+        self._index = {}
+        for code, tailles in parc.items():
+            type_salle = TYPES_SALLES[code]
+            self.places_par_case[type_salle] = _capacite(capacite, code)['places_par_case']
+            self.salles[type_salle] = [
+                {'num_salle': i, 'cases': cases, 'places': cases * self.places_par_case[type_salle],
+                 'date_liberation': DATE_LIBERATION_INITIALE, 'historique': []}
+                for i, cases in enumerate(tailles)
+            ]
+            self._index[type_salle] = [(DATE_LIBERATION_INITIALE, i) for i in range(len(tailles))]
+        self.conflits = []
+
+    def affecter(self, occ):
+        """Affecte une occupation (clé 'effectif') et retourne les numéros des salles choisies"""
+        type_salle = occ['type_salle']
+        date_entree = occ['date_entree']
+        salles = self.salles[type_salle]
+        index = self._index[type_salle]
+        places_par_case = self.places_par_case[type_salle]
+        cases_demandees = cases_necessaires(occ['effectif'], places_par_case)
+
+        nb_vides = bisect_right(index, (date_entree, math.inf))
+        choix = choisir_salles([salles[num] for _, num in index[:nb_vides]], cases_demandees)
+        manque = cases_demandees - sum(salle['cases'] for salle in choix)
+
+        if manque > 0:
+            cases_manquantes = manque
+            for _, num in index[nb_vides:]:
+                if manque <= 0:
+                    break
+                choix.append(salles[num])
+                manque -= salles[num]['cases']
+            forcees = [s for s in choix if s['date_liberation'] > date_entree]
+            self.conflits.append({
+                'type_salle': type_salle,
+                'bande': occ['bande'],
+                'date_entree': date_entree,
+                'id': occ['id_unique'],
+                'cases_manquantes': cases_manquantes,
+                'salles_forcees': [s['num_salle'] + 1 for s in forcees],
+                'jours_chevauchement': max(((s['date_liberation'] - date_entree) // self.unite for s in forcees), default=0),
+                'animaux_non_loges': max(0, manque) * places_par_case
+            })
+
+        # Les animaux remplissent les salles une par une
+        reste = occ['effectif']
+        date_liberation = occ['date_sortie'] + self.delta_vide
+        for salle in choix:
+            effectif = min(reste, salle['places'])
+            reste -= effectif
+            del index[bisect_left(index, (salle['date_liberation'], salle['num_salle']))]
+            insort(index, (date_liberation, salle['num_salle']))
+            salle['date_liberation'] = date_liberation
+            salle['historique'].append({
+                'id_unique': occ['id_unique'],
+                'date_entree': date_entree,
+                'date_sortie': occ['date_sortie'],
+                'date_liberation': date_liberation,
+                'bande': occ['bande'],
+                'cycle': occ['cycle'],
+                'duree_totale': occ['duree_totale'],
+                'effectif': effectif,
+                'places': salle['places']
+            })
+
+        return [salle['num_salle'] for salle in choix]
+
+def indicateurs_places(salles, unite=timedelta(days=1)):
+    """
+    Indicateurs d'un type de salle.
+
+    Returns:
+        dict avec 'salles', 'places', 'taux_occupation' (animaux x jours sur
+        places x jours entre la première entrée et la dernière sortie),
+        'taux_remplissage' (animaux / places des salles occupées) et
+        'salles_par_bande' (nombre moyen de salles par occupation)
+    """
+    historiques = [h for salle in salles for h in salle['historique']]
+    places = sum(salle['places'] for salle in salles)
+    if not historiques:
+        return {'salles': len(salles), 'places': places, 'taux_occupation': 0.0,
+                'taux_remplissage': 0.0, 'salles_par_bande': 0.0}
+
+    debut = min(h['date_entree'] for h in historiques)
+    fin = max(h['date_sortie'] for h in historiques)
+    animaux_jours = sum(h['effectif'] * ((h['date_sortie'] - h['date_entree']) // unite) for h in historiques)
+    places_jours_occupees = sum(h['places'] * ((h['date_sortie'] - h['date_entree']) // unite) for h in historiques)
+    nb_occupations = len({h['id_unique'] for h in historiques})
+
+    return {
+        'salles': len(salles),
+        'places': places,
+        'taux_occupation': animaux_jours / (places * ((fin - debut) // unite)) if places and fin > debut else 0.0,
+        'taux_remplissage': animaux_jours / places_jours_occupees if places_jours_occupees else 0.0,
+        'salles_par_bande': len(historiques) / nb_occupations
+    }
+
+def calculer_capacite(params, nb_truies, porcelets_par_truie=PORCELETS_SEVRES_PAR_TRUIE,
+                      capacite=None, parc=None):
+    """
+    Affectation en places de toutes les occupations d'une configuration.
+
+    Args:
+        capacite: code -> {'places_par_case', 'cases_par_salle', 'salles'} (complète CAPACITE_DEFAUT)
+        parc: code -> liste des cases par salle (défaut : salles_physiques)
+
+    Returns:
+        dict avec 'effectifs', 'occupations' (avec 'effectif'), 'salles' (par type),
+        'conflits', 'deficits' (cf. deficits_salles) et 'indicateurs' (par type de salle)
+    """
+    if nb_truies < 1 or porcelets_par_truie < 1:
+        raise ValueError(f"Troupeau invalide : {nb_truies} truies, {porcelets_par_truie} porcelets par truie "
+                         f"(au moins 1 chacun)")
+    effectifs = effectifs_par_bande(nb_truies, params['nb_bandes'], porcelets_par_truie)
+    parc = parc if parc is not None else salles_physiques(params, capacite)
+    code_par_nom = {nom: code for code, nom in TYPES_SALLES.items()}
+
+    occupations = [
+        dict(occ, effectif=effectifs[code_par_nom[occ['type_salle']]])
+        for occ in calculer_toutes_occupations(params)
+    ]
+
+    allocateur = AllocateurPlaces(parc, capacite, params['vide_sanitaire'])
+    for occ in sorted(occupations, key=lambda x: x['date_entree']):
+        allocateur.affecter(occ)
+
+    return {
+        'effectifs': effectifs,
+        'occupations': occupations,
+        'salles': allocateur.salles,
+        'conflits': allocateur.conflits,
+        'deficits': deficits_salles(effectifs, parc, capacite),
+        'indicateurs': {type_salle: indicateurs_places(salles) for type_salle, salles in allocateur.salles.items()}
+    }
@@ -0,0 +1,850 @@
+"""
+Ligne de commande du simulateur de salles.
+
+Mêmes paramètres que la barre latérale de l'application Streamlit :
+
+    python cli.py diagnostic --intervalle 21 --vide 5 --jours 90
+    python cli.py diagnostic --json > diagnostic.json
+    python cli.py diagnostic --evenements journal.csv
+    python cli.py exporter --intervalle 21 --vide 5 --format csv --sortie planning.csv
+    python cli.py exporter --debut 2026-01-01 --fin 2026-12-31 --format ics --sortie -
+    python cli.py exporter --fin 2060-12-31 --site nb_e=5 --site intervalle=28 --sortie sites.csv
+    python cli.py robustesse --repliques 5000 --variabilite G=normale:2
+    python cli.py politiques --intervalle 14 --nb-m 5
+    python cli.py optimiser --intervalle 35 --vide 3
+    python cli.py comparer --scenario nb_e=5 --scenario intervalle=28,vide=4
+    python cli.py capacite --truies 1000 --places-e 15
+    python cli.py verifier --cas 20000 --processus 4
+    python cli.py glissant --horizon 2045-12-31 --historique historique.jsonl
+    python cli.py lot --site nb_e=5 --site intervalle=28,vide=4 --processus 4
+    python cli.py alertes --site nb_e=5 --etat alertes_etat.json --journal alertes.jsonl
+    python cli.py profil
+    python cli.py api --port 8600
+
+Ni Streamlit, ni Plotly, ni pandas ne sont chargés : seuls le moteur et les
+constantes d'export et de vérification (bibliothèque standard) sont importés au
+démarrage, les modules propres à une commande sont importés dans la commande
+elle-même (tâches cron, sondes de supervision).
+
+Code de retour de `diagnostic` : 0 si aucun conflit dans la fenêtre, 1 sinon.
+Code de retour de `alertes` : 1 si de nouvelles alertes ont été émises, 0 sinon.
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from moteur import (
+    DATE_SAILLIE_B1_DEFAUT,
+    INTERVALLES_POSSIBLES,
+    TYPES_SALLES,
+    POLITIQUES,
+    parametres_conduite,
+    salles_config_depuis,
+    calculer_planning,
+    extraire_etats_salles,
+    calculer_deficit_capacite,
+)
+
+# Modules légers (bibliothèque standard, dépendances lourdes importées à l'usage)
+from export import FORMATS_EXPORT
+from verification import MOTEURS as MOTEURS_VERIFIES
+
+# ============================================================================
+# ARGUMENTS COMMUNS
+# ============================================================================
+
+def _date(texte):
+    """Date au format AAAA-MM-JJ"""
+    try:
+        return datetime.strptime(texte, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"date invalide : {texte} (format attendu AAAA-MM-JJ)")
+
+def _entier_minimum(minimum):
+    """Type argparse : entier supérieur ou égal à minimum"""
+    def entier(texte):
+        try:
+            valeur = int(texte)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"entier attendu : {texte}")
+        if valeur < minimum:
+            raise argparse.ArgumentTypeError(f"{valeur} : au moins {minimum} attendu")
+        return valeur
+    return entier
+
+entier_positif = _entier_minimum(1)
+entier_positif_ou_nul = _entier_minimum(0)
+
+def ajouter_arguments_conduite(parser):
+    """Paramètres de conduite (équivalents de la barre latérale)"""
+    groupe = parser.add_argument_group("paramètres de conduite")
+    groupe.add_argument('--intervalle', type=int, choices=INTERVALLES_POSSIBLES, default=21,
+                        help="intervalle entre bandes en jours (défaut : 21)")
+    groupe.add_argument('--vide', type=entier_positif_ou_nul, default=5,
+                        help="vide sanitaire en jours (défaut : 5)")
+    groupe.add_argument('--date-saillie', type=_date, default=DATE_SAILLIE_B1_DEFAUT,
+                        help=f"date de saillie de la bande 1 (défaut : {DATE_SAILLIE_B1_DEFAUT:%Y-%m-%d})")
+    groupe.add_argument('--jours-avant-saillie', type=entier_positif_ou_nul, default=5,
+                        help="jours en Attente Saillie avant la saillie (défaut : 5)")
+    groupe.add_argument('--horizon', type=_date, default=None,
+                        help="fin de l'horizon de simulation (défaut : aujourd'hui + 365 jours)")
+
+    ajustements = parser.add_argument_group("ajustements manuels (défaut : dimensionnement optimal)")
+    for code, nom in TYPES_SALLES.items():
+        ajustements.add_argument(f'--duree-{code.lower()}', type=entier_positif, default=None, metavar='JOURS',
+                                 help=f"durée d'occupation {nom}")
+        ajustements.add_argument(f'--nb-{code.lower()}', type=entier_positif, default=None, metavar='SALLES',
+                                 help=f"nombre de salles {nom}")
+
+def parametres_depuis_arguments(args):
+    """Construit les paramètres du moteur à partir des arguments de la ligne de commande"""
+    durees = {code: getattr(args, f'duree_{code.lower()}') for code in TYPES_SALLES}
+    nb_salles = {code: getattr(args, f'nb_{code.lower()}') for code in TYPES_SALLES}
+
+    return parametres_conduite(
+        args.intervalle, args.vide, args.date_saillie,
+        jours_avant_saillie=args.jours_avant_saillie,
+        durees={code: v for code, v in durees.items() if v is not None},
+        nb_salles={code: v for code, v in nb_salles.items() if v is not None},
+        date_horizon=args.horizon
+    )
+
+def ajouter_argument_evenements(parser):
+    parser.add_argument('--evenements', default=None, metavar='FICHIER',
+                        help="journal des entrées/sorties réelles (CSV, ou JSON Lines si .jsonl)")
+
+def planning_depuis_arguments(args, params):
+    """Planning théorique, corrigé par le journal des événements réels s'il est fourni"""
+    if args.evenements is None:
+        return calculer_planning(params)
+
+    from evenements import charger_evenements, PlanningReconcilie
+    try:
+        evenements = charger_evenements(args.evenements, params)
+        return PlanningReconcilie(params, evenements).planning()
+    except (OSError, ValueError) as exc:
+        sys.exit(f"Erreur : {exc}")
+
+# ============================================================================
+# COMMANDES
+# ============================================================================
+
+def _aujourd_hui():
+    return datetime.combine(datetime.now().date(), datetime.min.time())
+
+def calculer_diagnostic(params, date_debut, nb_jours, planning=None):
+    """
+    Diagnostic de la configuration sur la fenêtre [date_debut, date_debut + nb_jours].
+    `planning` (format de moteur.calculer_planning) est calculé s'il n'est pas fourni.
+
+    Returns:
+        dict avec 'parametres', 'fenetre', 'conflits', 'sur_dimensionnements',
+        'deficits', 'regime_croisiere' et 'etats' (statut de chaque salle à date_debut)
+    """
+    date_fin = date_debut + timedelta(days=nb_jours)
+    if planning is None:
+        planning = calculer_planning(params)
+    conflits = planning['conflits']
+    sur_dim = planning['sur_dim']
+    dates_regime = planning['dates_regime']
+
+    etat_salles = extraire_etats_salles(planning['salles_disponibilite'], date_debut)
+    chronologie = calculer_deficit_capacite(
+        planning['occupations'], salles_config_depuis(params), params['vide_sanitaire']
+    )
+
+    def dans_fenetre(date):
+        return date_debut <= date <= date_fin
+
+    return {
+        'parametres': {
+            'intervalle_bandes': params['intervalle_bandes'],
+            'vide_sanitaire': params['vide_sanitaire'],
+            'nb_bandes': params['nb_bandes'],
+            'date_saillie_b1': params['date_saillie_b1'],
+            'durees': params['durees'],
+            'nb_salles': params['nb_salles']
+        },
+        'fenetre': {'debut': date_debut, 'fin': date_fin},
+        'conflits': [c for c in conflits if dans_fenetre(c['date_entree'])],
+        'sur_dimensionnements': [
+            {k: v for k, v in s.items() if k != 'en_regime_croisiere'}
+            for s in sur_dim if dans_fenetre(s['date'])
+        ],
+        'deficits': [
+            dict(periode, type_salle=type_salle)
+            for type_salle, chrono in chronologie.items()
+            for periode in chrono['periodes']
+            if periode['debut'] <= date_fin and periode['fin'] > date_debut
+        ],
+        'regime_croisiere': dates_regime,
+        'etats': {
+            type_salle: [etat['statut'] for etat in etats]
+            for type_salle, etats in etat_salles.items()
+        }
+    }
+
+def afficher_diagnostic(diagnostic):
+    """Affichage texte du diagnostic"""
+    fenetre = diagnostic['fenetre']
+    params = diagnostic['parametres']
+    print(f"Conduite {params['nb_bandes']} bandes / {params['intervalle_bandes']}j, "
+          f"vide {params['vide_sanitaire']}j - fenêtre du {fenetre['debut']:%d/%m/%Y} au {fenetre['fin']:%d/%m/%Y}")
+
+    conflits = diagnostic['conflits']
+    if conflits:
+        print(f"⚠️  {len(conflits)} conflit(s)")
+        for c in conflits:
+            objet = "mise hors service" if c['bande'] is None else f"bande {c['bande']}"
+            print(f"   - {c['date_entree']:%d/%m/%Y} {c['type_salle']} : {objet} "
+                  f"(salle {c['salle']} libre {c['jours_chevauchement']}j trop tard)")
+    else:
+        print("✅ Aucun conflit")
+
+    for periode in diagnostic['deficits']:
+        print(f"   manque {periode['deficit']} salle(s) {periode['type_salle']} "
+              f"du {periode['debut']:%d/%m/%Y} au {periode['fin']:%d/%m/%Y}")
+
+    nb_sur_dim = len(diagnostic['sur_dimensionnements'])
+    if nb_sur_dim:
+        print(f"⚠️  {nb_sur_dim} surdimensionnement(s) en régime de croisière")
+    else:
+        print("✅ Dimensionnement optimal")
+
+    for type_salle, statuts in diagnostic['etats'].items():
+        print(f"   {type_salle:<16} {' '.join(statuts)}")
+
+def commande_diagnostic(args):
+    """Diagnostic des conflits et surdimensionnements sur une fenêtre à venir"""
+    params = parametres_depuis_arguments(args)
+    date_debut = args.date if args.date is not None else _aujourd_hui()
+    planning = planning_depuis_arguments(args, params)
+    diagnostic = calculer_diagnostic(params, date_debut, args.jours, planning)
+
+    if args.json:
+        import json
+        from export import valeur_json
+        json.dump(diagnostic, sys.stdout, default=valeur_json, ensure_ascii=False, indent=2)
+        print()
+    else:
+        afficher_diagnostic(diagnostic)
+
+    return 1 if diagnostic['conflits'] else 0
+
+def commande_exporter(args):
+    """Exporte l'affectation des salles sur une fenêtre de dates (l'horizon suit --fin)"""
+    from export import (
+        COLONNES_EXPORT, COLONNES_SITES, exporter_fichier, iterer_affectations,
+        iterer_affectations_glissantes, iterer_affectations_sites, parametres_export,
+    )
+
+    colonnes = COLONNES_EXPORT
+    if args.evenements is not None:
+        # Journal réel : planning réconcilié complet, prolongé jusqu'à la fin de la fenêtre
+        if args.site:
+            sys.exit("Erreur : --evenements ne s'applique qu'à une seule configuration (sans --site)")
+        params = parametres_depuis_arguments(args)
+        if args.fin is not None:
+            params = parametres_export(params, args.fin)
+        planning = planning_depuis_arguments(args, params)
+        lignes = iterer_affectations(planning['salles_disponibilite'], args.debut, args.fin)
+    elif args.site:
+        lignes = iterer_affectations_sites(sites_depuis_arguments(args), args.debut, args.fin)
+        colonnes = COLONNES_SITES
+    else:
+        lignes = iterer_affectations_glissantes(parametres_depuis_arguments(args), args.debut, args.fin)
+    nb_lignes = exporter_fichier(lignes, args.format, args.sortie, colonnes=colonnes)
+
+    if args.sortie != '-':
+        print(f"{nb_lignes} affectations exportées dans {args.sortie}", file=sys.stderr)
+    return 0
+
+def _distribution(texte):
+    from simulation import lire_distribution
+    try:
+        return lire_distribution(texte)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc))
+
+def afficher_robustesse(resultat, vide_sanitaire):
+    """Affichage texte de la simulation Monte-Carlo"""
+    print(f"{resultat['nb_repliques']} répliques - probabilité d'au moins un conflit avec la configuration : "
+          f"{resultat['p_conflit_configuration']:.1%}")
+    for code, par_nombre in resultat['par_type'].items():
+        loi, ecart = resultat['distributions'][code]
+        variabilite = "durée fixe" if loi == 'fixe' or not ecart else f"{loi} ±{ecart:g}j"
+        print(f"{TYPES_SALLES[code]} ({variabilite})")
+        print(f"   {'salles':>8} {'P(conflit)':>11} {'conflits':>9} {'vide p5':>8} {'médian':>7} {'< vide':>7}")
+        for nb, stats in par_nombre.items():
+            vides = stats['vides']
+            marque = '*' if nb == resultat['nb_salles_configuration'][code] else ' '
+            if vides['nb']:
+                colonnes_vides = f"{vides['p05']:>7}j {vides['mediane']:>6}j {vides['part_sous_vide_sanitaire']:>7.1%}"
+            else:
+                colonnes_vides = f"{'-':>8} {'-':>7} {'-':>7}"
+            print(f"   {marque}{nb:>7} {stats['p_conflit']:>11.1%} {stats['conflits_moyens']:>9.2f} {colonnes_vides}")
+    print(f"(* configuration actuelle ; vide = jours entre deux bandes dans une salle, requis : {vide_sanitaire}j)")
+
+def commande_robustesse(args):
+    """Probabilité de conflit quand les durées varient (simulation Monte-Carlo)"""
+    from simulation import simuler_robustesse
+
+    params = parametres_depuis_arguments(args)
+    try:
+        resultat = simuler_robustesse(
+            params, dict(args.variabilite), nb_repliques=args.repliques,
+            graine=args.graine, processus=args.processus
+        )
+    except (RuntimeError, ValueError) as exc:
+        sys.exit(f"Erreur : {exc}")
+
+    if args.json:
+        import json
+        json.dump(resultat, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        afficher_robustesse(resultat, params['vide_sanitaire'])
+    return 0
+
+def commande_politiques(args):
+    """Compare les politiques d'affectation sur le même planning"""
+    from moteur import calculer_toutes_occupations, comparer_politiques
+
+    params = parametres_depuis_arguments(args)
+    resultats = comparer_politiques(
+        calculer_toutes_occupations(params), salles_config_depuis(params),
+        params['vide_sanitaire'], args.politique or None
+    )
+
+    if args.json:
+        import json
+        json.dump({nom: r['indicateurs'] for nom, r in resultats.items()}, sys.stdout, indent=2)
+        print()
+        return 0
+
+    def nombre(valeur):
+        return '-' if valeur is None else f"{valeur:.1f}"
+
+    print(f"{'politique':<22} {'conflits':>8} {'jours':>6} {'surdim.':>8} {'vide moy.':>10} {'vide max':>9} {'écart salle':>12}")
+    for nom, resultat in resultats.items():
+        ind = resultat['indicateurs']
+        print(f"{nom:<22} {ind['conflits']:>8} {ind['jours_chevauchement']:>6} {ind['sur_dimensionnements']:>8} "
+              f"{nombre(ind['vide_moyen']):>10} {nombre(ind['vide_max']):>9} {nombre(ind['ecart_salle_moyen']):>12}")
+    print()
+    for nom in resultats:
+        print(f"   {nom:<22} {POLITIQUES[nom].description}")
+    return 0
+
+def commande_optimiser(args):
+    """Configuration au plus petit nombre de salles (recherche sous contraintes)"""
+    from moteur import calculer_dimensionnement
+    from optimiseur import optimiser_configuration
+
+    if args.intervalle < 1 or args.vide < 0:
+        sys.exit("Erreur : l'intervalle doit être d'au moins 1 jour et le vide positif")
+
+    intervalles = INTERVALLES_POSSIBLES if args.tous else [args.intervalle]
+    resultats = []
+    for intervalle_bandes in intervalles:
+        optimum = optimiser_configuration(intervalle_bandes, args.vide, args.duree_e_min)
+        _, nb_optimal, _, _ = calculer_dimensionnement(intervalle_bandes, args.vide)
+        resultats.append((intervalle_bandes, optimum, sum(nb_optimal.values())))
+
+    if args.json:
+        import json
+        json.dump([
+            dict(optimum or {'intervalle_bandes': intervalle_bandes}, total_salles_dimensionnement=total)
+            for intervalle_bandes, optimum, total in resultats
+        ], sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    for intervalle_bandes, optimum, total in resultats:
+        if optimum is None:
+            print(f"Intervalle {intervalle_bandes}j : aucune configuration ne respecte les contraintes")
+            continue
+        print(f"Intervalle {intervalle_bandes}j, vide {args.vide}j : {optimum['total_salles']} salles "
+              f"(dimensionnement standard : {total}) - {optimum['noeuds']} branches, "
+              f"{optimum['noeuds_elagues']} élaguées")
+        for code, nom in TYPES_SALLES.items():
+            vide = optimum['vides'][code]
+            print(f"   {nom:<16} {optimum['nb_salles'][code]:>3} salles  {optimum['durees'][code]:>4}j  vide {vide}j")
+    return 0
+
+# Clés acceptées par --scenario (mêmes noms que les options, en minuscules)
+CLES_SCENARIO = ('intervalle', 'vide') + tuple(
+    f'{prefixe}_{code.lower()}' for code in TYPES_SALLES for prefixe in ('duree', 'nb')
+)
+
+def _scenario(texte):
+    """Variante 'cle=valeur,cle=valeur' (ex. 'intervalle=28,nb_e=5') -> dict"""
+    variante = {}
+    for element in texte.split(','):
+        cle, _, valeur = element.partition('=')
+        cle = cle.strip().replace('-', '_')
+        if cle not in CLES_SCENARIO:
+            raise argparse.ArgumentTypeError(f"clé inconnue : {cle} (attendu : {', '.join(CLES_SCENARIO)})")
+        # Mêmes bornes que les options correspondantes (--vide, --duree-*, --nb-*)
+        entier = entier_positif_ou_nul if cle == 'vide' else entier_positif
+        try:
+            variante[cle] = entier(valeur)
+        except argparse.ArgumentTypeError as erreur:
+            raise argparse.ArgumentTypeError(f"{cle} : {erreur}")
+    if variante.get('intervalle', INTERVALLES_POSSIBLES[0]) not in INTERVALLES_POSSIBLES:
+        raise argparse.ArgumentTypeError(f"intervalle : {', '.join(map(str, INTERVALLES_POSSIBLES))}")
+    return variante
+
+def parametres_scenario(args, variante):
+    """Paramètres de la ligne de commande modifiés par une variante de --scenario"""
+    arguments = argparse.Namespace(**vars(args))
+    for cle, valeur in variante.items():
+        setattr(arguments, cle, valeur)
+    return parametres_depuis_arguments(arguments)
+
+def commande_comparer(args):
+    """Compare la configuration de la ligne de commande à des variantes"""
+    from scenarios import comparer_scenarios, resume_etats, statistiques_cache
+
+    date = args.date if args.date is not None else _aujourd_hui()
+    scenarios = [('base', parametres_depuis_arguments(args))] + [
+        (','.join(f'{cle}={valeur}' for cle, valeur in variante.items()), parametres_scenario(args, variante))
+        for variante in args.scenario
+    ]
+    resultats = comparer_scenarios(scenarios, date)
+
+    if args.json:
+        import json
+        from export import valeur_json
+        json.dump([
+            {'nom': r['nom'], 'indicateurs': r['indicateurs'], 'ecarts': r['ecarts'],
+             'etats': resume_etats(r['etats'])}
+            for r in resultats
+        ], sys.stdout, default=valeur_json, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    largeur = max(len(nom) for nom, _ in scenarios)
+    print(f"{'scénario':<{largeur}} {'salles':>8} {'conflits':>10} {'jours':>10} {'surdim.':>10} {'occupation':>12}")
+    for r in resultats:
+        ind, ecart = r['indicateurs'], r['ecarts']
+        colonnes = [
+            f"{ind[cle]}{f' ({ecart[cle]:+})' if ecart[cle] else ''}"
+            for cle in ('total_salles', 'conflits', 'jours_chevauchement', 'sur_dimensionnements')
+        ]
+        taux = f"{ind['taux_occupation']:.0%}" + (f" ({ecart['taux_occupation']:+.0%})" if ecart['taux_occupation'] else '')
+        print(f"{r['nom']:<{largeur}} {colonnes[0]:>8} {colonnes[1]:>10} {colonnes[2]:>10} {colonnes[3]:>10} {taux:>12}")
+
+    print(f"États au {date:%d/%m/%Y} (occupées/vide sanitaire/disponibles) :")
+    for type_salle in TYPES_SALLES.values():
+        etats = [resume_etats(r['etats'])[type_salle] for r in resultats]
+        print(f"   {type_salle:<16} " + '   '.join(
+            f"{e['occupée']}/{e['vide_sanitaire']}/{e['disponible']}" for e in etats
+        ))
+
+    stats = statistiques_cache()
+    print(f"({stats['flux_generes']} flux générés, {stats['affectations_calculees']} affectations calculées "
+          f"pour {len(scenarios)} scénarios)")
+    return 0
+
+def commande_capacite(args):
+    """Affectation en places : effectifs par bande, cases et places par salle"""
+    from capacite import calculer_capacite
+
+    params = parametres_depuis_arguments(args)
+    capacite = {}
+    for code in TYPES_SALLES:
+        options = {
+            'places_par_case': getattr(args, f'places_{code.lower()}'),
+            'cases_par_salle': getattr(args, f'cases_{code.lower()}')
+        }
+        capacite[code] = {cle: valeur for cle, valeur in options.items() if valeur is not None}
+    try:
+        resultat = calculer_capacite(params, args.truies, args.porcelets, capacite)
+    except ValueError as exc:
+        sys.exit(f"Erreur : {exc}")
+
+    if args.json:
+        import json
+        from export import valeur_json
+        json.dump({
+            'effectifs': resultat['effectifs'],
+            'indicateurs': resultat['indicateurs'],
+            'deficits': resultat['deficits'],
+            'conflits': resultat['conflits']
+        }, sys.stdout, default=valeur_json, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f"{args.truies} truies, {params['nb_bandes']} bandes : {resultat['effectifs']['M']} truies "
+          f"et {resultat['effectifs']['PS']} porcelets sevrés par bande")
+    print(f"{'type':<16} {'effectif':>9} {'salles':>7} {'places':>7} {'salles/bande':>13} {'remplissage':>12} {'occupation':>11}")
+    for code, type_salle in TYPES_SALLES.items():
+        ind = resultat['indicateurs'][type_salle]
+        print(f"{type_salle:<16} {resultat['effectifs'][code]:>9} {ind['salles']:>7} {ind['places']:>7} "
+              f"{ind['salles_par_bande']:>13.1f} {ind['taux_remplissage']:>12.0%} {ind['taux_occupation']:>11.0%}")
+
+    for code, deficit in resultat['deficits'].items():
+        print(f"⚠️  {TYPES_SALLES[code]} : une bande occupe {deficit['cases_par_bande']} cases, une salle en a "
+              f"{deficit['cases_par_salle']} ({deficit['cases_manquantes']} cases, {deficit['places_manquantes']} places "
+              f"manquantes) - {deficit['salles_par_bande']} salles par bande")
+
+    if resultat['conflits']:
+        print(f"{len(resultat['conflits'])} bandes sans assez de places libres :")
+        for c in resultat['conflits'][:10]:
+            print(f"   {c['date_entree']:%d/%m/%Y}  {c['type_salle']:<16} bande {c['bande']}  "
+                  f"{c['cases_manquantes']} cases manquantes")
+    return 1 if resultat['conflits'] else 0
+
+def commande_verifier(args):
+    """Compare les moteurs optimisés à l'affectation de référence sur des configurations aléatoires"""
+    import time
+    from verification import verifier
+
+    debut = time.perf_counter()
+    resultat = verifier(args.cas, graine=args.graine, processus=args.processus, moteurs=args.moteur or None)
+    duree = time.perf_counter() - debut
+
+    if args.json:
+        import json
+        from export import valeur_json
+        json.dump(dict(resultat, secondes=duree), sys.stdout, default=valeur_json, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print(f"{resultat['nb_cas']} configurations, moteurs {', '.join(resultat['moteurs'])} : "
+              f"{len(resultat['echecs'])} en échec ({duree:.1f} s, {resultat['nb_cas'] / duree:.0f} cas/s)")
+        minimal = resultat['minimal']
+        if minimal is not None:
+            ecarts = ', '.join(f"{moteur} ({champ})" for moteur, champ in minimal['ecarts'])
+            print(f"Cas {minimal['cas']} réduit en {minimal['essais']} essais - écarts : {ecarts}")
+            print(f"   {minimal['commande']}")
+            if minimal['journal']:
+                print(f"   + journal de {len(minimal['journal'])} événement(s) pour le planning réconcilié (--json pour le détail)")
+    return 1 if resultat['echecs'] else 0
+
+def commande_glissant(args):
+    """Horizon long à mémoire constante : indicateurs courants, historique éventuel sur disque"""
+    from glissant import HistoriqueDisque, simuler_glissant
+
+    params = parametres_depuis_arguments(args)
+    if args.historique:
+        with HistoriqueDisque(args.historique) as historique:
+            resultat = simuler_glissant(params, [historique])
+    else:
+        resultat = simuler_glissant(params)
+
+    if args.json:
+        import json
+        from export import valeur_json
+        json.dump(resultat, sys.stdout, default=valeur_json, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    def nombre(valeur):
+        return '-' if valeur is None else f"{valeur:.1f}"
+
+    print(f"{resultat['nb_occupations']} occupations jusqu'au {params['date_horizon']:%d/%m/%Y} : "
+          f"{resultat['nb_conflits']} conflits, {resultat['nb_sur_dim']} surdimensionnements")
+    print(f"{'type':<16} {'occupations':>11} {'conflits':>9} {'jours':>6} {'surdim.':>8} "
+          f"{'vide moy.':>10} {'vide min':>9} {'vide max':>9} {'occupation':>11}")
+    for type_salle, ind in resultat['indicateurs'].items():
+        print(f"{type_salle:<16} {ind['occupations']:>11} {ind['conflits']:>9} {ind['jours_chevauchement']:>6} "
+              f"{ind['sur_dimensionnements']:>8} {nombre(ind['vide_moyen']):>10} {nombre(ind['vide_min']):>9} "
+              f"{nombre(ind['vide_max']):>9} {ind['taux_occupation']:>11.0%}")
+    if args.historique:
+        print(f"Historique complet : {args.historique}")
+    return 0
+
+def sites_depuis_arguments(args):
+    """(nom, params) de chaque --site, ou la seule configuration de la ligne de commande"""
+    if not args.site:
+        return [('base', parametres_depuis_arguments(args))]
+    return [(','.join(f'{cle}={valeur}' for cle, valeur in variante.items()), parametres_scenario(args, variante))
+            for variante in args.site]
+
+def commande_lot(args):
+    """Simule plusieurs sites (variantes de la configuration), répartis par lots sur un pool de processus"""
+    import time
+    from repartition import SITES_PAR_PROCESSUS, mesurer, simuler_sites
+    from scenarios import resume_etats
+
+    date = args.date if args.date is not None else _aujourd_hui()
+    sites = sites_depuis_arguments(args) * args.repeter
+
+    if args.mesurer:
+        durees = mesurer(sites, date, processus=args.processus)
+        print(f"{len(sites)} sites - moteur seul, site après site : {durees['moteur']:.3f} s ; "
+              f"un processus : {durees['un_processus']:.3f} s ; "
+              f"{durees['processus']} processus demandés (au plus un par {SITES_PAR_PROCESSUS} sites) : "
+              f"{durees['pool']:.3f} s ({durees['un_processus'] / durees['pool']:.2f}x)")
+        return 0
+
+    debut = time.perf_counter()
+    resultats = simuler_sites(sites, date, processus=args.processus)
+    duree = time.perf_counter() - debut
+
+    if args.json:
+        import json
+        from export import valeur_json
+        json.dump([
+            {'nom': r['nom'], 'conflits': r['conflits'], 'sur_dim': r['sur_dim'],
+             'dates_regime': r['dates_regime'], 'etats': resume_etats(r['etats'])}
+            for r in resultats
+        ], sys.stdout, default=valeur_json, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    largeur = max(len(r['nom']) for r in resultats)
+    print(f"{'site':<{largeur}} {'conflits':>9} {'jours':>6} {'surdim.':>8}   états au {date:%d/%m/%Y} "
+          f"(occupées/vide sanitaire/disponibles)")
+    for r in resultats:
+        etats = resume_etats(r['etats'])
+        print(f"{r['nom']:<{largeur}} {len(r['conflits']):>9} {sum(c['jours_chevauchement'] for c in r['conflits']):>6} "
+              f"{len(r['sur_dim']):>8}   " + ' '.join(
+                  f"{code}:{e['occupée']}/{e['vide_sanitaire']}/{e['disponible']}"
+                  for code, e in zip(TYPES_SALLES, etats.values())
+              ))
+    print(f"({len(sites)} sites en {duree:.2f} s)")
+    return 1 if any(r['conflits'] for r in resultats) else 0
+
+def commande_alertes(args):
+    """Alertes de la fenêtre à venir, vérifiée incrémentalement d'un passage à l'autre (tâche planifiée)"""
+    from alertes import (
+        JournalAlertes, WebhookAlertes, TYPES_ALERTES,
+        charger_etat, enregistrer_etat, verifier_alertes,
+    )
+
+    date = args.date if args.date is not None else _aujourd_hui()
+    sites = sites_depuis_arguments(args)
+    try:
+        etat = charger_etat(args.etat)
+    except (OSError, ValueError) as exc:
+        sys.exit(f"Erreur : {exc}")
+
+    puits = []
+    if args.journal:
+        puits.append(JournalAlertes(args.journal))
+    if args.webhook:
+        puits.append(WebhookAlertes(args.webhook))
+
+    resultat = verifier_alertes(sites, date, args.semaines, etat, puits)
+    echecs = resultat['echecs']
+    details = '; '.join(f"{e['puits']} : {e['erreur']}" for e in echecs)
+    if puits and len(echecs) == len(puits):
+        # Rien n'a été livré : l'état reste inchangé, les alertes seront réémises au passage suivant
+        sys.exit(f"Erreur d'émission des alertes (état inchangé) : {details}")
+    if args.etat:
+        # Livraison partielle : les alertes déjà livrées ne doivent pas être dupliquées au passage suivant
+        enregistrer_etat(args.etat, etat)
+    if echecs:
+        print(f"Avertissement : livraison partielle, {len(resultat['alertes'])} alerte(s) non livrée(s) à "
+              f"{details} (non réémises au passage suivant)", file=sys.stderr)
+
+    alertes = resultat['alertes']
+    if args.json:
+        import json
+        from export import valeur_json
+        json.dump(resultat, sys.stdout, default=valeur_json, ensure_ascii=False, indent=2)
+        print()
+        return 1 if alertes or echecs else 0
+
+    fenetre = resultat['fenetre']
+    nombres = ', '.join(f"{sum(1 for a in alertes if a['alerte'] == t)} {t}" for t in TYPES_ALERTES)
+    print(f"Fenêtre du {fenetre['debut']:%d/%m/%Y} au {fenetre['fin']:%d/%m/%Y} - "
+          f"{resultat['sites_verifies']}/{len(sites)} sites vérifiés : {len(alertes)} nouvelle(s) alerte(s) ({nombres})")
+    for a in alertes:
+        if a['alerte'] == 'sur_dimensionnement':
+            detail = f"{a['nb_vides']} salles vides"
+        else:
+            objet = "mise hors service" if a['bande'] is None else f"bande {a['bande']}"
+            precedente = '' if a['bande_precedente'] is None else f" après la bande {a['bande_precedente']}"
+            ecart = (f"{a['jours_chevauchement']}j de chevauchement" if a['alerte'] == 'conflit'
+                     else f"vide de {a['vide_reel']}j")
+            detail = f"{objet} en salle {a['salle']}{precedente}, {ecart}"
+        print(f"   - [{a['site']}] {a['date']:%d/%m/%Y} {a['alerte']} {a['type_salle']} : {detail}")
+    return 1 if alertes or echecs else 0
+
+# Modules chargés par l'application Streamlit, du plus léger au plus lourd
+MODULES_PROFILES = ['moteur', 'export', 'pandas', 'plotly.graph_objects', 'streamlit']
+
+def mesurer_import(module):
+    """Temps d'import à froid d'un module (secondes), mesuré dans un interpréteur neuf"""
+    import os
+    import subprocess
+
+    code = ("import time; t = time.perf_counter(); "
+            f"import {module}; print(time.perf_counter() - t)")
+    resultat = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if resultat.returncode != 0:
+        return None
+    return float(resultat.stdout.strip())
+
+def commande_profil(args):
+    """Mesure les temps d'import et de calcul qui composent le démarrage de l'application"""
+    import time
+
+    print("Imports à froid :")
+    for module in MODULES_PROFILES:
+        duree = mesurer_import(module)
+        texte = "non installé" if duree is None else f"{duree * 1000:8.1f} ms"
+        print(f"   {module:<22} {texte}")
+
+    params = parametres_depuis_arguments(args)
+    debut = time.perf_counter()
+    calculer_planning(params)
+    froid = time.perf_counter() - debut
+    debut = time.perf_counter()
+    calculer_planning(params)
+    chaud = time.perf_counter() - debut
+    print("Planning de la configuration :")
+    print(f"   {'premier calcul':<22} {froid * 1000:8.1f} ms")
+    print(f"   {'depuis le cache':<22} {chaud * 1000:8.3f} ms")
+    return 0
+
+def commande_api(args):
+    """Sert les calculs du moteur en HTTP/JSON (voir api.py)"""
+    import asyncio
+    from api import servir
+
+    print(f"API disponible sur http://{args.hote}:{args.port}/ (Ctrl+C pour arrêter)", file=sys.stderr)
+    try:
+        asyncio.run(servir(args.hote, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def creer_parser():
+    parser = argparse.ArgumentParser(description="Simulateur de gestion des salles en élevage porcin")
+    sous_commandes = parser.add_subparsers(dest='commande', required=True)
+
+    p_diagnostic = sous_commandes.add_parser('diagnostic', help="conflits, déficits et surdimensionnements à venir")
+    ajouter_arguments_conduite(p_diagnostic)
+    p_diagnostic.add_argument('--date', type=_date, default=None, help="début de la fenêtre (défaut : aujourd'hui)")
+    p_diagnostic.add_argument('--jours', type=entier_positif_ou_nul, default=90, help="longueur de la fenêtre en jours (défaut : 90)")
+    p_diagnostic.add_argument('--json', action='store_true', help="sortie JSON")
+    ajouter_argument_evenements(p_diagnostic)
+    p_diagnostic.set_defaults(fonction=commande_diagnostic)
+
+    p_exporter = sous_commandes.add_parser('exporter', help="exporter l'affectation des salles (CSV, Parquet, ICS)")
+    ajouter_arguments_conduite(p_exporter)
+    p_exporter.add_argument('--format', choices=FORMATS_EXPORT, default='csv', help="format d'export (défaut : csv)")
+    p_exporter.add_argument('--sortie', default='-', help="fichier de sortie ('-' = sortie standard)")
+    p_exporter.add_argument('--debut', type=_date, default=None, help="début de la fenêtre exportée")
+    p_exporter.add_argument('--fin', type=_date, default=None,
+                            help="fin de la fenêtre exportée (incluse ; défaut : --horizon)")
+    p_exporter.add_argument('--site', type=_scenario, action='append', default=[], metavar='CLE=VALEUR,...',
+                            help="site : variante de la configuration, répétable (ajoute la colonne site)")
+    ajouter_argument_evenements(p_exporter)
+    p_exporter.set_defaults(fonction=commande_exporter)
+
+    p_robustesse = sous_commandes.add_parser('robustesse', help="probabilité de conflit avec des durées variables")
+    ajouter_arguments_conduite(p_robustesse)
+    p_robustesse.add_argument('--variabilite', type=_distribution, action='append', default=[],
+                              metavar='CODE=LOI:ECART',
+                              help="loi des durées d'un type (fixe, normale, uniforme, triangulaire) et écart "
+                                   "en jours, ex. G=normale:2 (défaut : G et M normale 1.5j, E normale 5j)")
+    p_robustesse.add_argument('--repliques', type=entier_positif, default=2000, help="nombre de répliques (défaut : 2000)")
+    p_robustesse.add_argument('--graine', type=int, default=0, help="graine aléatoire (défaut : 0)")
+    p_robustesse.add_argument('--processus', type=entier_positif, default=None, help="processus de calcul (défaut : nombre de cœurs)")
+    p_robustesse.add_argument('--json', action='store_true', help="sortie JSON")
+    p_robustesse.set_defaults(fonction=commande_robustesse)
+
+    p_politiques = sous_commandes.add_parser('politiques', help="comparer les politiques d'affectation des salles")
+    ajouter_arguments_conduite(p_politiques)
+    p_politiques.add_argument('--politique', choices=list(POLITIQUES), action='append', default=[],
+                              help="politique à comparer (répétable ; défaut : toutes)")
+    p_politiques.add_argument('--json', action='store_true', help="sortie JSON")
+    p_politiques.set_defaults(fonction=commande_politiques)
+
+    p_optimiser = sous_commandes.add_parser('optimiser', help="chercher les durées et nombres de salles minimisant le total")
+    p_optimiser.add_argument('--intervalle', type=entier_positif, default=21, help="intervalle entre bandes en jours (défaut : 21)")
+    p_optimiser.add_argument('--vide', type=entier_positif_ou_nul, default=5, help="vide sanitaire minimal en jours (défaut : 5)")
+    p_optimiser.add_argument('--duree-e-min', type=entier_positif, default=110, metavar='JOURS',
+                             help="durée minimale d'Engraissement (défaut : 110)")
+    p_optimiser.add_argument('--tous', action='store_true', help="tous les intervalles standards")
+    p_optimiser.add_argument('--json', action='store_true', help="sortie JSON")
+    p_optimiser.set_defaults(fonction=commande_optimiser)
+
+    p_comparer = sous_commandes.add_parser('comparer', help="comparer la configuration à des variantes")
+    ajouter_arguments_conduite(p_comparer)
+    p_comparer.add_argument('--scenario', type=_scenario, action='append', required=True, metavar='CLE=VALEUR,...',
+                            help="variante de la configuration, répétable (clés : intervalle, vide, duree_xx, nb_xx)")
+    p_comparer.add_argument('--date', type=_date, default=None, help="date de comparaison des états (défaut : aujourd'hui)")
+    p_comparer.add_argument('--json', action='store_true', help="sortie JSON")
+    p_comparer.set_defaults(fonction=commande_comparer)
+
+    p_capacite = sous_commandes.add_parser('capacite', help="affectation en places selon les effectifs du troupeau")
+    ajouter_arguments_conduite(p_capacite)
+    p_capacite.add_argument('--truies', type=entier_positif, default=1000, help="truies présentes (défaut : 1000)")
+    p_capacite.add_argument('--porcelets', type=entier_positif, default=12, help="porcelets sevrés par truie (défaut : 12)")
+    cases = p_capacite.add_argument_group("cases et places (défaut : capacite.CAPACITE_DEFAUT)")
+    for code, nom in TYPES_SALLES.items():
+        cases.add_argument(f'--places-{code.lower()}', type=entier_positif, default=None, metavar='PLACES',
+                           help=f"places par case en {nom}")
+        cases.add_argument(f'--cases-{code.lower()}', type=entier_positif, default=None, metavar='CASES',
+                           help=f"cases par salle en {nom}")
+    p_capacite.add_argument('--json', action='store_true', help="sortie JSON")
+    p_capacite.set_defaults(fonction=commande_capacite)
+
+    p_verifier = sous_commandes.add_parser('verifier', help="comparer les moteurs optimisés à l'affectation de référence")
+    p_verifier.add_argument('--cas', type=entier_positif, default=1000, help="configurations aléatoires (défaut : 1000)")
+    p_verifier.add_argument('--graine', type=int, default=0, help="graine aléatoire (défaut : 0)")
+    p_verifier.add_argument('--processus', type=entier_positif, default=None, help="processus de calcul (défaut : nombre de cœurs)")
+    p_verifier.add_argument('--moteur', choices=MOTEURS_VERIFIES, action='append', default=[],
+                            help="moteur à vérifier (répétable ; défaut : tous)")
+    p_verifier.add_argument('--json', action='store_true', help="sortie JSON")
+    p_verifier.set_defaults(fonction=commande_verifier)
+
+    p_glissant = sous_commandes.add_parser('glissant', help="horizon long à mémoire constante (indicateurs courants)")
+    ajouter_arguments_conduite(p_glissant)
+    p_glissant.add_argument('--historique', default=None, metavar='FICHIER',
+                            help="écrire l'historique complet au fil de l'eau (JSON Lines)")
+    p_glissant.add_argument('--json', action='store_true', help="sortie JSON")
+    p_glissant.set_defaults(fonction=commande_glissant)
+
+    p_lot = sous_commandes.add_parser('lot', help="simuler plusieurs sites en parallèle (lots de sites sur un pool de processus)")
+    ajouter_arguments_conduite(p_lot)
+    p_lot.add_argument('--site', type=_scenario, action='append', default=[], metavar='CLE=VALEUR,...',
+                       help="site : variante de la configuration, répétable (défaut : la configuration seule)")
+    p_lot.add_argument('--date', type=_date, default=None, help="date des états des salles (défaut : aujourd'hui)")
+    p_lot.add_argument('--processus', type=entier_positif, default=None,
+                       help="processus de calcul au plus (défaut : nombre de cœurs)")
+    p_lot.add_argument('--repeter', type=entier_positif, default=1, metavar='N',
+                       help="répéter N fois la liste des sites (lots de mesure)")
+    p_lot.add_argument('--mesurer', action='store_true',
+                       help="comparer les durées : moteur seul, un processus, pool (sans afficher les résultats)")
+    p_lot.add_argument('--json', action='store_true', help="sortie JSON")
+    p_lot.set_defaults(fonction=commande_lot)
+
+    p_alertes = sous_commandes.add_parser('alertes', help="alertes des semaines à venir (tâche planifiée, plusieurs sites)")
+    ajouter_arguments_conduite(p_alertes)
+    p_alertes.add_argument('--site', type=_scenario, action='append', default=[], metavar='CLE=VALEUR,...',
+                           help="site : variante de la configuration, répétable (défaut : la configuration seule)")
+    p_alertes.add_argument('--date', type=_date, default=None, help="début de la fenêtre (défaut : aujourd'hui)")
+    p_alertes.add_argument('--semaines', type=entier_positif, default=4, help="durée de la fenêtre en semaines (défaut : 4)")
+    p_alertes.add_argument('--etat', default=None, metavar='FICHIER',
+                           help="état entre deux passages (JSON) : vérification incrémentale et déduplication")
+    p_alertes.add_argument('--journal', default=None, metavar='FICHIER', help="ajouter les alertes à un fichier JSON Lines")
+    p_alertes.add_argument('--webhook', default=None, metavar='URL', help="envoyer les alertes en POST JSON")
+    p_alertes.add_argument('--json', action='store_true', help="sortie JSON")
+    p_alertes.set_defaults(fonction=commande_alertes)
+
+    p_profil = sous_commandes.add_parser('profil', help="temps d'import et de calcul au démarrage")
+    ajouter_arguments_conduite(p_profil)
+    p_profil.set_defaults(fonction=commande_profil)
+
+    p_api = sous_commandes.add_parser('api', help="servir les états des salles et les affectations en HTTP/JSON")
+    p_api.add_argument('--hote', default='127.0.0.1', help="adresse d'écoute (défaut : 127.0.0.1)")
+    p_api.add_argument('--port', type=int, default=8600, help="port d'écoute (défaut : 8600)")
+    p_api.set_defaults(fonction=commande_api)
+
+    return parser
+
+def main(argv=None):
+    args = creer_parser().parse_args(argv)
+    return args.fonction(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Construit table_standard.bin (affectations précalculées des configurations standard).
+
+    python construire_table_standard.py
+
+À relancer après toute modification de calculer_dimensionnement, des
+générateurs d'occupations ou de la règle d'affectation. Chaque configuration
+est ensuite relue depuis le fichier et comparée au moteur sur plusieurs dates
+de saillie et horizons.
+"""
+import sys
+from datetime import datetime, timedelta
+
+from moteur import (
+    CYCLE_TRUIE_ATTENDU,
+    DATE_SAILLIE_B1_DEFAUT,
+    NB_CYCLES_MAX,
+    TYPES_SALLES,
+    Allocateur,
+    parametres_conduite,
+    salles_config_depuis,
+    calculer_toutes_occupations,
+    affecter_salles_indexe,
+)
+from table_standard import (
+    CHEMIN_TABLE,
+    AUCUN,
+    TableStandard,
+    configurations_standard,
+    periode_lignes,
+    ecrire_table,
+)
+
+def affectations_par_cycle(params):
+    """
+    Simule tous les cycles d'une configuration.
+
+    Returns:
+        dict type_salle -> (lignes, regime) ; lignes[cycle] = bytes (salle, nb_vides) par bande,
+        regime = (bande, cycle) de la première occupation en régime de croisière
+    """
+    allocateur = Allocateur(salles_config_depuis(params), params['vide_sanitaire'])
+    cellules = {type_salle: [[(0, 0)] * params['nb_bandes'] for _ in range(NB_CYCLES_MAX)]
+                for type_salle in TYPES_SALLES.values()}
+    regimes = {}
+
+    for occ in sorted(calculer_toutes_occupations(params), key=lambda x: x['date_entree']):
+        type_salle = occ['type_salle']
+        nb_sur_dim = len(allocateur.sur_dim)
+        en_regime = type_salle in allocateur.dates_regime_croisiere
+
+        num_salle = allocateur.affecter(occ)
+
+        nb_vides = allocateur.sur_dim[-1]['nb_vides'] if len(allocateur.sur_dim) > nb_sur_dim else 0
+        cellules[type_salle][occ['cycle']][occ['bande'] - 1] = (num_salle, nb_vides)
+        if not en_regime and type_salle in allocateur.dates_regime_croisiere:
+            regimes[type_salle] = (occ['bande'], occ['cycle'])
+
+    return {
+        type_salle: ([bytes(v for cellule in ligne for v in cellule) for ligne in lignes], regimes.get(type_salle))
+        for type_salle, lignes in cellules.items()
+    }
+
+def construire(chemin=CHEMIN_TABLE):
+    configurations = []
+    for intervalle_bandes, vide_sanitaire, nb_bandes, durees, nb_salles in configurations_standard():
+        params = parametres_conduite(
+            intervalle_bandes, vide_sanitaire, DATE_SAILLIE_B1_DEFAUT,
+            date_horizon=DATE_SAILLIE_B1_DEFAUT + timedelta(days=(NB_CYCLES_MAX + 1) * CYCLE_TRUIE_ATTENDU)
+        )
+        blocs = {}
+        for type_salle, (lignes, regime) in affectations_par_cycle(params).items():
+            if regime is not None and max(regime) >= AUCUN:
+                raise ValueError(f"Régime de croisière hors format ({intervalle_bandes}j, vide {vide_sanitaire}j)")
+            demarrage, periode = periode_lignes(lignes)
+            blocs[type_salle] = (demarrage, periode, regime, lignes)
+        configurations.append((intervalle_bandes, vide_sanitaire, nb_bandes, durees, nb_salles, blocs))
+    ecrire_table(chemin, configurations)
+    return configurations
+
+def verifier(chemin=CHEMIN_TABLE):
+    """Compare la table au moteur ; retourne la liste des écarts"""
+    table = TableStandard(chemin)
+    ecarts = []
+    for intervalle_bandes, vide_sanitaire in table.repertoire:
+        for date_saillie, jours_avant, annees in ((DATE_SAILLIE_B1_DEFAUT, 5, 1), (datetime(2026, 2, 3), 3, 4),
+                                                  (datetime(2024, 11, 30), 7, 22)):
+            params = parametres_conduite(intervalle_bandes, vide_sanitaire, date_saillie, jours_avant_saillie=jours_avant,
+                                         date_horizon=date_saillie + timedelta(days=365 * annees))
+            occupations = calculer_toutes_occupations(params)
+            attendu = affecter_salles_indexe(occupations, salles_config_depuis(params), vide_sanitaire)
+            lu = table.planning(params)
+            obtenu = (lu['salles_disponibilite'], lu['conflits'], lu['sur_dim'], lu['dates_regime'])
+            cle = lambda occ: occ['id_unique']
+            if obtenu != attendu or sorted(lu['occupations'], key=cle) != sorted(occupations, key=cle):
+                ecarts.append((intervalle_bandes, vide_sanitaire, date_saillie, jours_avant, annees))
+    return ecarts
+
+def main():
+    configurations = construire()
+    ecarts = verifier()
+    for intervalle_bandes, vide_sanitaire, nb_bandes, _, _, blocs in configurations:
+        periodes = ' '.join(f"{code}:{blocs[nom][0]}+{blocs[nom][1]}" for code, nom in TYPES_SALLES.items())
+        print(f"{intervalle_bandes:>2}j vide {vide_sanitaire}j ({nb_bandes} bandes) - cycles démarrage+période : {periodes}")
+    print(f"{CHEMIN_TABLE} : {len(configurations)} configurations")
+    for ecart in ecarts:
+        print(f"ÉCART avec le moteur : {ecart}", file=sys.stderr)
+    return 1 if ecarts else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
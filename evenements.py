@@ -0,0 +1,282 @@
+"""
+Journal des événements réels et réconciliation incrémentale avec le planning.
+
+Le journal (CSV ou JSON Lines) contient une ligne par événement :
+
+    date,evenement,type_salle,bande,cycle,salle,date_fin
+    2026-01-12,entree,M,3,2,1,
+    2026-02-14,sortie,M,3,2,,
+    2026-03-01,hors_service,E,,,4,2026-03-20
+
+- entree : entrée réelle de la bande (cycle) dans le type de salle ; `salle` (optionnelle) impose la salle
+- sortie : sortie réelle de la bande (cycle) du type de salle
+- hors_service : la salle est indisponible de `date` à `date_fin` (horizon si vide), puis suit un vide sanitaire
+
+`type_salle` accepte le code (AS, G, M, PS, E) ou le nom complet.
+"""
+import csv
+import json
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+
+from moteur import (
+    TYPES_SALLES,
+    salles_config_depuis,
+    calculer_toutes_occupations,
+    Allocateur,
+)
+
+TYPES_EVENEMENTS = ('entree', 'sortie', 'hors_service')
+
+# Nombre d'occupations affectées entre deux instantanés de l'allocateur
+PAS_INSTANTANE = 64
+
+# ============================================================================
+# LECTURE DU JOURNAL
+# ============================================================================
+
+def _date(texte):
+    if isinstance(texte, datetime):
+        return texte
+    return datetime.strptime(texte, '%Y-%m-%d')
+
+def _entier(texte):
+    if texte is None or texte == '':
+        return None
+    return int(texte)
+
+def _code_type(type_salle):
+    return next(code for code, nom in TYPES_SALLES.items() if nom == type_salle)
+
+def _prefixe(evt):
+    """Début des messages d'erreur : ligne du journal si l'événement en vient"""
+    return f"Journal des événements, ligne {evt['ligne']} : " if evt.get('ligne') is not None else ""
+
+def verifier_salle(evt, nb_salles):
+    """Numéro de salle de l'événement (s'il y en a un) entre 1 et le nombre de salles du type"""
+    if evt['salle'] is None:
+        return
+    nb = nb_salles[_code_type(evt['type_salle'])]
+    if not 1 <= evt['salle'] <= nb:
+        raise ValueError(f"{_prefixe(evt)}salle {evt['salle']} inexistante en {evt['type_salle']} "
+                         f"(salles 1 à {nb})")
+
+def normaliser_evenement(brut, params=None):
+    """
+    Valide un événement brut (valeurs texte) et retourne sa forme normalisée.
+    Avec `params`, le numéro de salle est aussi vérifié (nombre de salles du type).
+    """
+    evenement = brut.get('evenement')
+    if evenement not in TYPES_EVENEMENTS:
+        raise ValueError(f"Événement inconnu : {evenement!r} (attendu : {', '.join(TYPES_EVENEMENTS)})")
+
+    type_salle = TYPES_SALLES.get(brut.get('type_salle'), brut.get('type_salle'))
+    if type_salle not in TYPES_SALLES.values():
+        raise ValueError(f"Type de salle inconnu : {brut.get('type_salle')!r}")
+
+    normalise = {
+        'date': _date(brut['date']),
+        'evenement': evenement,
+        'type_salle': type_salle,
+        'bande': _entier(brut.get('bande')),
+        'cycle': _entier(brut.get('cycle')),
+        'salle': _entier(brut.get('salle')),
+        'date_fin': _date(brut['date_fin']) if brut.get('date_fin') else None
+    }
+
+    if evenement == 'hors_service':
+        if normalise['salle'] is None:
+            raise ValueError("Un événement hors_service doit indiquer la salle")
+        if normalise['date_fin'] is not None and normalise['date_fin'] < normalise['date']:
+            raise ValueError(f"date_fin ({normalise['date_fin']:%Y-%m-%d}) antérieure à la date "
+                             f"({normalise['date']:%Y-%m-%d})")
+    elif normalise['bande'] is None or normalise['cycle'] is None:
+        raise ValueError(f"Un événement {evenement} doit indiquer la bande et le cycle")
+
+    if params is not None:
+        verifier_salle(normalise, params['nb_salles'])
+
+    return normalise
+
+def lire_evenements(flux, format_journal='csv', params=None):
+    """
+    Lit un journal depuis un flux texte ('csv' ou 'jsonl'). Chaque événement
+    garde son numéro de 'ligne' pour les erreurs détectées à la fusion.
+    """
+    if format_journal == 'jsonl':
+        bruts = (json.loads(ligne) for ligne in flux if ligne.strip())
+    else:
+        bruts = csv.DictReader(flux)
+
+    evenements = []
+    for num_ligne, brut in enumerate(bruts, start=1):
+        try:
+            evenement = normaliser_evenement(brut, params)
+        except (KeyError, ValueError) as exc:
+            raise ValueError(f"Journal des événements, ligne {num_ligne} : {exc}") from exc
+        evenement['ligne'] = num_ligne
+        evenements.append(evenement)
+    return evenements
+
+def charger_evenements(chemin, params=None):
+    """Charge un journal CSV (ou JSON Lines si l'extension est .jsonl)"""
+    format_journal = 'jsonl' if chemin.endswith('.jsonl') else 'csv'
+    with open(chemin, encoding='utf-8', newline='') as flux:
+        return lire_evenements(flux, format_journal, params)
+
+# ============================================================================
+# FUSION AVEC LE PLANNING THÉORIQUE
+# ============================================================================
+
+def fusionner_evenements(occupations, evenements, date_horizon, nb_salles=None):
+    """
+    Applique les événements réels aux occupations planifiées.
+
+    Lève ValueError (avec la ligne du journal) pour une salle hors de
+    `nb_salles` ou une occupation dont la sortie précède l'entrée.
+
+    Returns:
+        liste d'occupations (nouveaux dicts pour celles modifiées, ajout des périodes
+        hors service), chacune avec une clé 'ordre' qui départage les entrées du même jour
+    """
+    par_cle = {(occ['type_salle'], occ['bande'], occ['cycle']): i for i, occ in enumerate(occupations)}
+    modifiees = {}
+    derniers = {}
+    hors_service = []
+
+    for evt in sorted(evenements, key=lambda e: e['date']):
+        if nb_salles is not None:
+            verifier_salle(evt, nb_salles)
+        if evt['evenement'] == 'hors_service':
+            code = _code_type(evt['type_salle'])
+            date_fin = max(evt['date_fin'] or date_horizon, evt['date'])
+            hors_service.append({
+                'bande': None,
+                'cycle': None,
+                'type_salle': evt['type_salle'],
+                'date_entree': evt['date'],
+                'date_sortie': date_fin,
+                'duree_totale': (date_fin - evt['date']).days,
+                'id_unique': f"HS_{code}{evt['salle']}_{evt['date']:%Y%m%d}",
+                'salle_imposee': evt['salle'] - 1,
+                'hors_service': True
+            })
+            continue
+
+        i = par_cle.get((evt['type_salle'], evt['bande'], evt['cycle']))
+        if i is None:
+            raise ValueError(f"{_prefixe(evt)}aucune occupation planifiée pour {evt['type_salle']} bande {evt['bande']} "
+                             f"cycle {evt['cycle']} (événement du {evt['date']:%d/%m/%Y})")
+
+        occ = modifiees.setdefault(i, dict(occupations[i], reel=True))
+        if evt['evenement'] == 'entree':
+            occ['date_entree'] = evt['date']
+            if evt['salle'] is not None:
+                occ['salle_imposee'] = evt['salle'] - 1
+        else:
+            occ['date_sortie'] = evt['date']
+        occ['duree_totale'] = (occ['date_sortie'] - occ['date_entree']).days
+        derniers[i] = evt
+
+    # Vérifié une fois tous les événements appliqués (une entrée retardée peut précéder la sortie réelle)
+    for i, occ in modifiees.items():
+        if occ['date_sortie'] < occ['date_entree']:
+            raise ValueError(f"{_prefixe(derniers[i])}sortie ({occ['date_sortie']:%d/%m/%Y}) avant l'entrée "
+                             f"({occ['date_entree']:%d/%m/%Y}) pour {occ['type_salle']} bande {occ['bande']} "
+                             f"cycle {occ['cycle']}")
+
+    fusion = [dict(modifiees.get(i, occ), ordre=i) for i, occ in enumerate(occupations)]
+    fusion.extend(dict(occ, ordre=len(occupations) + j) for j, occ in enumerate(hors_service))
+    return fusion
+
+def _signature(occ):
+    return (occ['id_unique'], occ['date_entree'], occ['date_sortie'], occ.get('salle_imposee'))
+
+def premiere_date_modifiee(anciennes, nouvelles):
+    """Plus petite date d'entrée (ancienne ou nouvelle) parmi les occupations qui diffèrent"""
+    differences = Counter(map(_signature, anciennes))
+    differences.subtract(map(_signature, nouvelles))
+    dates = [signature[1] for signature, nb in differences.items() if nb]
+    return min(dates) if dates else None
+
+# ============================================================================
+# PLANNING RÉCONCILIÉ
+# ============================================================================
+
+class PlanningReconcilie:
+    """
+    Planning théorique corrigé par le journal des événements réels.
+
+    L'affectation est faite par un Allocateur dont l'état est figé toutes les
+    PAS_INSTANTANE occupations. Quand le journal change, seules les occupations
+    entrant à partir de la première date modifiée sont réaffectées, en repartant
+    du dernier instantané antérieur à cette date.
+    """
+
+    def __init__(self, params, evenements=(), pas_instantane=PAS_INSTANTANE):
+        self.params = params
+        self.pas_instantane = pas_instantane
+        self._occupations_planifiees = calculer_toutes_occupations(params)
+        self._allocateur = Allocateur(salles_config_depuis(params), params['vide_sanitaire'])
+
+        self.evenements = []
+        self.occupations = []
+        # (nb d'occupations déjà affectées, date d'entrée de la dernière, instantané)
+        self._instantanes = [(0, None, self._allocateur.instantane())]
+        self.nb_reaffectees = 0
+
+        self.mettre_a_jour(list(evenements))
+
+    def ajouter_evenements(self, evenements):
+        """Ajoute des événements au journal et réconcilie le planning"""
+        return self.mettre_a_jour(self.evenements + list(evenements))
+
+    def mettre_a_jour(self, evenements):
+        """
+        Remplace le journal complet et réaffecte à partir de la première date modifiée.
+
+        Returns:
+            nombre d'occupations réaffectées
+        """
+        nouvelles = sorted(
+            fusionner_evenements(self._occupations_planifiees, evenements, self.params['date_horizon'],
+                                 self.params['nb_salles']),
+            key=lambda occ: (occ['date_entree'], occ['ordre'])
+        )
+
+        if self.occupations:
+            date_changement = premiere_date_modifiee(self.occupations, nouvelles)
+        else:
+            date_changement = nouvelles[0]['date_entree'] if nouvelles else None
+
+        self.evenements = list(evenements)
+        self.occupations = nouvelles
+        if date_changement is None:
+            self.nb_reaffectees = 0
+            return 0
+
+        # Dernier instantané dont toutes les occupations affectées sont antérieures au changement
+        dates = [date for _, date, _ in self._instantanes[1:]]
+        k = bisect_left(dates, date_changement)
+        del self._instantanes[k + 1:]
+        debut, _, instantane = self._instantanes[k]
+        self._allocateur.restaurer(instantane)
+
+        for i in range(debut, len(nouvelles)):
+            if i > debut and i % self.pas_instantane == 0:
+                self._instantanes.append((i, nouvelles[i - 1]['date_entree'], self._allocateur.instantane()))
+            self._allocateur.affecter(nouvelles[i])
+
+        self.nb_reaffectees = len(nouvelles) - debut
+        return self.nb_reaffectees
+
+    def planning(self):
+        """Résultat au format de moteur.calculer_planning"""
+        return {
+            'occupations': self.occupations,
+            'salles_disponibilite': self._allocateur.salles,
+            'conflits': self._allocateur.conflits,
+            'sur_dim': self._allocateur.sur_dim,
+            'dates_regime': self._allocateur.dates_regime_croisiere
+        }
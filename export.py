@@ -0,0 +1,267 @@
+"""
+Export du planning d'affectation des salles (CSV, Parquet, ICS).
+
+Les lignes sont produites à la demande et écrites par lots de `taille_lot` :
+le coût mémoire de l'écriture ne dépend pas de la longueur de la fenêtre exportée.
+Sans journal d'événements, les affectations elles-mêmes sont calculées au fil
+de l'eau (glissant.AllocateurGlissant), pour un ou plusieurs sites : la mémoire
+ne dépend alors ni de la fenêtre ni de l'horizon.
+"""
+import csv
+import heapq
+import io
+import sys
+from datetime import datetime, timedelta, timezone
+
+FORMATS_EXPORT = ('csv', 'parquet', 'ics')
+
+TYPES_MIME = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'ics': 'text/calendar'
+}
+
+COLONNES_EXPORT = [
+    'type_salle', 'salle', 'bande', 'cycle',
+    'date_entree', 'date_sortie', 'date_liberation', 'id_unique'
+]
+
+# Export de plusieurs sites : une colonne de plus, en tête
+COLONNES_SITES = ['site'] + COLONNES_EXPORT
+
+COLONNES_DATES = ('date_entree', 'date_sortie', 'date_liberation')
+
+TAILLE_LOT = 10000
+
+# ============================================================================
+# PARCOURS DES AFFECTATIONS
+# ============================================================================
+
+def valeur_json(valeur):
+    """Sérialisation JSON des dates (paramètre `default` de json.dump)"""
+    if isinstance(valeur, datetime):
+        return valeur.strftime('%Y-%m-%d')
+    raise TypeError(f"Type non sérialisable : {type(valeur).__name__}")
+
+def _ligne(type_salle, num_salle, occ):
+    return {
+        'type_salle': type_salle,
+        'salle': num_salle + 1,
+        'bande': occ['bande'],
+        'cycle': occ['cycle'],
+        'date_entree': occ['date_entree'],
+        'date_sortie': occ['date_sortie'],
+        'date_liberation': occ['date_liberation'],
+        'id_unique': occ['id_unique']
+    }
+
+def _lignes_salle(type_salle, num_salle, historique):
+    """Lignes d'export d'une salle, dans l'ordre des entrées"""
+    for occ in historique:
+        yield _ligne(type_salle, num_salle, occ)
+
+def parametres_export(params, date_fin):
+    """Paramètres dont l'horizon couvre exactement les occupations entrées jusqu'à date_fin"""
+    return dict(params, date_horizon=date_fin + timedelta(days=params['jours_avant_saillie']))
+
+def iterer_affectations(salles_disponibilite, date_debut=None, date_fin=None):
+    """
+    Parcourt les affectations qui chevauchent la fenêtre [date_debut, date_fin],
+    triées par date d'entrée (fusion des historiques, déjà triés, de chaque salle).
+    """
+    flux = [
+        _lignes_salle(type_salle, salle['num_salle'], salle['historique'])
+        for type_salle, salles in salles_disponibilite.items()
+        for salle in salles
+    ]
+
+    for ligne in heapq.merge(*flux, key=lambda l: l['date_entree']):
+        if date_fin is not None and ligne['date_entree'] > date_fin:
+            break
+        if date_debut is not None and ligne['date_liberation'] <= date_debut:
+            continue
+        yield ligne
+
+class _DernieresLignes:
+    """Puits du mode glissant : lignes d'export des dernières occupations affectées"""
+
+    def __init__(self):
+        self.lignes = []
+
+    def occupation(self, type_salle, num_salle, entree, vide_reel):
+        self.lignes.append(_ligne(type_salle, num_salle, entree))
+
+    def conflit(self, conflit):
+        pass
+
+    def sur_dimensionnement(self, sur_dim):
+        pass
+
+def iterer_affectations_glissantes(params, date_debut=None, date_fin=None):
+    """
+    Comme iterer_affectations, sans construire le planning : les occupations
+    sont produites et affectées au fil de l'eau, à mémoire constante. L'horizon
+    est celui de date_fin (celui des paramètres sans date_fin).
+    """
+    from glissant import AllocateurGlissant, iterer_occupations
+    from moteur import salles_config_depuis
+
+    if date_fin is not None:
+        params = parametres_export(params, date_fin)
+    puits = _DernieresLignes()
+    allocateur = AllocateurGlissant(salles_config_depuis(params), params['vide_sanitaire'], [puits])
+    for occ in iterer_occupations(params):
+        if date_fin is not None and occ['date_entree'] > date_fin:
+            return
+        allocateur.affecter(occ)
+        for ligne in puits.lignes:
+            if date_debut is None or ligne['date_liberation'] > date_debut:
+                yield ligne
+        puits.lignes.clear()
+
+def _lignes_site(nom, params, date_debut, date_fin):
+    for ligne in iterer_affectations_glissantes(params, date_debut, date_fin):
+        ligne['site'] = nom
+        yield ligne
+
+def iterer_affectations_sites(sites, date_debut=None, date_fin=None):
+    """
+    Affectations de plusieurs sites (liste de (nom, params)) sur la fenêtre,
+    fusionnées par date d'entrée, avec la colonne 'site' (COLONNES_SITES).
+    """
+    return heapq.merge(*(_lignes_site(nom, params, date_debut, date_fin) for nom, params in sites),
+                       key=lambda l: l['date_entree'])
+
+def _par_lots(lignes, taille_lot):
+    """Regroupe un itérable de lignes en listes d'au plus taille_lot éléments"""
+    lot = []
+    for ligne in lignes:
+        lot.append(ligne)
+        if len(lot) >= taille_lot:
+            yield lot
+            lot = []
+    if lot:
+        yield lot
+
+# ============================================================================
+# ÉCRITURE PAR FORMAT
+# ============================================================================
+
+def ecrire_csv(lignes, flux, taille_lot=TAILLE_LOT, colonnes=COLONNES_EXPORT):
+    """Écrit les lignes en CSV (dates ISO) dans un flux texte. Retourne le nombre de lignes."""
+    writer = csv.writer(flux)
+    writer.writerow(colonnes)
+
+    nb_lignes = 0
+    for lot in _par_lots(lignes, taille_lot):
+        writer.writerows([
+            [l[c].strftime('%Y-%m-%d') if c in COLONNES_DATES else l[c] for c in colonnes]
+            for l in lot
+        ])
+        nb_lignes += len(lot)
+    return nb_lignes
+
+def ecrire_parquet(lignes, destination, taille_lot=TAILLE_LOT, colonnes=COLONNES_EXPORT):
+    """
+    Écrit les lignes en Parquet (un groupe de lignes par lot) vers un chemin
+    ou un flux binaire. Retourne le nombre de lignes.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("L'export Parquet nécessite pyarrow (pip install pyarrow)") from exc
+
+    types = {
+        'site': pa.string(),
+        'type_salle': pa.string(),
+        'salle': pa.int32(),
+        'bande': pa.int32(),
+        'cycle': pa.int32(),
+        'date_entree': pa.date32(),
+        'date_sortie': pa.date32(),
+        'date_liberation': pa.date32(),
+        'id_unique': pa.string()
+    }
+    schema = pa.schema([(c, types[c]) for c in colonnes])
+
+    nb_lignes = 0
+    with pq.ParquetWriter(destination, schema) as writer:
+        for lot in _par_lots(lignes, taille_lot):
+            valeurs = {
+                c: [l[c].date() if c in COLONNES_DATES else l[c] for l in lot]
+                for c in colonnes
+            }
+            writer.write_batch(pa.RecordBatch.from_pydict(valeurs, schema=schema))
+            nb_lignes += len(lot)
+    return nb_lignes
+
+def ecrire_ics(lignes, flux, taille_lot=TAILLE_LOT, colonnes=COLONNES_EXPORT):
+    """
+    Écrit les lignes en calendrier iCalendar (un événement « journée entière »
+    par occupation, préfixé par le site si 'site' est dans colonnes) dans un
+    flux texte. Retourne le nombre de lignes.
+    """
+    avec_site = 'site' in colonnes
+    horodatage = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+    flux.write("BEGIN:VCALENDAR\r\n"
+               "VERSION:2.0\r\n"
+               "PRODID:-//Gestion Salles Elevage Porcin//FR\r\n"
+               "CALSCALE:GREGORIAN\r\n")
+
+    nb_lignes = 0
+    for lot in _par_lots(lignes, taille_lot):
+        evenements = []
+        for l in lot:
+            objet = "Hors service" if l['bande'] is None else f"Bande {l['bande']}"
+            site = f"{l['site']}-" if avec_site else ''
+            prefixe = f"[{l['site']}] " if avec_site else ''
+            evenements.append(
+                "BEGIN:VEVENT\r\n"
+                f"UID:{site}{l['id_unique']}-S{l['salle']}@gestion-salles\r\n"
+                f"DTSTAMP:{horodatage}\r\n"
+                f"DTSTART;VALUE=DATE:{l['date_entree'].strftime('%Y%m%d')}\r\n"
+                f"DTEND;VALUE=DATE:{l['date_sortie'].strftime('%Y%m%d')}\r\n"
+                f"SUMMARY:{prefixe}{objet} - {l['type_salle']} {l['salle']}\r\n"
+                f"DESCRIPTION:Cycle {l['cycle']} - vide sanitaire jusqu'au "
+                f"{l['date_liberation'].strftime('%d/%m/%Y')}\r\n"
+                "END:VEVENT\r\n"
+            )
+        flux.write(''.join(evenements))
+        nb_lignes += len(lot)
+
+    flux.write("END:VCALENDAR\r\n")
+    return nb_lignes
+
+# ============================================================================
+# POINTS D'ENTRÉE
+# ============================================================================
+
+def exporter_fichier(lignes, format_export, chemin, taille_lot=TAILLE_LOT, colonnes=COLONNES_EXPORT):
+    """Exporte vers un fichier ('-' = sortie standard). Retourne le nombre de lignes."""
+    if format_export not in FORMATS_EXPORT:
+        raise ValueError(f"Format d'export inconnu : {format_export} (attendu : {', '.join(FORMATS_EXPORT)})")
+
+    if format_export == 'parquet':
+        destination = sys.stdout.buffer if chemin == '-' else chemin
+        return ecrire_parquet(lignes, destination, taille_lot, colonnes)
+
+    ecrire = ecrire_csv if format_export == 'csv' else ecrire_ics
+    if chemin == '-':
+        return ecrire(lignes, sys.stdout, taille_lot, colonnes)
+    with open(chemin, 'w', encoding='utf-8', newline='') as flux:
+        return ecrire(lignes, flux, taille_lot, colonnes)
+
+def exporter_octets(lignes, format_export, taille_lot=TAILLE_LOT, colonnes=COLONNES_EXPORT):
+    """Exporte en mémoire (bouton de téléchargement de l'interface)"""
+    if format_export == 'parquet':
+        import pyarrow as pa
+        tampon = pa.BufferOutputStream()
+        ecrire_parquet(lignes, tampon, taille_lot, colonnes)
+        return tampon.getvalue().to_pybytes()
+
+    tampon = io.StringIO(newline='')
+    ecrire = ecrire_csv if format_export == 'csv' else ecrire_ics
+    ecrire(lignes, tampon, taille_lot, colonnes)
+    return tampon.getvalue().encode('utf-8')
@@ -0,0 +1,326 @@
+"""
+Simulation sur un horizon long à mémoire constante (fenêtre glissante).
+
+Le moteur complet matérialise toutes les occupations jusqu'à l'horizon et
+garde l'historique de chaque salle. Ici :
+
+- les occupations sont produites à la demande, par une fusion (heapq.merge)
+  des suites de chaque bande dans chaque type de salle, dans l'ordre exact de
+  l'affectation du moteur : date d'entrée, puis truies avant produits, bande,
+  cycle, type de salle ;
+- l'allocateur ne garde par salle que l'état minimal (date de libération,
+  dernière sortie, dernière bande) ;
+- occupations, conflits et surdimensionnements passent au fil de l'eau à des
+  puits : indicateurs courants (IndicateursCourants) et/ou historique complet
+  écrit sur disque (HistoriqueDisque, JSON Lines).
+
+La mémoire ne dépend que du nombre de bandes et de salles, pas de l'horizon.
+Les générateurs du moteur s'arrêtent à NB_CYCLES_MAX cycles (environ 20 ans) ;
+par défaut le mode glissant continue jusqu'à l'horizon demandé, et donne les
+mêmes affectations en deçà.
+"""
+import heapq
+import json
+from datetime import timedelta
+
+from moteur import (
+    CYCLE_TRUIE_ATTENDU,
+    DATE_LIBERATION_INITIALE,
+    TYPES_SALLES,
+    Allocateur,
+    salles_config_depuis,
+)
+from export import valeur_json
+
+TYPES_TRUIES = ('AS', 'G', 'M')
+TYPES_PRODUITS = ('PS', 'E')
+
+# ============================================================================
+# OCCUPATIONS À LA DEMANDE
+# ============================================================================
+
+def _suite_truies(params, bande, rang, cycles_max=None):
+    """Occupations d'une bande dans un type de salle truies, cycle après cycle"""
+    code = TYPES_TRUIES[rang]
+    durees = params['durees']
+    decalage = timedelta(days=sum(durees[c] for c in TYPES_TRUIES[:rang]) - params['jours_avant_saillie'])
+    duree = timedelta(days=durees[code])
+    date_saillie_bande = params['date_saillie_b1'] + timedelta(days=(bande - 1) * params['intervalle_bandes'])
+
+    cycle = 0
+    while cycles_max is None or cycle < cycles_max:
+        date_saillie_cycle = date_saillie_bande + timedelta(days=cycle * CYCLE_TRUIE_ATTENDU)
+        if date_saillie_cycle > params['date_horizon']:
+            return
+        date_entree = date_saillie_cycle + decalage
+        occ = {
+            'bande': bande,
+            'cycle': cycle,
+            'type_salle': TYPES_SALLES[code],
+            'date_entree': date_entree,
+            'date_sortie': date_entree + duree,
+            'duree_totale': durees[code],
+            'id_unique': f"B{bande}_C{cycle}_{code}"
+        }
+        if code == 'M':
+            occ['date_sevrage'] = occ['date_sortie']
+        yield (date_entree, 0, bande, cycle, rang), occ
+        cycle += 1
+
+def _suite_produits(params, bande, rang, cycles_max=None):
+    """Occupations d'une bande dans un type de salle produits, cycle après cycle"""
+    code = TYPES_PRODUITS[rang]
+    durees = params['durees']
+    decalage = timedelta(days=sum(durees[c] for c in TYPES_PRODUITS[:rang]))
+    duree = timedelta(days=durees[code])
+    date_saillie_bande = params['date_saillie_b1'] + timedelta(days=(bande - 1) * params['intervalle_bandes'])
+    date_entree_as_bande = date_saillie_bande - timedelta(days=params['jours_avant_saillie'])
+
+    cycle = 0
+    while cycles_max is None or cycle < cycles_max:
+        date_sevrage = date_entree_as_bande + timedelta(days=(cycle + 1) * CYCLE_TRUIE_ATTENDU)
+        if date_sevrage > params['date_horizon']:
+            return
+        date_entree = date_sevrage + decalage
+        yield (date_entree, 1, bande, cycle, rang), {
+            'bande': bande,
+            'cycle': cycle,
+            'type_salle': TYPES_SALLES[code],
+            'date_entree': date_entree,
+            'date_sortie': date_entree + duree,
+            'duree_totale': durees[code],
+            'date_sevrage': date_sevrage,
+            'id_unique': f"B{bande}_S{cycle}_{code}"
+        }
+        cycle += 1
+
+def iterer_occupations(params, codes=None, cycles_max=None):
+    """
+    Occupations dans l'ordre d'affectation, sans les matérialiser.
+
+    Args:
+        codes: types de salle à produire (défaut : tous)
+        cycles_max: cycles au plus par bande (défaut : jusqu'à l'horizon)
+
+    Même suite que sorted(calculer_toutes_occupations(params), key=date_entree)
+    avec cycles_max=NB_CYCLES_MAX.
+    """
+    codes = TYPES_SALLES if codes is None else codes
+    suites = []
+    for bande in range(1, params['nb_bandes'] + 1):
+        suites.extend(_suite_truies(params, bande, rang, cycles_max)
+                      for rang, code in enumerate(TYPES_TRUIES) if code in codes)
+        suites.extend(_suite_produits(params, bande, rang, cycles_max)
+                      for rang, code in enumerate(TYPES_PRODUITS) if code in codes)
+    for _, occ in heapq.merge(*suites):
+        yield occ
+
+# ============================================================================
+# PUITS
+# ============================================================================
+
+class IndicateursCourants:
+    """Indicateurs par type de salle, mis à jour à chaque événement (mémoire constante)"""
+
+    def __init__(self, salles_config):
+        self.salles_config = dict(salles_config)
+        self.par_type = {
+            type_salle: {
+                'occupations': 0, 'jours_occupation': 0, 'conflits': 0, 'jours_chevauchement': 0,
+                'sur_dimensionnements': 0, 'nb_vides': 0, 'somme_vides': 0, 'vide_min': None,
+                'vide_max': None, 'debut': None, 'fin': None
+            }
+            for type_salle in salles_config
+        }
+
+    def occupation(self, type_salle, num_salle, entree, vide_reel):
+        stats = self.par_type[type_salle]
+        stats['occupations'] += 1
+        stats['jours_occupation'] += entree['duree_totale']
+        if stats['debut'] is None:
+            stats['debut'] = entree['date_entree']
+        stats['fin'] = entree['date_sortie'] if stats['fin'] is None else max(stats['fin'], entree['date_sortie'])
+        if vide_reel is not None:
+            stats['nb_vides'] += 1
+            stats['somme_vides'] += vide_reel
+            stats['vide_min'] = vide_reel if stats['vide_min'] is None else min(stats['vide_min'], vide_reel)
+            stats['vide_max'] = vide_reel if stats['vide_max'] is None else max(stats['vide_max'], vide_reel)
+
+    def conflit(self, conflit):
+        stats = self.par_type[conflit['type_salle']]
+        stats['conflits'] += 1
+        stats['jours_chevauchement'] += conflit['jours_chevauchement']
+
+    def sur_dimensionnement(self, sur_dim):
+        self.par_type[sur_dim['type_salle']]['sur_dimensionnements'] += 1
+
+    def resume(self):
+        """
+        Returns:
+            dict type_salle -> occupations, conflits, jours_chevauchement,
+            sur_dimensionnements, vide_moyen / vide_min / vide_max (jours entre deux
+            bandes dans une même salle) et taux_occupation (jours d'occupation sur
+            salles x jours entre la première entrée et la dernière sortie)
+        """
+        resume = {}
+        for type_salle, stats in self.par_type.items():
+            periode = (stats['fin'] - stats['debut']).days if stats['debut'] is not None else 0
+            capacite = self.salles_config[type_salle] * periode
+            resume[type_salle] = {
+                'occupations': stats['occupations'],
+                'conflits': stats['conflits'],
+                'jours_chevauchement': stats['jours_chevauchement'],
+                'sur_dimensionnements': stats['sur_dimensionnements'],
+                'vide_moyen': stats['somme_vides'] / stats['nb_vides'] if stats['nb_vides'] else None,
+                'vide_min': stats['vide_min'],
+                'vide_max': stats['vide_max'],
+                'taux_occupation': stats['jours_occupation'] / capacite if capacite else 0.0
+            }
+        return resume
+
+class HistoriqueDisque:
+    """
+    Historique complet écrit au fil de l'eau, une ligne JSON par événement :
+    {'evenement': 'occupation' | 'conflit' | 'sur_dim', ...}. À fermer après usage
+    (ou à utiliser avec `with`).
+    """
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self._fichier = open(chemin, 'w', encoding='utf-8')
+
+    def _ecrire(self, evenement, donnees):
+        self._fichier.write(json.dumps(dict(donnees, evenement=evenement), default=valeur_json, ensure_ascii=False))
+        self._fichier.write('\n')
+
+    def occupation(self, type_salle, num_salle, entree, vide_reel):
+        self._ecrire('occupation', dict(entree, type_salle=type_salle, salle=num_salle + 1, vide_reel=vide_reel))
+
+    def conflit(self, conflit):
+        self._ecrire('conflit', conflit)
+
+    def sur_dimensionnement(self, sur_dim):
+        self._ecrire('sur_dim', sur_dim)
+
+    def fermer(self):
+        self._fichier.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+def relire_historique(chemin):
+    """Événements d'un historique écrit par HistoriqueDisque, un à la fois"""
+    with open(chemin, encoding='utf-8') as fichier:
+        for ligne in fichier:
+            yield json.loads(ligne)
+
+# ============================================================================
+# ALLOCATEUR GLISSANT
+# ============================================================================
+
+class AllocateurGlissant(Allocateur):
+    """
+    Allocateur (mêmes règles, mêmes politiques) sans historique en mémoire :
+    chaque salle garde sa date de libération, sa dernière sortie et sa dernière
+    bande (son 'historique' hérité reste vide) ; les résultats vont aux puits.
+
+    instantane / restaurer portent sur cet état minimal ; les événements déjà
+    transmis aux puits après l'instantané ne leur sont pas retirés.
+    """
+
+    def __init__(self, salles_config, vide_sanitaire, puits=(), politique=None):
+        super().__init__(salles_config, vide_sanitaire, politique=politique)
+        self.puits = list(puits)
+        for type_salle, salles in self.salles.items():
+            for salle in salles:
+                salle['type_salle'] = type_salle
+                salle['derniere_sortie'] = None
+                salle['derniere_bande'] = None
+        self.nb_occupations = 0
+        self.nb_conflits = 0
+        self.nb_sur_dim = 0
+
+    def _enregistrer_conflit(self, conflit):
+        self.nb_conflits += 1
+        for puits in self.puits:
+            puits.conflit(conflit)
+
+    def _enregistrer_sur_dim(self, sur_dim):
+        self.nb_sur_dim += 1
+        for puits in self.puits:
+            puits.sur_dimensionnement(sur_dim)
+
+    def _enregistrer_occupation(self, salle, entree_historique):
+        vide_reel = None
+        if salle['derniere_sortie'] is not None:
+            vide_reel = (entree_historique['date_entree'] - salle['derniere_sortie']).days
+        salle['derniere_sortie'] = entree_historique['date_sortie']
+        salle['derniere_bande'] = entree_historique['bande']
+        self.nb_occupations += 1
+        for puits in self.puits:
+            puits.occupation(salle['type_salle'], salle['num_salle'], entree_historique, vide_reel)
+
+    def instantane(self):
+        """État courant : celui de l'allocateur, plus dernière sortie et dernière bande de chaque salle"""
+        instantane = super().instantane()
+        instantane['glissant'] = {
+            'salles': {
+                type_salle: [(s['derniere_sortie'], s['derniere_bande']) for s in salles]
+                for type_salle, salles in self.salles.items()
+            },
+            'compteurs': (self.nb_occupations, self.nb_conflits, self.nb_sur_dim)
+        }
+        return instantane
+
+    def restaurer(self, instantane):
+        """Revient à un instantané pris plus tôt sur ce même allocateur"""
+        super().restaurer(instantane)
+        glissant = instantane['glissant']
+        for type_salle, etats in glissant['salles'].items():
+            for salle, (derniere_sortie, derniere_bande) in zip(self.salles[type_salle], etats):
+                salle['derniere_sortie'] = derniere_sortie
+                salle['derniere_bande'] = derniere_bande
+        self.nb_occupations, self.nb_conflits, self.nb_sur_dim = glissant['compteurs']
+
+    def etats(self):
+        """État minimal de chaque salle : type_salle -> liste de dicts"""
+        return {
+            type_salle: [
+                {
+                    'num_salle': salle['num_salle'],
+                    'date_liberation': None if salle['date_liberation'] == DATE_LIBERATION_INITIALE else salle['date_liberation'],
+                    'derniere_bande': salle['derniere_bande']
+                }
+                for salle in salles
+            ]
+            for type_salle, salles in self.salles.items()
+        }
+
+def simuler_glissant(params, puits=(), politique=None):
+    """
+    Affecte toutes les occupations jusqu'à l'horizon à mémoire constante.
+
+    Args:
+        puits: puits supplémentaires (ex. HistoriqueDisque)
+
+    Returns:
+        dict avec 'indicateurs' (IndicateursCourants.resume), 'nb_occupations',
+        'nb_conflits', 'nb_sur_dim', 'dates_regime' et 'etats' (état final des salles)
+    """
+    salles_config = salles_config_depuis(params)
+    indicateurs = IndicateursCourants(salles_config)
+    allocateur = AllocateurGlissant(salles_config, params['vide_sanitaire'], [indicateurs, *puits], politique)
+    for occ in iterer_occupations(params):
+        allocateur.affecter(occ)
+
+    return {
+        'indicateurs': indicateurs.resume(),
+        'nb_occupations': allocateur.nb_occupations,
+        'nb_conflits': allocateur.nb_conflits,
+        'nb_sur_dim': allocateur.nb_sur_dim,
+        'dates_regime': dict(allocateur.dates_regime_croisiere),
+        'etats': allocateur.etats()
+    }
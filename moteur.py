@@ -0,0 +1,929 @@
+"""
+Moteur de simulation des salles (sans dépendance à Streamlit, Plotly ou pandas).
+
+Utilisé par l'interface Streamlit (app.py), la ligne de commande (cli.py)
+et l'export du planning (export.py).
+"""
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# ============================================================================
+# CONSTANTES DE CONDUITE
+# ============================================================================
+
+CYCLE_TRUIE_ATTENDU = 147
+CIRCUIT_PRODUITS_MAX = 152
+
+DUREE_AS_FIXE = 35      # Fixe
+DUREE_PS_FIXE = 35      # Fixe
+DUREE_M_VISEE = 35      # Cible (flexible 32-35j)
+
+INTERVALLES_POSSIBLES = [7, 14, 21, 28, 35]
+
+# Cycles générés au plus par bande (environ 20 ans)
+NB_CYCLES_MAX = 50
+
+# Code court -> nom complet du type de salle (ordre d'affichage)
+TYPES_SALLES = {
+    'AS': 'Attente Saillie',
+    'G': 'Gestante',
+    'M': 'Maternité',
+    'PS': 'Post-Sevrage',
+    'E': 'Engraissement'
+}
+
+# Date de saillie de la Bande 1 proposée par défaut
+DATE_SAILLIE_B1_DEFAUT = datetime(2025, 7, 25)
+
+# Date de libération initiale : toutes les salles sont libres au démarrage
+DATE_LIBERATION_INITIALE = datetime(2000, 1, 1)
+
+# ============================================================================
+# DIMENSIONNEMENT
+# ============================================================================
+
+def calculer_dimensionnement(intervalle_bandes, vide_sanitaire):
+    """
+    Calcule le nombre de bandes, le nombre de salles optimal, les durées
+    d'occupation et les vides résultants pour un intervalle et un vide donnés.
+
+    Returns:
+        tuple (nb_bandes, nb_optimal, durees_optimales, vides_reels)
+    """
+    # Calcul du nombre de bandes
+    nb_bandes = round(CYCLE_TRUIE_ATTENDU / intervalle_bandes)
+
+    # 1. Attente Saillie (35j fixe)
+    nb_salles_as = math.ceil((DUREE_AS_FIXE + vide_sanitaire) / intervalle_bandes)
+    vide_as = (nb_salles_as * intervalle_bandes) - DUREE_AS_FIXE
+    duree_as_finale = DUREE_AS_FIXE
+
+    # 2. Post-Sevrage (35j fixe)
+    nb_salles_ps = math.ceil((DUREE_PS_FIXE + vide_sanitaire) / intervalle_bandes)
+    vide_ps = (nb_salles_ps * intervalle_bandes) - DUREE_PS_FIXE
+    duree_ps_finale = DUREE_PS_FIXE
+
+    # 3. Maternité (vise 35j)
+    nb_salles_m = math.ceil((DUREE_M_VISEE + vide_sanitaire) / intervalle_bandes)
+
+    # 4. Gestante (ajustée pour cycle 147j)
+    # On part d'une estimation puis on ajuste Maternité pour boucler
+    duree_g_estimee = CYCLE_TRUIE_ATTENDU - DUREE_AS_FIXE - DUREE_M_VISEE
+    nb_salles_g = math.ceil((duree_g_estimee + vide_sanitaire) / intervalle_bandes)
+    vide_g = (nb_salles_g * intervalle_bandes) - duree_g_estimee
+
+    # Ajustement de Maternité pour cycle exact de 147j
+    duree_m_finale = CYCLE_TRUIE_ATTENDU - DUREE_AS_FIXE - duree_g_estimee
+
+    # Si Maternité sort des limites 32-35j, on ajuste Gestante
+    if duree_m_finale < 32:
+        duree_m_finale = 32
+        duree_g_finale = CYCLE_TRUIE_ATTENDU - DUREE_AS_FIXE - duree_m_finale
+        # Recalculer nb salles Gestante
+        nb_salles_g = math.ceil((duree_g_finale + vide_sanitaire) / intervalle_bandes)
+        vide_g = (nb_salles_g * intervalle_bandes) - duree_g_finale
+        # Re-ajuster Maternité
+        duree_m_finale = CYCLE_TRUIE_ATTENDU - DUREE_AS_FIXE - duree_g_finale
+    elif duree_m_finale > 35:
+        duree_m_finale = 35
+        duree_g_finale = CYCLE_TRUIE_ATTENDU - DUREE_AS_FIXE - duree_m_finale
+        nb_salles_g = math.ceil((duree_g_finale + vide_sanitaire) / intervalle_bandes)
+        vide_g = (nb_salles_g * intervalle_bandes) - duree_g_finale
+        duree_m_finale = CYCLE_TRUIE_ATTENDU - DUREE_AS_FIXE - duree_g_finale
+    else:
+        duree_g_finale = duree_g_estimee
+
+    vide_m = (nb_salles_m * intervalle_bandes) - duree_m_finale
+
+    # 5. Engraissement (max 152 - PS)
+    duree_e_max = CIRCUIT_PRODUITS_MAX - DUREE_PS_FIXE
+    nb_salles_e = math.ceil((duree_e_max + vide_sanitaire) / intervalle_bandes)
+    duree_e_finale = min((nb_salles_e * intervalle_bandes) - vide_sanitaire, duree_e_max)
+    vide_e = (nb_salles_e * intervalle_bandes) - duree_e_finale
+
+    nb_optimal = {
+        'AS': nb_salles_as,
+        'G': nb_salles_g,
+        'M': nb_salles_m,
+        'PS': nb_salles_ps,
+        'E': nb_salles_e
+    }
+
+    durees_optimales = {
+        'AS': duree_as_finale,
+        'G': duree_g_finale,
+        'M': duree_m_finale,
+        'PS': duree_ps_finale,
+        'E': duree_e_finale
+    }
+
+    vides_reels = {
+        'AS': vide_as,
+        'G': vide_g,
+        'M': vide_m,
+        'PS': vide_ps,
+        'E': vide_e
+    }
+
+    return nb_bandes, nb_optimal, durees_optimales, vides_reels
+
+def horizon_par_defaut():
+    """Horizon de simulation par défaut : aujourd'hui + 365 jours (à minuit)"""
+    aujourd_hui = datetime.combine(datetime.now().date(), datetime.min.time())
+    return aujourd_hui + timedelta(days=365)
+
+def parametres_conduite(intervalle_bandes, vide_sanitaire, date_saillie_b1,
+                        jours_avant_saillie=5, durees=None, nb_salles=None, date_horizon=None):
+    """
+    Construit le dictionnaire de paramètres utilisé par le moteur.
+
+    Les durées et nombres de salles non fournis (codes 'AS', 'G', 'M', 'PS', 'E')
+    prennent les valeurs du dimensionnement optimal, comme dans la sidebar.
+    """
+    nb_bandes, nb_optimal, durees_optimales, _ = calculer_dimensionnement(intervalle_bandes, vide_sanitaire)
+
+    durees_finales = {code: int(duree) for code, duree in durees_optimales.items()}
+    durees_finales.update(durees or {})
+    nb_salles_finales = dict(nb_optimal)
+    nb_salles_finales.update(nb_salles or {})
+
+    if not isinstance(date_saillie_b1, datetime):
+        date_saillie_b1 = datetime.combine(date_saillie_b1, datetime.min.time())
+
+    return {
+        'intervalle_bandes': intervalle_bandes,
+        'vide_sanitaire': vide_sanitaire,
+        'nb_bandes': nb_bandes,
+        'date_saillie_b1': date_saillie_b1,
+        'jours_avant_saillie': jours_avant_saillie,
+        'durees': durees_finales,
+        'nb_salles': nb_salles_finales,
+        'date_horizon': date_horizon if date_horizon is not None else horizon_par_defaut()
+    }
+
+# Paramètres dont la valeur est un dict par code de type de salle
+PARAMETRES_DICTS = ('durees', 'nb_salles')
+
+def cle_parametres(params):
+    """Clé hashable des paramètres (dicts imbriqués figés) pour les caches"""
+    return tuple(
+        (nom, tuple(sorted(valeur.items())) if nom in PARAMETRES_DICTS else valeur)
+        for nom, valeur in sorted(params.items())
+    )
+
+def parametres_depuis_cle(cle):
+    """Inverse de cle_parametres"""
+    return {nom: dict(valeur) if nom in PARAMETRES_DICTS else valeur for nom, valeur in cle}
+
+def salles_config_depuis(params):
+    """Nombre de salles par nom complet de type de salle"""
+    return {nom: params['nb_salles'][code] for code, nom in TYPES_SALLES.items()}
+
+# ============================================================================
+# CALCUL DES DATES ET OCCUPATIONS
+# ============================================================================
+
+def calculer_toutes_occupations_truies(params):
+    """
+    Calcule TOUTES les occupations truies.
+    Point de référence = Date de SAILLIE
+    Cycle = 147 jours à partir de la saillie
+    """
+    occupations = []
+    durees = params['durees']
+
+    for bande in range(1, params['nb_bandes'] + 1):
+        # Date de saillie de cette bande
+        date_saillie_bande = params['date_saillie_b1'] + timedelta(days=(bande - 1) * params['intervalle_bandes'])
+
+        # Calculer plusieurs cycles (147j)
+        for cycle in range(NB_CYCLES_MAX):
+            date_saillie_cycle = date_saillie_bande + timedelta(days=cycle * CYCLE_TRUIE_ATTENDU)
+
+            if date_saillie_cycle > params['date_horizon']:
+                break
+
+            # Attente Saillie (commence AVANT la saillie)
+            date_entree_as = date_saillie_cycle - timedelta(days=params['jours_avant_saillie'])
+            date_sortie_as = date_entree_as + timedelta(days=durees['AS'])
+
+            occupations.append({
+                'bande': bande,
+                'cycle': cycle,
+                'type_salle': 'Attente Saillie',
+                'date_entree': date_entree_as,
+                'date_sortie': date_sortie_as,
+                'duree_totale': durees['AS'],
+                'id_unique': f"B{bande}_C{cycle}_AS"
+            })
+
+            # Gestante (commence après AS)
+            date_entree_g = date_sortie_as
+            date_sortie_g = date_entree_g + timedelta(days=durees['G'])
+
+            occupations.append({
+                'bande': bande,
+                'cycle': cycle,
+                'type_salle': 'Gestante',
+                'date_entree': date_entree_g,
+                'date_sortie': date_sortie_g,
+                'duree_totale': durees['G'],
+                'id_unique': f"B{bande}_C{cycle}_G"
+            })
+
+            # Maternité (commence après Gestante = mise bas)
+            date_mise_bas = date_sortie_g
+            date_sevrage = date_mise_bas + timedelta(days=durees['M'])
+
+            occupations.append({
+                'bande': bande,
+                'cycle': cycle,
+                'type_salle': 'Maternité',
+                'date_entree': date_mise_bas,
+                'date_sortie': date_sevrage,
+                'duree_totale': durees['M'],
+                'date_sevrage': date_sevrage,
+                'id_unique': f"B{bande}_C{cycle}_M"
+            })
+
+    return occupations
+
+def calculer_toutes_occupations_produits(params):
+    """Calcule TOUTES les occupations produits"""
+    occupations = []
+    durees = params['durees']
+
+    for bande in range(1, params['nb_bandes'] + 1):
+        # Date de saillie de cette bande
+        date_saillie_bande = params['date_saillie_b1'] + timedelta(days=(bande - 1) * params['intervalle_bandes'])
+        # Le cycle commence à l'ENTRÉE en AS, pas à la saillie !
+        date_entree_as_bande = date_saillie_bande - timedelta(days=params['jours_avant_saillie'])
+
+        for cycle in range(NB_CYCLES_MAX):
+            # Cycle commence à l'entrée AS (147j à partir de l'entrée AS)
+            date_debut_cycle = date_entree_as_bande + timedelta(days=cycle * CYCLE_TRUIE_ATTENDU)
+
+            # Date de sevrage = début du cycle + 147j
+            date_sevrage = date_debut_cycle + timedelta(days=CYCLE_TRUIE_ATTENDU)
+
+            if date_sevrage > params['date_horizon']:
+                break
+
+            # Post-Sevrage (les porcelets entrent le jour du sevrage)
+            occupations.append({
+                'bande': bande,
+                'cycle': cycle,
+                'type_salle': 'Post-Sevrage',
+                'date_entree': date_sevrage,
+                'date_sortie': date_sevrage + timedelta(days=durees['PS']),
+                'duree_totale': durees['PS'],
+                'date_sevrage': date_sevrage,
+                'id_unique': f"B{bande}_S{cycle}_PS"
+            })
+
+            # Engraissement (entre immédiatement après PS)
+            date_entree_e = date_sevrage + timedelta(days=durees['PS'])
+            occupations.append({
+                'bande': bande,
+                'cycle': cycle,
+                'type_salle': 'Engraissement',
+                'date_entree': date_entree_e,
+                'date_sortie': date_entree_e + timedelta(days=durees['E']),
+                'duree_totale': durees['E'],
+                'date_sevrage': date_sevrage,
+                'id_unique': f"B{bande}_S{cycle}_E"
+            })
+
+    return occupations
+
+def calculer_toutes_occupations(params):
+    """Occupations truies puis produits (ordre de référence pour l'affectation)"""
+    return calculer_toutes_occupations_truies(params) + calculer_toutes_occupations_produits(params)
+
+# ============================================================================
+# AFFECTATION AVEC VIDE SANITAIRE
+# ============================================================================
+
+def affecter_salles(toutes_occupations, salles_config, vide_sanitaire):
+    """
+    Affectation simple : chaque bande prend LA salle vide avec respect du vide sanitaire.
+
+    Returns:
+        tuple (salles_disponibilite, conflits, sur_dim_reel, dates_regime_croisiere)
+        où salles_disponibilite[type_salle] est la liste des salles avec leur historique
+    """
+    toutes_occupations_triees = sorted(toutes_occupations, key=lambda x: x['date_entree'])
+
+    salles_disponibilite = {}
+    for type_salle, nb_salles in salles_config.items():
+        salles_disponibilite[type_salle] = [
+            {'num_salle': i, 'date_liberation': DATE_LIBERATION_INITIALE, 'historique': [], 'premiere_utilisation': None}
+            for i in range(nb_salles)
+        ]
+
+    conflits = []
+    sur_dimensionnements = []
+
+    # Tracker quand chaque type de salle atteint le régime de croisière
+    dates_regime_croisiere = {}
+
+    for occ in toutes_occupations_triees:
+        type_salle = occ['type_salle']
+        date_entree = occ['date_entree']
+        date_sortie = occ['date_sortie']
+
+        salles = salles_disponibilite[type_salle]
+        # Une salle est vide si date_liberation (sortie + vide sanitaire) <= date_entree
+        salles_vides = [s for s in salles if s['date_liberation'] <= date_entree]
+
+        # Vérifier si toutes les salles de ce type ont déjà été utilisées
+        toutes_salles_utilisees = all(s['premiere_utilisation'] is not None for s in salles)
+
+        # Si toutes utilisées et pas encore noté la date de régime de croisière
+        if toutes_salles_utilisees and type_salle not in dates_regime_croisiere:
+            dates_regime_croisiere[type_salle] = date_entree
+
+        if len(salles_vides) == 0:
+            salle_choisie = min(salles, key=lambda s: s['date_liberation'])
+            # Chevauchement : nombre de jours entre l'entrée et la fin du vide de la salle la moins mauvaise
+            conflits.append({
+                'type_salle': type_salle,
+                'bande': occ['bande'],
+                'date_entree': date_entree,
+                'id': occ['id_unique'],
+                'salle': salle_choisie['num_salle'] + 1,
+                'date_liberation_salle': salle_choisie['date_liberation'],
+                'jours_chevauchement': (salle_choisie['date_liberation'] - date_entree).days
+            })
+
+        elif len(salles_vides) > 1:
+            # Enregistrer le surdimensionnement seulement si en régime de croisière
+            sur_dimensionnements.append({
+                'type_salle': type_salle,
+                'nb_vides': len(salles_vides),
+                'date': date_entree,
+                'en_regime_croisiere': toutes_salles_utilisees
+            })
+            # Prendre celle libérée le PLUS TÔT pour rotation équilibrée
+            salle_choisie = min(salles_vides, key=lambda s: s['date_liberation'])
+
+        else:
+            salle_choisie = salles_vides[0]
+
+        # Marquer la première utilisation
+        if salle_choisie['premiere_utilisation'] is None:
+            salle_choisie['premiere_utilisation'] = date_entree
+
+        # IMPORTANT : date_liberation = date_sortie + vide sanitaire
+        salle_choisie['date_liberation'] = date_sortie + timedelta(days=vide_sanitaire)
+        salle_choisie['historique'].append({
+            'id_unique': occ['id_unique'],
+            'date_entree': date_entree,
+            'date_sortie': date_sortie,
+            'date_liberation': date_sortie + timedelta(days=vide_sanitaire),
+            'bande': occ['bande'],
+            'cycle': occ['cycle'],
+            'duree_totale': occ['duree_totale']
+        })
+
+    # Filtrer les surdimensionnements pour ne garder que ceux en régime de croisière
+    sur_dim_reel = [s for s in sur_dimensionnements if s['en_regime_croisiere']]
+
+    return salles_disponibilite, conflits, sur_dim_reel, dates_regime_croisiere
+
+def extraire_etats_salles(salles_disponibilite, date_actuelle):
+    """État de chaque salle (occupée, vide sanitaire, disponible, jamais utilisée) à une date"""
+    etat_salles = {}
+
+    for type_salle, salles in salles_disponibilite.items():
+        etat_salles[type_salle] = []
+
+        for salle_info in salles:
+            historique = salle_info['historique']
+
+            if not historique:
+                etat_salles[type_salle].append({'statut': 'jamais_utilisee'})
+                continue
+
+            occupation_actuelle = None
+            for occ_hist in historique:
+                if occ_hist['date_entree'] <= date_actuelle < occ_hist['date_sortie']:
+                    occupation_actuelle = occ_hist
+                    break
+
+            if occupation_actuelle and occupation_actuelle.get('hors_service'):
+                etat_salles[type_salle].append({
+                    'statut': 'hors_service',
+                    'date_entree': occupation_actuelle['date_entree'],
+                    'date_sortie': occupation_actuelle['date_sortie'],
+                    'jours_restants': (occupation_actuelle['date_sortie'] - date_actuelle).days
+                })
+            elif occupation_actuelle:
+                jours_dans_salle = (date_actuelle - occupation_actuelle['date_entree']).days
+
+                etat_salles[type_salle].append({
+                    'statut': 'occupée',
+                    'bande': occupation_actuelle['bande'],
+                    'date_entree': occupation_actuelle['date_entree'],
+                    'date_sortie': occupation_actuelle['date_sortie'],
+                    'jours_dans_salle': jours_dans_salle,
+                    'duree_totale': occupation_actuelle['duree_totale'],
+                    'progression': (jours_dans_salle / occupation_actuelle['duree_totale'] * 100),
+                    'id_unique': occupation_actuelle['id_unique']
+                })
+            else:
+                occupations_passees = [h for h in historique if h['date_sortie'] <= date_actuelle]
+
+                if occupations_passees:
+                    dernier_occ = max(occupations_passees, key=lambda h: h['date_sortie'])
+
+                    # Vérifier si en vide sanitaire ou déjà disponible
+                    date_fin_vide = dernier_occ['date_liberation']
+
+                    if date_actuelle < date_fin_vide:
+                        # En cours de vide sanitaire
+                        jours_vide_ecoules = (date_actuelle - dernier_occ['date_sortie']).days
+                        jours_vide_restants = (date_fin_vide - date_actuelle).days
+
+                        etat_salles[type_salle].append({
+                            'statut': 'vide_sanitaire',
+                            'date_liberation': dernier_occ['date_sortie'],
+                            'date_disponible': date_fin_vide,
+                            'jours_vide_ecoules': jours_vide_ecoules,
+                            'jours_vide_restants': jours_vide_restants,
+                            'derniere_bande': dernier_occ['bande'],
+                            'prochaine_entree': None,
+                            'prochaine_bande': None
+                        })
+                    else:
+                        # Vide sanitaire terminé, salle disponible
+                        occupations_futures = [h for h in historique if h['date_entree'] > date_actuelle]
+                        prochaine_occ = min(occupations_futures, key=lambda h: h['date_entree']) if occupations_futures else None
+
+                        etat_salles[type_salle].append({
+                            'statut': 'disponible',
+                            'date_liberation': dernier_occ['date_sortie'],
+                            'date_disponible': date_fin_vide,
+                            'jours_disponible': (date_actuelle - date_fin_vide).days,
+                            'derniere_bande': dernier_occ['bande'],
+                            'prochaine_entree': prochaine_occ['date_entree'] if prochaine_occ else None,
+                            'prochaine_bande': prochaine_occ['bande'] if prochaine_occ else None
+                        })
+                else:
+                    etat_salles[type_salle].append({'statut': 'jamais_utilisee'})
+
+    return etat_salles
+
+def affecter_salles_simple(toutes_occupations, salles_config, vide_sanitaire, date_actuelle):
+    """
+    Affectation simple puis état des salles à date_actuelle.
+
+    Returns:
+        tuple (etat_salles, conflits, sur_dim_reel, dates_regime_croisiere)
+    """
+    salles_disponibilite, conflits, sur_dim_reel, dates_regime_croisiere = affecter_salles(
+        toutes_occupations, salles_config, vide_sanitaire
+    )
+    etat_salles = extraire_etats_salles(salles_disponibilite, date_actuelle)
+    return etat_salles, conflits, sur_dim_reel, dates_regime_croisiere
+
+# ============================================================================
+# POLITIQUES D'AFFECTATION
+# ============================================================================
+
+class PolitiqueAffectation(ABC):
+    """
+    Règle de choix de la salle, utilisée par Allocateur.
+
+    `choisir` reçoit l'index trié des (date_liberation, num_salle) du type de
+    salle et le nombre de salles vides à l'entrée (index[:nb_vides]), et retourne
+    le numéro de salle choisi. Une politique qui garde un état le met à jour dans
+    `affectee` et le fournit à instantane / restaurer.
+    """
+    nom = None
+    description = None
+
+    @abstractmethod
+    def choisir(self, occ, index, nb_vides):
+        """Numéro (à partir de 0) de la salle choisie pour occ"""
+
+    def affectee(self, occ, num_salle):
+        pass
+
+    def instantane(self):
+        return None
+
+    def restaurer(self, etat):
+        pass
+
+class PolitiquePlusTotLiberee(PolitiqueAffectation):
+    """Salle libérée le plus tôt, à égalité le plus petit numéro (règle historique)"""
+    nom = 'plus_tot_liberee'
+    description = "Salle libérée le plus tôt (rotation équilibrée)"
+
+    def choisir(self, occ, index, nb_vides):
+        return index[0][1]
+
+class PolitiqueMeilleurAjustement(PolitiqueAffectation):
+    """Salle vide dont le vide sanitaire s'est terminé le plus près de l'entrée"""
+    nom = 'meilleur_ajustement'
+    description = "Salle dont le vide se termine au plus près de l'entrée (moins d'attente)"
+
+    def choisir(self, occ, index, nb_vides):
+        if nb_vides == 0:
+            return index[0][1]
+        # Plus petit numéro parmi les salles libérées à la même date
+        date_liberation = index[nb_vides - 1][0]
+        return index[bisect_left(index, (date_liberation, -1))][1]
+
+class PolitiqueSalleFixe(PolitiqueAffectation):
+    """Chaque bande a sa salle : (bande - 1) modulo le nombre de salles"""
+    nom = 'salle_fixe'
+    description = "Salle fixe par bande, même si elle n'est pas libre"
+
+    def choisir(self, occ, index, nb_vides):
+        if occ['bande'] is None:
+            return index[0][1]
+        return (occ['bande'] - 1) % len(index)
+
+class PolitiqueSallesAdjacentes(PolitiqueAffectation):
+    """
+    Garde chaque bande au plus près (en numéro de salle) de la salle qu'elle
+    occupait au passage précédent dans ce type de salle. Parcourt les salles
+    vides : O(nombre de salles vides).
+    """
+    nom = 'salles_adjacentes'
+    description = "Salle la plus proche de celle occupée par la bande au cycle précédent"
+
+    def __init__(self):
+        self._derniere_salle = {}
+
+    def choisir(self, occ, index, nb_vides):
+        reference = self._derniere_salle.get((occ['type_salle'], occ['bande']))
+        if nb_vides == 0 or reference is None:
+            return index[0][1]
+        return min(index[:nb_vides], key=lambda e: (abs(e[1] - reference), e))[1]
+
+    def affectee(self, occ, num_salle):
+        if occ['bande'] is not None:
+            self._derniere_salle[(occ['type_salle'], occ['bande'])] = num_salle
+
+    def instantane(self):
+        return dict(self._derniere_salle)
+
+    def restaurer(self, etat):
+        self._derniere_salle = dict(etat)
+
+# Politiques disponibles, par nom (la première est celle du moteur)
+POLITIQUES = {
+    politique.nom: politique
+    for politique in (PolitiquePlusTotLiberee, PolitiqueMeilleurAjustement,
+                      PolitiqueSalleFixe, PolitiqueSallesAdjacentes)
+}
+
+# ============================================================================
+# AFFECTATION INDEXÉE (même règle, état incrémental)
+# ============================================================================
+
+class Allocateur:
+    """
+    Affectation indexée, une occupation à la fois.
+
+    Avec la politique par défaut, même règle et mêmes résultats que affecter_salles :
+    la salle choisie est celle libérée le plus tôt (à égalité, le plus petit numéro).
+    Chaque type de salle tient la liste triée des (date_liberation, num_salle) :
+    le comptage des salles vides se fait par recherche dichotomique et la
+    politique (PolitiqueAffectation) choisit la salle dans cet index.
+
+    Une occupation peut imposer sa salle ('salle_imposee', numéro à partir de 0),
+    par exemple pour une entrée réelle. L'état peut être figé (instantane) puis
+    restauré pour reprendre l'affectation à partir d'une date donnée.
+
+    `unite` est la durée d'un jour dans l'échelle des dates (timedelta pour des
+    datetime, 1 pour des numéros de jour entiers).
+    """
+
+    def __init__(self, salles_config, vide_sanitaire, unite=timedelta(days=1), politique=None):
+        self.unite = unite
+        self.politique = politique if politique is not None else PolitiquePlusTotLiberee()
+        self.delta_vide = vide_sanitaire * unite
+        date_initiale = DATE_LIBERATION_INITIALE if isinstance(unite, timedelta) else -10 ** 9
+
+        self.salles = {}
+        self._index = {}
+        self._nb_jamais_utilisees = {}
+        for type_salle, nb_salles in salles_config.items():
+            self.salles[type_salle] = [
+                {'num_salle': i, 'date_liberation': date_initiale, 'historique': [], 'premiere_utilisation': None}
+                for i in range(nb_salles)
+            ]
+            self._index[type_salle] = [(date_initiale, i) for i in range(nb_salles)]
+            self._nb_jamais_utilisees[type_salle] = nb_salles
+
+        self.conflits = []
+        self.sur_dim = []
+        self.dates_regime_croisiere = {}
+
+    def nb_salles_vides(self, type_salle, date):
+        """Nombre de salles dont le vide sanitaire est terminé à date"""
+        return bisect_right(self._index[type_salle], (date, math.inf))
+
+    def affecter(self, occ):
+        """Affecte une occupation et retourne le numéro (à partir de 0) de la salle choisie"""
+        type_salle = occ['type_salle']
+        date_entree = occ['date_entree']
+        date_sortie = occ['date_sortie']
+
+        salles = self.salles[type_salle]
+        index = self._index[type_salle]
+        nb_vides = bisect_right(index, (date_entree, math.inf))
+        toutes_salles_utilisees = self._nb_jamais_utilisees[type_salle] == 0
+
+        if toutes_salles_utilisees and type_salle not in self.dates_regime_croisiere:
+            self.dates_regime_croisiere[type_salle] = date_entree
+
+        num_salle = occ.get('salle_imposee')
+        if num_salle is None:
+            num_salle = self.politique.choisir(occ, index, nb_vides)
+        salle_choisie = salles[num_salle]
+
+        if salle_choisie['date_liberation'] > date_entree:
+            self._enregistrer_conflit({
+                'type_salle': type_salle,
+                'bande': occ['bande'],
+                'date_entree': date_entree,
+                'id': occ['id_unique'],
+                'salle': salle_choisie['num_salle'] + 1,
+                'date_liberation_salle': salle_choisie['date_liberation'],
+                'jours_chevauchement': (salle_choisie['date_liberation'] - date_entree) // self.unite
+            })
+        elif nb_vides > 1 and toutes_salles_utilisees:
+            # Surdimensionnement retenu seulement en régime de croisière
+            self._enregistrer_sur_dim({
+                'type_salle': type_salle,
+                'nb_vides': nb_vides,
+                'date': date_entree,
+                'en_regime_croisiere': True
+            })
+
+        if salle_choisie['premiere_utilisation'] is None:
+            salle_choisie['premiere_utilisation'] = date_entree
+            self._nb_jamais_utilisees[type_salle] -= 1
+
+        date_liberation = date_sortie + self.delta_vide
+        del index[bisect_left(index, (salle_choisie['date_liberation'], salle_choisie['num_salle']))]
+        insort(index, (date_liberation, salle_choisie['num_salle']))
+
+        salle_choisie['date_liberation'] = date_liberation
+        entree_historique = {
+            'id_unique': occ['id_unique'],
+            'date_entree': date_entree,
+            'date_sortie': date_sortie,
+            'date_liberation': date_liberation,
+            'bande': occ['bande'],
+            'cycle': occ['cycle'],
+            'duree_totale': occ['duree_totale']
+        }
+        if occ.get('hors_service'):
+            entree_historique['hors_service'] = True
+        self._enregistrer_occupation(salle_choisie, entree_historique)
+        self.politique.affectee(occ, num_salle)
+
+        return num_salle
+
+    # Enregistrement des résultats (redéfini par glissant.AllocateurGlissant)
+
+    def _enregistrer_conflit(self, conflit):
+        self.conflits.append(conflit)
+
+    def _enregistrer_sur_dim(self, sur_dim):
+        self.sur_dim.append(sur_dim)
+
+    def _enregistrer_occupation(self, salle, entree_historique):
+        salle['historique'].append(entree_historique)
+
+    def instantane(self):
+        """État courant, sans copier les historiques (seulement leur longueur)"""
+        return {
+            'salles': {
+                type_salle: [(s['date_liberation'], s['premiere_utilisation'], len(s['historique'])) for s in salles]
+                for type_salle, salles in self.salles.items()
+            },
+            'nb_conflits': len(self.conflits),
+            'nb_sur_dim': len(self.sur_dim),
+            'dates_regime_croisiere': dict(self.dates_regime_croisiere),
+            'politique': self.politique.instantane()
+        }
+
+    def restaurer(self, instantane):
+        """Revient à un instantané pris plus tôt sur ce même allocateur"""
+        for type_salle, etats in instantane['salles'].items():
+            salles = self.salles[type_salle]
+            for salle, (date_liberation, premiere_utilisation, longueur) in zip(salles, etats):
+                salle['date_liberation'] = date_liberation
+                salle['premiere_utilisation'] = premiere_utilisation
+                del salle['historique'][longueur:]
+            self._index[type_salle] = sorted((s['date_liberation'], s['num_salle']) for s in salles)
+            self._nb_jamais_utilisees[type_salle] = sum(1 for s in salles if s['premiere_utilisation'] is None)
+
+        del self.conflits[instantane['nb_conflits']:]
+        del self.sur_dim[instantane['nb_sur_dim']:]
+        self.dates_regime_croisiere = dict(instantane['dates_regime_croisiere'])
+        self.politique.restaurer(instantane['politique'])
+
+def affecter_salles_indexe(toutes_occupations, salles_config, vide_sanitaire):
+    """
+    Équivalent indexé de affecter_salles (mêmes résultats).
+
+    Returns:
+        tuple (salles_disponibilite, conflits, sur_dim_reel, dates_regime_croisiere)
+    """
+    allocateur = Allocateur(salles_config, vide_sanitaire)
+    for occ in sorted(toutes_occupations, key=lambda x: x['date_entree']):
+        allocateur.affecter(occ)
+    return allocateur.salles, allocateur.conflits, allocateur.sur_dim, allocateur.dates_regime_croisiere
+
+def indicateurs_affectation(allocateur):
+    """
+    Indicateurs de comparaison des politiques.
+
+    Returns:
+        dict avec 'conflits', 'jours_chevauchement', 'sur_dimensionnements',
+        'vide_moyen' et 'vide_max' (jours entre deux bandes dans une salle),
+        'ecart_salle_moyen' (écart moyen de numéro de salle d'une bande entre
+        deux passages dans un même type de salle)
+    """
+    unite = allocateur.unite
+    vides = []
+    passages = {}
+    for type_salle, salles in allocateur.salles.items():
+        for salle in salles:
+            historique = [h for h in salle['historique'] if not h.get('hors_service')]
+            vides.extend((suivante['date_entree'] - precedente['date_sortie']) // unite
+                         for precedente, suivante in zip(historique, historique[1:]))
+            for h in historique:
+                passages.setdefault((type_salle, h['bande']), []).append((h['date_entree'], salle['num_salle']))
+
+    ecarts = []
+    for sequence in passages.values():
+        sequence.sort()
+        ecarts.extend(abs(suivant[1] - precedent[1]) for precedent, suivant in zip(sequence, sequence[1:]))
+
+    return {
+        'conflits': len(allocateur.conflits),
+        'jours_chevauchement': sum(c['jours_chevauchement'] for c in allocateur.conflits),
+        'sur_dimensionnements': len(allocateur.sur_dim),
+        'vide_moyen': sum(vides) / len(vides) if vides else None,
+        'vide_max': max(vides, default=None),
+        'ecart_salle_moyen': sum(ecarts) / len(ecarts) if ecarts else None
+    }
+
+def comparer_politiques(toutes_occupations, salles_config, vide_sanitaire, noms=None):
+    """
+    Affecte un même flux d'occupations avec plusieurs politiques, en un seul passage
+    (chaque occupation est présentée à tous les allocateurs avant la suivante).
+
+    Returns:
+        dict nom -> {'salles_disponibilite', 'conflits', 'sur_dim', 'dates_regime', 'indicateurs'}
+    """
+    noms = list(noms) if noms is not None else list(POLITIQUES)
+    allocateurs = [
+        Allocateur(salles_config, vide_sanitaire, politique=POLITIQUES[nom]())
+        for nom in noms
+    ]
+
+    for occ in sorted(toutes_occupations, key=lambda x: x['date_entree']):
+        for allocateur in allocateurs:
+            allocateur.affecter(occ)
+
+    return {
+        nom: {
+            'salles_disponibilite': allocateur.salles,
+            'conflits': allocateur.conflits,
+            'sur_dim': allocateur.sur_dim,
+            'dates_regime': allocateur.dates_regime_croisiere,
+            'indicateurs': indicateurs_affectation(allocateur)
+        }
+        for nom, allocateur in zip(noms, allocateurs)
+    }
+
+# ============================================================================
+# DIAGNOSTIC : CHRONOLOGIE DU DÉFICIT DE CAPACITÉ
+# ============================================================================
+
+def calculer_deficit_capacite(toutes_occupations, salles_config, vide_sanitaire):
+    """
+    Calcule la chronologie du déficit de salles par type (balayage des événements).
+
+    Chaque occupation bloque une salle de son entrée jusqu'à la fin du vide
+    sanitaire. Le besoin instantané est le nombre de blocages simultanés ;
+    le déficit est ce qui dépasse le nombre de salles disponibles.
+    Complexité O(n log n) (tri des événements).
+
+    Returns:
+        dict type_salle -> {'salles', 'besoin_max', 'deficit_max', 'jours_deficit',
+                            'premier_deficit', 'periodes'}
+        où 'periodes' liste les intervalles {'debut', 'fin', 'besoin', 'deficit', 'jours'}
+    """
+    evenements = {type_salle: [] for type_salle in salles_config}
+
+    for occ in toutes_occupations:
+        type_salle = occ['type_salle']
+        if type_salle not in evenements:
+            continue
+        date_liberation = occ['date_sortie'] + timedelta(days=vide_sanitaire)
+        # Une salle libérée le jour J peut être reprise le jour J : -1 traité avant +1
+        evenements[type_salle].append((occ['date_entree'], 1))
+        evenements[type_salle].append((date_liberation, -1))
+
+    chronologie = {}
+
+    for type_salle, nb_salles in salles_config.items():
+        evts = sorted(evenements[type_salle])
+
+        periodes = []
+        besoin = 0
+        besoin_max = 0
+
+        for i, (date_evt, delta) in enumerate(evts):
+            besoin += delta
+            besoin_max = max(besoin_max, besoin)
+
+            # Le niveau ne vaut qu'après le dernier événement du même jour
+            if i + 1 < len(evts) and evts[i + 1][0] == date_evt:
+                continue
+
+            deficit = besoin - nb_salles
+            if deficit <= 0 or i + 1 >= len(evts):
+                continue
+
+            date_fin = evts[i + 1][0]
+            # Fusionner avec la période précédente si elle est contiguë et de même niveau
+            if periodes and periodes[-1]['fin'] == date_evt and periodes[-1]['deficit'] == deficit:
+                periodes[-1]['fin'] = date_fin
+                periodes[-1]['jours'] = (date_fin - periodes[-1]['debut']).days
+            else:
+                periodes.append({
+                    'debut': date_evt,
+                    'fin': date_fin,
+                    'besoin': besoin,
+                    'deficit': deficit,
+                    'jours': (date_fin - date_evt).days
+                })
+
+        chronologie[type_salle] = {
+            'salles': nb_salles,
+            'besoin_max': besoin_max,
+            'deficit_max': max((p['deficit'] for p in periodes), default=0),
+            'jours_deficit': sum(p['jours'] for p in periodes),
+            'premier_deficit': periodes[0]['debut'] if periodes else None,
+            'periodes': periodes
+        }
+
+    return chronologie
+
+# ============================================================================
+# CACHE DU PLANNING (partagé par toutes les sessions d'un même processus)
+# ============================================================================
+
+@lru_cache(maxsize=64)
+def _planning_en_cache(cle):
+    params = parametres_depuis_cle(cle)
+
+    # Configurations standard : occupations et affectation lues dans la table précalculée
+    from table_standard import planning_precalcule
+    planning = planning_precalcule(params)
+    if planning is not None:
+        return planning
+
+    toutes_occupations = calculer_toutes_occupations(params)
+    salles_config = salles_config_depuis(params)
+    salles_disponibilite, conflits, sur_dim, dates_regime = affecter_salles_indexe(
+        toutes_occupations, salles_config, params['vide_sanitaire']
+    )
+    return {
+        'occupations': toutes_occupations,
+        'salles_disponibilite': salles_disponibilite,
+        'conflits': conflits,
+        'sur_dim': sur_dim,
+        'dates_regime': dates_regime
+    }
+
+def calculer_planning(params):
+    """
+    Occupations et affectation complètes pour un jeu de paramètres, mises en cache.
+
+    Le résultat est partagé entre appelants : il ne doit pas être modifié.
+
+    Returns:
+        dict avec 'occupations', 'salles_disponibilite', 'conflits', 'sur_dim', 'dates_regime'
+    """
+    return _planning_en_cache(cle_parametres(params))
+
+def prechauffer_configurations_standard(date_saillie_b1, vide_sanitaire=5):
+    """Calcule à l'avance le planning par défaut de chaque intervalle standard"""
+    for intervalle_bandes in INTERVALLES_POSSIBLES:
+        calculer_planning(parametres_conduite(intervalle_bandes, vide_sanitaire, date_saillie_b1))
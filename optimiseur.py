@@ -0,0 +1,198 @@
+"""
+Recherche de la configuration (durées et nombres de salles) qui minimise le
+nombre total de salles, sous les contraintes couplées de la conduite :
+
+- cycle truie (LCY) : Attente Saillie + Gestante + Maternité = 147 jours
+- Maternité entre 32 et 35 jours (Gestante en découle)
+- circuit produits : Post-Sevrage + Engraissement <= 152 jours, Engraissement
+  d'au moins `duree_e_min` jours
+- vide sanitaire respecté dans chaque salle
+
+Recherche par séparation et évaluation : on branche sur la durée de Maternité
+puis sur le nombre de salles d'Engraissement ; une borne inférieure (charge
+moyenne des salles sur un cycle) élague les branches qui ne peuvent pas faire
+mieux que la meilleure solution connue. Chaque feuille est validée par un
+oracle de simulation : moteur.Allocateur sur des jours entiers, plusieurs
+cycles de toutes les bandes, aucun conflit toléré.
+
+À nombre de salles égal, on préfère : moins de vides hors cible (3-7 jours),
+un Engraissement plus long, une Maternité plus proche de 35 jours.
+"""
+import math
+from functools import lru_cache
+
+from moteur import (
+    CYCLE_TRUIE_ATTENDU,
+    CIRCUIT_PRODUITS_MAX,
+    DUREE_AS_FIXE,
+    DUREE_PS_FIXE,
+    DUREE_M_VISEE,
+    Allocateur,
+)
+
+DUREE_M_MIN = 32
+DUREE_M_MAX = 35
+
+# Durée minimale d'Engraissement (poids de sortie)
+DUREE_E_MIN = 110
+
+# Vides sanitaires réels visés (jours)
+VIDE_CIBLE_MIN = 3
+VIDE_CIBLE_MAX = 7
+
+# Cycles simulés par l'oracle : le régime permanent est atteint dès le deuxième
+NB_CYCLES_ORACLE = 4
+
+# ============================================================================
+# ORACLE DE SIMULATION
+# ============================================================================
+
+def nb_bandes_pour(intervalle_bandes):
+    return round(CYCLE_TRUIE_ATTENDU / intervalle_bandes)
+
+@lru_cache(maxsize=4096)
+def sans_conflit(intervalle_bandes, duree, vide_sanitaire, nb_salles):
+    """
+    Oracle : nb_salles salles suffisent-elles pour une occupation de `duree` jours
+    par bande, toutes les bandes entrant tous les intervalle_bandes jours, à chaque cycle ?
+
+    Toutes les bandes ayant la même durée, un décalage des entrées (stades
+    précédents) ne change pas le résultat : l'oracle ne dépend que de la durée.
+    """
+    nb_bandes = nb_bandes_pour(intervalle_bandes)
+    allocateur = Allocateur({'salle': nb_salles}, vide_sanitaire, unite=1)
+
+    entrees = sorted(
+        (bande * intervalle_bandes + cycle * CYCLE_TRUIE_ATTENDU, bande + 1)
+        for cycle in range(NB_CYCLES_ORACLE)
+        for bande in range(nb_bandes)
+    )
+    for date_entree, bande in entrees:
+        allocateur.affecter({
+            'type_salle': 'salle',
+            'bande': bande,
+            'cycle': None,
+            'date_entree': date_entree,
+            'date_sortie': date_entree + duree,
+            'duree_totale': duree,
+            'id_unique': None
+        })
+        if allocateur.conflits:
+            return False
+    return True
+
+def borne_inferieure(intervalle_bandes, duree, vide_sanitaire):
+    """Salles nécessaires en moyenne : chaque bande bloque une salle duree + vide jours par cycle"""
+    nb_bandes = nb_bandes_pour(intervalle_bandes)
+    return max(1, math.ceil(nb_bandes * (duree + vide_sanitaire) / CYCLE_TRUIE_ATTENDU))
+
+def nb_salles_minimal(intervalle_bandes, duree, vide_sanitaire):
+    """Plus petit nombre de salles sans conflit pour une durée (None si aucun)"""
+    for nb_salles in range(borne_inferieure(intervalle_bandes, duree, vide_sanitaire),
+                           nb_bandes_pour(intervalle_bandes) + 1):
+        if sans_conflit(intervalle_bandes, duree, vide_sanitaire, nb_salles):
+            return nb_salles
+    return None
+
+def duree_maximale(intervalle_bandes, vide_sanitaire, nb_salles, duree_min, duree_max):
+    """
+    Plus longue durée dans [duree_min, duree_max] tenable avec nb_salles salles
+    (la faisabilité décroît avec la durée : recherche dichotomique). None si aucune.
+    """
+    if not sans_conflit(intervalle_bandes, duree_min, vide_sanitaire, nb_salles):
+        return None
+    bas, haut = duree_min, duree_max
+    while bas < haut:
+        milieu = (bas + haut + 1) // 2
+        if sans_conflit(intervalle_bandes, milieu, vide_sanitaire, nb_salles):
+            bas = milieu
+        else:
+            haut = milieu - 1
+    return bas
+
+# ============================================================================
+# RECHERCHE
+# ============================================================================
+
+def _vides_reels(intervalle_bandes, durees, nb_salles):
+    return {code: nb_salles[code] * intervalle_bandes - durees[code] for code in durees}
+
+@lru_cache(maxsize=256)
+def optimiser_configuration(intervalle_bandes, vide_sanitaire, duree_e_min=DUREE_E_MIN):
+    """
+    Configuration au plus petit nombre total de salles pour un intervalle et un vide.
+
+    Returns:
+        dict avec 'nb_bandes', 'durees', 'nb_salles', 'vides', 'total_salles',
+        'nb_vides_hors_cible', 'noeuds' (branches évaluées), 'noeuds_elagues',
+        ou None si aucune configuration ne respecte les contraintes.
+        Le résultat est mis en cache : ne pas le modifier.
+    """
+    nb_bandes = nb_bandes_pour(intervalle_bandes)
+    duree_e_max = CIRCUIT_PRODUITS_MAX - DUREE_PS_FIXE
+    if duree_e_min > duree_e_max:
+        return None
+
+    nb_as = nb_salles_minimal(intervalle_bandes, DUREE_AS_FIXE, vide_sanitaire)
+    nb_ps = nb_salles_minimal(intervalle_bandes, DUREE_PS_FIXE, vide_sanitaire)
+    if nb_as is None or nb_ps is None:
+        return None
+
+    borne_e = borne_inferieure(intervalle_bandes, duree_e_min, vide_sanitaire)
+    meilleur = None
+    meilleur_score = None
+    noeuds = noeuds_elagues = 0
+
+    # Branche 1 : durée de Maternité, de la plus proche de la cible à la plus courte
+    for duree_m in range(DUREE_M_MAX, DUREE_M_MIN - 1, -1):
+        duree_g = CYCLE_TRUIE_ATTENDU - DUREE_AS_FIXE - duree_m
+        noeuds += 1
+
+        borne = (nb_as + nb_ps + borne_e
+                 + borne_inferieure(intervalle_bandes, duree_g, vide_sanitaire)
+                 + borne_inferieure(intervalle_bandes, duree_m, vide_sanitaire))
+        if meilleur is not None and borne > meilleur['total_salles']:
+            noeuds_elagues += 1
+            continue
+
+        nb_g = nb_salles_minimal(intervalle_bandes, duree_g, vide_sanitaire)
+        nb_m = nb_salles_minimal(intervalle_bandes, duree_m, vide_sanitaire)
+        if nb_g is None or nb_m is None:
+            continue
+        partiel = nb_as + nb_ps + nb_g + nb_m
+
+        # Branche 2 : salles d'Engraissement par nombre croissant ; le premier
+        # nombre qui tient duree_e_min est le meilleur de la branche
+        for nb_e in range(borne_e, nb_bandes + 1):
+            noeuds += 1
+            if meilleur is not None and partiel + nb_e > meilleur['total_salles']:
+                noeuds_elagues += 1
+                break
+            duree_e = duree_maximale(intervalle_bandes, vide_sanitaire, nb_e, duree_e_min, duree_e_max)
+            if duree_e is None:
+                continue
+
+            durees = {'AS': DUREE_AS_FIXE, 'G': duree_g, 'M': duree_m, 'PS': DUREE_PS_FIXE, 'E': duree_e}
+            nb_salles = {'AS': nb_as, 'G': nb_g, 'M': nb_m, 'PS': nb_ps, 'E': nb_e}
+            vides = _vides_reels(intervalle_bandes, durees, nb_salles)
+            hors_cible = sum(1 for v in vides.values() if not VIDE_CIBLE_MIN <= v <= VIDE_CIBLE_MAX)
+
+            score = (partiel + nb_e, hors_cible, -duree_e, DUREE_M_VISEE - duree_m)
+            if meilleur_score is None or score < meilleur_score:
+                meilleur_score = score
+                meilleur = {
+                    'intervalle_bandes': intervalle_bandes,
+                    'vide_sanitaire': vide_sanitaire,
+                    'nb_bandes': nb_bandes,
+                    'durees': durees,
+                    'nb_salles': nb_salles,
+                    'vides': vides,
+                    'total_salles': partiel + nb_e,
+                    'nb_vides_hors_cible': hors_cible
+                }
+            break
+
+    if meilleur is not None:
+        meilleur['noeuds'] = noeuds
+        meilleur['noeuds_elagues'] = noeuds_elagues
+    return meilleur
@@ -0,0 +1,173 @@
+"""
+Simulation de plusieurs sites sur un pool de processus (mode lot).
+
+Les sites sont indépendants : ils sont répartis en lots contigus, environ
+quatre par processus. Un lot affecte ses sites l'un après l'autre, chacun
+avec un Allocateur dans l'ordre des dates d'entrée (comme
+moteur.calculer_planning), et extrait l'état des salles à la date demandée.
+Une tâche par (site, type de salle) ne dure qu'environ 1,5 ms, moins que
+l'aller-retour vers un processus du pool : l'unité de travail est donc le
+site entier, et en deçà de SITES_PAR_PROCESSUS sites par processus tout est
+calculé dans le processus courant. `mesurer` compare les durées sur un lot
+donné (python cli.py lot --mesurer).
+
+Les numéros de salle sont écrits dans un tampon en mémoire partagée
+(multiprocessing.shared_memory) alloué par le processus principal : une case
+u16 par (type de salle, bande, cycle) et par site, 0 si l'occupation n'existe
+pas. Seuls les résultats de petite taille (états, conflits,
+surdimensionnements) reviennent par sérialisation.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
+
+from moteur import (
+    NB_CYCLES_MAX,
+    TYPES_SALLES,
+    Allocateur,
+    affecter_salles_indexe,
+    calculer_toutes_occupations,
+    extraire_etats_salles,
+    salles_config_depuis,
+)
+
+# Octets par case du tampon partagé (numéro de salle + 1, u16)
+TAILLE_CASE = 2
+
+# Sites au moins par processus du pool (en deçà, le pool coûte plus qu'il ne rapporte)
+SITES_PAR_PROCESSUS = 16
+
+# ============================================================================
+# TÂCHE (UN LOT DE SITES)
+# ============================================================================
+
+def _affecter_site(cases, debut, params, date):
+    """Affecte un site et écrit ses salles à partir de la case debut"""
+    allocateur = Allocateur(salles_config_depuis(params), params['vide_sanitaire'])
+    cases_par_type = params['nb_bandes'] * NB_CYCLES_MAX
+    debuts = {type_salle: debut + i * cases_par_type for i, type_salle in enumerate(TYPES_SALLES.values())}
+
+    for occ in sorted(calculer_toutes_occupations(params), key=lambda x: x['date_entree']):
+        num_salle = allocateur.affecter(occ)
+        cases[debuts[occ['type_salle']] + (occ['bande'] - 1) * NB_CYCLES_MAX + occ['cycle']] = num_salle + 1
+
+    return {
+        'etats': extraire_etats_salles(allocateur.salles, date),
+        'conflits': allocateur.conflits,
+        'sur_dim': allocateur.sur_dim,
+        'dates_regime': dict(allocateur.dates_regime_croisiere)
+    }
+
+def _affecter_lot(nom_tampon, taille, lot, date):
+    """Exécuté dans un processus du pool : lot = liste de (première case, params)"""
+    tampon = shared_memory.SharedMemory(name=nom_tampon)
+    try:
+        # Vues libérées avant la fermeture, même en cas d'erreur (sinon close() échoue : BufferError)
+        with tampon.buf[:taille] as zone, zone.cast('H') as cases:
+            return [_affecter_site(cases, debut, params, date) for debut, params in lot]
+    finally:
+        tampon.close()
+
+# ============================================================================
+# LOT DE SITES
+# ============================================================================
+
+def simuler_sites(sites, date, processus=None):
+    """
+    Affecte les salles de plusieurs sites, par lots de sites sur un pool de processus.
+
+    Args:
+        sites: liste de (nom, params)
+        processus: nombre de processus au plus (défaut : nombre de cœurs ;
+            réduit à un processus par SITES_PAR_PROCESSUS sites ; 1 = sans pool)
+
+    Returns:
+        liste de dicts, dans l'ordre des sites : {'nom', 'params', 'etats',
+        'conflits', 'sur_dim' (dans l'ordre d'affectation du moteur),
+        'dates_regime', 'affectations'} avec affectations[type_salle][bande - 1][cycle]
+        = numéro de salle (à partir de 1) ou None ; ValueError si un site n'a
+        aucune salle d'un type
+    """
+    for nom, params in sites:
+        for code, nb_salles in params['nb_salles'].items():
+            if nb_salles < 1:
+                raise ValueError(f"Site {nom} : au moins une salle {TYPES_SALLES[code]} attendue (reçu {nb_salles})")
+    if not sites:
+        return []
+
+    debuts = []
+    nb_cases = 0
+    for _, params in sites:
+        debuts.append(nb_cases)
+        nb_cases += len(TYPES_SALLES) * params['nb_bandes'] * NB_CYCLES_MAX
+    taille = nb_cases * TAILLE_CASE
+
+    processus = max(1, min(processus or os.cpu_count() or 1, len(sites) // SITES_PAR_PROCESSUS))
+    nb_lots = 1 if processus == 1 else min(len(sites), 4 * processus)
+    bornes = [len(sites) * k // nb_lots for k in range(nb_lots + 1)]
+    lots = [[(debuts[i], sites[i][1]) for i in range(a, b)] for a, b in zip(bornes, bornes[1:])]
+
+    tampon = shared_memory.SharedMemory(create=True, size=taille)
+    try:
+        tampon.buf[:taille] = bytes(taille)
+        if processus <= 1:
+            parties = _affecter_lot(tampon.name, taille, lots[0], date)
+        else:
+            with ProcessPoolExecutor(max_workers=processus) as pool:
+                parties = [partie for resultats in pool.map(_affecter_lot, repeat(tampon.name), repeat(taille),
+                                                            lots, repeat(date))
+                           for partie in resultats]
+
+        with tampon.buf[:taille] as zone, zone.cast('H') as cases:
+            affectations = []
+            for debut, (_, params) in zip(debuts, sites):
+                par_type = {}
+                for i, type_salle in enumerate(TYPES_SALLES.values()):
+                    debut_type = debut + i * params['nb_bandes'] * NB_CYCLES_MAX
+                    par_type[type_salle] = [
+                        [salle or None for salle in cases[debut_type + b * NB_CYCLES_MAX:debut_type + (b + 1) * NB_CYCLES_MAX]]
+                        for b in range(params['nb_bandes'])
+                    ]
+                affectations.append(par_type)
+    finally:
+        tampon.close()
+        tampon.unlink()
+
+    return [
+        dict(partie, nom=nom, params=params, affectations=affectation)
+        for (nom, params), partie, affectation in zip(sites, parties, affectations)
+    ]
+
+def _moteur_seul(sites, date):
+    for _, params in sites:
+        salles, _, _, _ = affecter_salles_indexe(calculer_toutes_occupations(params), salles_config_depuis(params),
+                                                 params['vide_sanitaire'])
+        extraire_etats_salles(salles, date)
+
+def _meilleure_duree(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return min(durees)
+
+def mesurer(sites, date, processus=None, repetitions=3):
+    """
+    Durées en secondes d'un même lot (meilleure de `repetitions` mesures) :
+    moteur seul site après site (sans cache), simuler_sites sur un processus,
+    puis sur `processus` processus (défaut : nombre de cœurs ; le seuil
+    SITES_PAR_PROCESSUS s'applique, démarrage du pool compris).
+
+    Returns:
+        dict avec 'moteur', 'un_processus', 'pool' et 'processus' (nombre demandé)
+    """
+    processus = processus or os.cpu_count() or 1
+    return {
+        'moteur': _meilleure_duree(lambda: _moteur_seul(sites, date), repetitions),
+        'un_processus': _meilleure_duree(lambda: simuler_sites(sites, date, processus=1), repetitions),
+        'pool': _meilleure_duree(lambda: simuler_sites(sites, date, processus=processus), repetitions),
+        'processus': processus
+    }
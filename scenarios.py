@@ -0,0 +1,159 @@
+"""
+Comparaison de scénarios de conduite côte à côte.
+
+Les résultats intermédiaires sont partagés entre scénarios :
+
+- le flux des occupations truies ne dépend que du calendrier (intervalle,
+  bandes, date de saillie, jours avant saillie, horizon) et des durées
+  AS / G / M ; le flux produits, du calendrier et des durées PS / E ;
+- l'affectation d'un type de salle ne dépend que du flux dont il fait partie,
+  de son nombre de salles et du vide sanitaire.
+
+Deux scénarios qui ne diffèrent que par le nombre de salles d'Engraissement
+partagent donc les flux et les quatre autres affectations. Les résultats mis
+en cache sont partagés : ils ne doivent pas être modifiés.
+"""
+import heapq
+from functools import lru_cache
+
+from moteur import (
+    TYPES_SALLES,
+    Allocateur,
+    calculer_toutes_occupations_truies,
+    calculer_toutes_occupations_produits,
+    extraire_etats_salles,
+)
+
+# Types de salle de chaque flux et durées dont il dépend
+FLUX = {
+    'truies': (('AS', 'G', 'M'), calculer_toutes_occupations_truies),
+    'produits': (('PS', 'E'), calculer_toutes_occupations_produits)
+}
+
+FLUX_PAR_CODE = {code: flux for flux, (codes, _) in FLUX.items() for code in codes}
+
+PARAMETRES_CALENDRIER = ('intervalle_bandes', 'nb_bandes', 'date_saillie_b1', 'jours_avant_saillie', 'date_horizon')
+
+# ============================================================================
+# RÉSULTATS INTERMÉDIAIRES PARTAGÉS
+# ============================================================================
+
+def cle_flux(params, flux):
+    """Paramètres dont dépend un flux d'occupations (clé hashable)"""
+    codes, _ = FLUX[flux]
+    return (flux,) + tuple(params[nom] for nom in PARAMETRES_CALENDRIER) + tuple(params['durees'][c] for c in codes)
+
+@lru_cache(maxsize=64)
+def _flux_en_cache(cle):
+    flux = cle[0]
+    codes, generer = FLUX[flux]
+    params = dict(zip(PARAMETRES_CALENDRIER, cle[1:1 + len(PARAMETRES_CALENDRIER)]))
+    params['durees'] = dict(zip(codes, cle[1 + len(PARAMETRES_CALENDRIER):]))
+    return generer(params)
+
+@lru_cache(maxsize=256)
+def _affectation_en_cache(cle, code, nb_salles, vide_sanitaire):
+    type_salle = TYPES_SALLES[code]
+    allocateur = Allocateur({type_salle: nb_salles}, vide_sanitaire)
+    occupations = [occ for occ in _flux_en_cache(cle) if occ['type_salle'] == type_salle]
+    for occ in sorted(occupations, key=lambda x: x['date_entree']):
+        allocateur.affecter(occ)
+    return {
+        'salles': allocateur.salles[type_salle],
+        'conflits': allocateur.conflits,
+        'sur_dim': allocateur.sur_dim,
+        'date_regime': allocateur.dates_regime_croisiere.get(type_salle)
+    }
+
+def statistiques_cache():
+    """Flux générés et affectations calculées depuis le démarrage (succès du cache compris)"""
+    flux = _flux_en_cache.cache_info()
+    affectations = _affectation_en_cache.cache_info()
+    return {
+        'flux_generes': flux.misses,
+        'flux_reutilises': flux.hits,
+        'affectations_calculees': affectations.misses,
+        'affectations_reutilisees': affectations.hits
+    }
+
+def planning_scenario(params):
+    """
+    Planning d'un scénario assemblé à partir des résultats partagés.
+
+    Returns:
+        dict au format de moteur.calculer_planning (conflits et surdimensionnements
+        triés par date, types de salle dans l'ordre de TYPES_SALLES à date égale)
+    """
+    cles = {flux: cle_flux(params, flux) for flux in FLUX}
+    parties = {
+        code: _affectation_en_cache(cles[FLUX_PAR_CODE[code]], code,
+                                    params['nb_salles'][code], params['vide_sanitaire'])
+        for code in TYPES_SALLES
+    }
+
+    return {
+        'occupations': _flux_en_cache(cles['truies']) + _flux_en_cache(cles['produits']),
+        'salles_disponibilite': {TYPES_SALLES[code]: partie['salles'] for code, partie in parties.items()},
+        'conflits': list(heapq.merge(*(p['conflits'] for p in parties.values()), key=lambda c: c['date_entree'])),
+        'sur_dim': list(heapq.merge(*(p['sur_dim'] for p in parties.values()), key=lambda s: s['date'])),
+        'dates_regime': {
+            TYPES_SALLES[code]: partie['date_regime']
+            for code, partie in parties.items() if partie['date_regime'] is not None
+        }
+    }
+
+# ============================================================================
+# COMPARAISON
+# ============================================================================
+
+STATUTS = ('occupée', 'vide_sanitaire', 'disponible', 'hors_service', 'jamais_utilisee')
+
+def indicateurs_scenario(params, planning, etats):
+    """Indicateurs clés d'un scénario (comparables par différence)"""
+    statuts = [etat['statut'] for etats_type in etats.values() for etat in etats_type]
+    total_salles = sum(params['nb_salles'].values())
+    return {
+        'total_salles': total_salles,
+        'conflits': len(planning['conflits']),
+        'jours_chevauchement': sum(c['jours_chevauchement'] for c in planning['conflits']),
+        'sur_dimensionnements': len(planning['sur_dim']),
+        'salles_occupees': statuts.count('occupée'),
+        'taux_occupation': statuts.count('occupée') / total_salles if total_salles else 0,
+        'cycle_truies': params['durees']['AS'] + params['durees']['G'] + params['durees']['M'],
+        'circuit_produits': params['durees']['PS'] + params['durees']['E']
+    }
+
+def comparer_scenarios(scenarios, date):
+    """
+    Compare des scénarios à une même date.
+
+    Args:
+        scenarios: liste de (nom, params) ; le premier sert de référence pour les écarts
+
+    Returns:
+        liste de dicts {'nom', 'params', 'planning', 'etats', 'indicateurs', 'ecarts'}
+    """
+    resultats = []
+    for nom, params in scenarios:
+        planning = planning_scenario(params)
+        etats = extraire_etats_salles(planning['salles_disponibilite'], date)
+        resultats.append({
+            'nom': nom,
+            'params': params,
+            'planning': planning,
+            'etats': etats,
+            'indicateurs': indicateurs_scenario(params, planning, etats)
+        })
+
+    if resultats:
+        reference = resultats[0]['indicateurs']
+        for resultat in resultats:
+            resultat['ecarts'] = {cle: valeur - reference[cle] for cle, valeur in resultat['indicateurs'].items()}
+    return resultats
+
+def resume_etats(etats):
+    """Nombre de salles par statut, pour chaque type de salle"""
+    return {
+        type_salle: {statut: sum(1 for e in etats_type if e['statut'] == statut) for statut in STATUTS}
+        for type_salle, etats_type in etats.items()
+    }
@@ -0,0 +1,321 @@
+"""
+Simulation Monte-Carlo de la variabilité des durées (robustesse du dimensionnement).
+
+    python cli.py robustesse --intervalle 21 --vide 5 --repliques 5000
+    python cli.py robustesse --variabilite G=normale:2 --variabilite E=uniforme:7
+
+Pour chaque bande et chaque cycle, la durée de chaque stade est tirée autour de
+la durée de conduite (loi et écart configurables par type de salle). Un stade
+décale les suivants : une gestation plus longue retarde l'entrée en Maternité,
+le sevrage décale l'entrée en Post-Sevrage, etc. Les salles sont ensuite
+affectées avec la règle du moteur (salle libérée le plus tôt) pour chaque
+nombre de salles testé.
+
+Les tirages sont vectorisés (numpy, tableaux répliques × occupations) et
+l'affectation traite toutes les répliques d'un lot à la fois, occupation par
+occupation. Les lots sont répartis sur un pool de processus ; leur découpage
+ne dépend pas du nombre de processus, le résultat ne dépend que de la graine.
+"""
+import math
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from moteur import TYPES_SALLES, calculer_toutes_occupations
+
+LOIS = ('fixe', 'normale', 'uniforme', 'triangulaire')
+
+# Code -> (loi, écart en jours) : écart-type pour 'normale', demi-largeur sinon
+DISTRIBUTIONS_DEFAUT = {
+    'AS': ('fixe', 0),
+    'G': ('normale', 1.5),
+    'M': ('normale', 1.5),
+    'PS': ('fixe', 0),
+    'E': ('normale', 5)
+}
+
+NB_REPLIQUES_DEFAUT = 2000
+REPLIQUES_PAR_LOT = 500
+
+# Nombres de salles testés autour de la configuration : n-1 ... n+2
+ECART_SALLES = (-1, 2)
+
+# Libération initiale des salles (jour relatif à la saillie de la bande 1)
+JOUR_INITIAL = -10 ** 6
+
+# ============================================================================
+# DISTRIBUTIONS
+# ============================================================================
+
+def lire_distribution(texte):
+    """Lit une spécification 'CODE=LOI:ECART' (ex. 'G=normale:2') -> (code, (loi, ecart))"""
+    code, _, spec = texte.partition('=')
+    loi, _, ecart = spec.partition(':')
+    code = code.strip().upper()
+    if code not in TYPES_SALLES:
+        raise ValueError(f"Type de salle inconnu : {code} (attendu : {', '.join(TYPES_SALLES)})")
+    if loi not in LOIS:
+        raise ValueError(f"Loi inconnue : {loi} (attendu : {', '.join(LOIS)})")
+    try:
+        ecart = float(ecart or 0)
+    except ValueError:
+        raise ValueError(f"Écart invalide : {ecart}")
+    if ecart < 0:
+        raise ValueError("L'écart doit être positif")
+    return code, (loi, ecart)
+
+def _tirer_ecarts(rng, loi, ecart, forme, duree):
+    """Écarts entiers (jours) à la durée de conduite, bornés pour garder une durée d'au moins 1 jour"""
+    np = _numpy()
+    if loi == 'fixe' or ecart == 0:
+        return np.zeros(forme, dtype=np.int64)
+    if loi == 'normale':
+        ecarts = np.rint(rng.normal(0.0, ecart, forme))
+    elif loi == 'uniforme':
+        ecarts = rng.integers(-int(ecart), int(ecart) + 1, forme)
+    else:
+        ecarts = np.rint(rng.triangular(-ecart, 0.0, ecart, forme))
+    return np.maximum(ecarts.astype(np.int64), 1 - duree)
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise RuntimeError("La simulation Monte-Carlo nécessite numpy (pip install numpy)") from exc
+    return numpy
+
+# ============================================================================
+# STRUCTURE DES OCCUPATIONS
+# ============================================================================
+
+def structure_occupations(params):
+    """
+    Occupations planifiées en jours entiers relatifs à la saillie de la bande 1.
+
+    Returns:
+        dict code -> {'entrees': [...], 'cycles': [...]} dans l'ordre de
+        calculer_toutes_occupations, où 'cycles' donne, pour les produits,
+        l'indice du cycle truie (bande, cycle) dont ils sont issus
+    """
+    origine = params['date_saillie_b1']
+    code_par_nom = {nom: code for code, nom in TYPES_SALLES.items()}
+    structure = {code: {'entrees': [], 'cycles': []} for code in TYPES_SALLES}
+    indice_truie = {}
+
+    for occ in calculer_toutes_occupations(params):
+        code = code_par_nom[occ['type_salle']]
+        cle = (occ['bande'], occ['cycle'])
+        if code == 'AS':
+            indice_truie[cle] = len(indice_truie)
+        structure[code]['entrees'].append((occ['date_entree'] - origine).days)
+        structure[code]['cycles'].append(indice_truie[cle])
+
+    return structure
+
+def tirer_occupations(rng, structure, params, distributions, nb_repliques):
+    """
+    Tire les dates d'entrée et de sortie de chaque occupation pour nb_repliques répliques.
+
+    Returns:
+        dict code -> (entrees, sorties), tableaux (nb_repliques, nb_occupations)
+    """
+    np = _numpy()
+    durees = params['durees']
+    nb_truies = len(structure['AS']['entrees'])
+
+    def ecarts(code, nb):
+        loi, ecart = distributions.get(code, ('fixe', 0))
+        return _tirer_ecarts(rng, loi, ecart, (nb_repliques, nb), durees[code])
+
+    # Truies : AS -> G -> M, chaque stade commence à la sortie du précédent
+    entree_as = np.asarray(structure['AS']['entrees'], dtype=np.int64)
+    sortie_as = entree_as + durees['AS'] + ecarts('AS', nb_truies)
+    sortie_g = sortie_as + durees['G'] + ecarts('G', nb_truies)
+    sortie_m = sortie_g + durees['M'] + ecarts('M', nb_truies)
+
+    tirages = {
+        'AS': (np.broadcast_to(entree_as, sortie_as.shape), sortie_as),
+        'G': (sortie_as, sortie_g),
+        'M': (sortie_g, sortie_m)
+    }
+
+    # Produits : le sevrage réel décale l'entrée en Post-Sevrage prévue
+    cycles = np.asarray(structure['PS']['cycles'], dtype=np.int64)
+    nb_produits = len(cycles)
+    decalage_sevrage = sortie_m[:, cycles] - (entree_as[cycles] + durees['AS'] + durees['G'] + durees['M'])
+    entree_ps = np.asarray(structure['PS']['entrees'], dtype=np.int64) + decalage_sevrage
+    sortie_ps = entree_ps + durees['PS'] + ecarts('PS', nb_produits)
+    sortie_e = sortie_ps + durees['E'] + ecarts('E', nb_produits)
+
+    tirages['PS'] = (entree_ps, sortie_ps)
+    tirages['E'] = (sortie_ps, sortie_e)
+    return tirages
+
+# ============================================================================
+# AFFECTATION VECTORISÉE
+# ============================================================================
+
+def affecter_repliques(entrees, sorties, nb_salles, vide_sanitaire):
+    """
+    Affecte les occupations d'un type de salle pour toutes les répliques à la fois.
+
+    Même règle que moteur.Allocateur : salle libérée le plus tôt, à égalité le plus
+    petit numéro, occupations prises par date d'entrée (ordre stable).
+
+    Returns:
+        tuple (nb_conflits par réplique, vides) où vides liste l'écart en jours
+        entre la sortie précédente et l'entrée, pour chaque réutilisation de salle
+    """
+    np = _numpy()
+    nb_repliques, nb_occupations = entrees.shape
+    ordre = np.argsort(entrees, axis=1, kind='stable')
+    entrees = np.take_along_axis(entrees, ordre, axis=1)
+    sorties = np.take_along_axis(sorties, ordre, axis=1)
+
+    liberation = np.full((nb_repliques, nb_salles), JOUR_INITIAL, dtype=np.int64)
+    derniere_sortie = np.full((nb_repliques, nb_salles), JOUR_INITIAL, dtype=np.int64)
+    lignes = np.arange(nb_repliques)
+    nb_conflits = np.zeros(nb_repliques, dtype=np.int64)
+    vides = []
+
+    for k in range(nb_occupations):
+        salle = liberation.argmin(axis=1)
+        entree = entrees[:, k]
+        nb_conflits += liberation[lignes, salle] > entree
+
+        precedente = derniere_sortie[lignes, salle]
+        reutilisee = precedente != JOUR_INITIAL
+        vides.append((entree - precedente)[reutilisee])
+
+        liberation[lignes, salle] = sorties[:, k] + vide_sanitaire
+        derniere_sortie[lignes, salle] = sorties[:, k]
+
+    vides = np.concatenate(vides) if vides else np.zeros(0, dtype=np.int64)
+    return nb_conflits, vides
+
+def nb_salles_testes(params, ecart_salles=ECART_SALLES):
+    """Nombres de salles simulés par code, autour de la configuration"""
+    bas, haut = ecart_salles
+    return {
+        code: list(range(max(1, nb + bas), nb + haut + 1))
+        for code, nb in params['nb_salles'].items()
+    }
+
+def _simuler_lot(params, structure, distributions, salles_testees, nb_repliques, graine):
+    """Un lot de répliques (exécuté dans un processus du pool)"""
+    np = _numpy()
+    rng = np.random.default_rng(graine)
+    tirages = tirer_occupations(rng, structure, params, distributions, nb_repliques)
+
+    resultat = {'par_type': {}, 'nb_repliques_en_conflit': 0}
+    conflit_configuration = np.zeros(nb_repliques, dtype=bool)
+
+    for code, (entrees, sorties) in tirages.items():
+        resultat['par_type'][code] = {}
+        for nb in salles_testees[code]:
+            nb_conflits, vides = affecter_repliques(entrees, sorties, nb, params['vide_sanitaire'])
+            valeurs, effectifs = np.unique(vides, return_counts=True)
+            resultat['par_type'][code][nb] = {
+                'repliques_en_conflit': int((nb_conflits > 0).sum()),
+                'conflits': int(nb_conflits.sum()),
+                'vides': Counter(dict(zip(valeurs.tolist(), effectifs.tolist())))
+            }
+            if nb == params['nb_salles'][code]:
+                conflit_configuration |= nb_conflits > 0
+
+    resultat['nb_repliques_en_conflit'] = int(conflit_configuration.sum())
+    return resultat
+
+# ============================================================================
+# POINT D'ENTRÉE
+# ============================================================================
+
+def _quantile(histogramme, total, q):
+    """Quantile d'une distribution donnée par un histogramme {valeur: effectif}"""
+    rang = q * (total - 1)
+    cumul = 0
+    for valeur in sorted(histogramme):
+        cumul += histogramme[valeur]
+        if cumul > rang:
+            return valeur
+    return None
+
+def resumer_vides(histogramme, vide_sanitaire):
+    """Statistiques de la distribution des vides (jours entre deux bandes dans une salle)"""
+    total = sum(histogramme.values())
+    if total == 0:
+        return {'nb': 0, 'min': None, 'p05': None, 'mediane': None, 'p95': None, 'max': None,
+                'moyenne': None, 'part_sous_vide_sanitaire': None, 'histogramme': {}}
+    return {
+        'nb': total,
+        'min': min(histogramme),
+        'p05': _quantile(histogramme, total, 0.05),
+        'mediane': _quantile(histogramme, total, 0.5),
+        'p95': _quantile(histogramme, total, 0.95),
+        'max': max(histogramme),
+        'moyenne': sum(v * n for v, n in histogramme.items()) / total,
+        'part_sous_vide_sanitaire': sum(n for v, n in histogramme.items() if v < vide_sanitaire) / total,
+        'histogramme': dict(sorted(histogramme.items()))
+    }
+
+def simuler_robustesse(params, distributions=None, nb_repliques=NB_REPLIQUES_DEFAUT,
+                       graine=0, processus=None, ecart_salles=ECART_SALLES):
+    """
+    Simule nb_repliques conduites aux durées aléatoires.
+
+    Args:
+        distributions: code -> (loi, écart) ; complète DISTRIBUTIONS_DEFAUT
+        processus: nombre de processus (défaut : nombre de cœurs ; 1 = sans pool)
+
+    Returns:
+        dict avec 'nb_repliques', 'p_conflit_configuration' (au moins un conflit,
+        tous types confondus, avec la configuration) et 'par_type' :
+        code -> nb_salles -> {'p_conflit', 'conflits_moyens', 'vides'}
+    """
+    if nb_repliques < 1:
+        raise ValueError(f"Nombre de répliques invalide : {nb_repliques} (au moins 1)")
+    np = _numpy()
+    distributions = dict(DISTRIBUTIONS_DEFAUT, **(distributions or {}))
+    structure = structure_occupations(params)
+    salles_testees = nb_salles_testes(params, ecart_salles)
+
+    nb_lots = math.ceil(nb_repliques / REPLIQUES_PAR_LOT)
+    graines = np.random.SeedSequence(graine).spawn(nb_lots)
+    tailles = [min(REPLIQUES_PAR_LOT, nb_repliques - i * REPLIQUES_PAR_LOT) for i in range(nb_lots)]
+    arguments = [
+        (params, structure, distributions, salles_testees, taille, graine_lot)
+        for taille, graine_lot in zip(tailles, graines)
+    ]
+
+    processus = min(processus or os.cpu_count() or 1, nb_lots)
+    if processus <= 1:
+        lots = [_simuler_lot(*args) for args in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=processus) as pool:
+            lots = list(pool.map(_simuler_lot, *zip(*arguments)))
+
+    par_type = {}
+    for code, nombres in salles_testees.items():
+        par_type[code] = {}
+        for nb in nombres:
+            vides = Counter()
+            repliques_en_conflit = conflits = 0
+            for lot in lots:
+                stats = lot['par_type'][code][nb]
+                repliques_en_conflit += stats['repliques_en_conflit']
+                conflits += stats['conflits']
+                vides.update(stats['vides'])
+            par_type[code][nb] = {
+                'p_conflit': repliques_en_conflit / nb_repliques,
+                'conflits_moyens': conflits / nb_repliques,
+                'vides': resumer_vides(vides, params['vide_sanitaire'])
+            }
+
+    return {
+        'nb_repliques': nb_repliques,
+        'graine': graine,
+        'distributions': distributions,
+        'nb_salles_configuration': dict(params['nb_salles']),
+        'p_conflit_configuration': sum(lot['nb_repliques_en_conflit'] for lot in lots) / nb_repliques,
+        'par_type': par_type
+    }
@@ -0,0 +1,307 @@
+"""
+Table précalculée des configurations standard (lecture par projection mémoire).
+
+Les configurations standard sont les 5 intervalles de INTERVALLES_POSSIBLES
+croisés avec les vides sanitaires de 3 à 7 jours, au dimensionnement optimal
+(durées et nombres de salles de calculer_dimensionnement). L'affectation ne
+dépend ni de la date de saillie de la Bande 1 (tout est décalé d'autant), ni
+de l'horizon (il ne fait que tronquer la fin du planning) : elle se ramène à
+une table salle = f(type de salle, bande, cycle).
+
+Pour chaque type de salle, les cycles se répètent à partir d'un certain rang
+avec une période de quelques cycles : seuls les cycles de démarrage et une
+période sont stockés. Le fichier est produit par construire_table_standard.py ;
+s'il est absent, le moteur calcule l'affectation normalement.
+
+À la lecture, occupations et historiques sont construits directement à partir
+des lignes de la table, type de salle par type de salle : dans une
+configuration standard, les bandes d'un cycle entrent toutes avant la
+bande 1 du cycle suivant ((nb_bandes - 1) x intervalle < 147 jours), donc
+l'ordre (cycle, bande) est l'ordre des dates. Ni génération séparée des
+occupations, ni tri, ni rejeu de l'affectation.
+
+Format (little-endian) :
+
+    entête      : 'PIGT', version (u16), nombre de configurations (u16)
+    répertoire  : par configuration, intervalle, vide, nb de bandes (u8),
+                  durées (5 x u16), nombres de salles (5 x u8), position (u32)
+    blocs       : par configuration et par type de salle (ordre de TYPES_SALLES),
+                  cycles de démarrage, période, bande et cycle du régime de
+                  croisière (u8, 255 si jamais atteint), puis une ligne par
+                  cycle stocké : pour chaque bande, salle (u8) et nombre de
+                  salles vides si surdimensionnement (u8, 0 sinon)
+"""
+import mmap
+import os
+import struct
+from datetime import timedelta
+
+from moteur import (
+    CYCLE_TRUIE_ATTENDU,
+    INTERVALLES_POSSIBLES,
+    NB_CYCLES_MAX,
+    TYPES_SALLES,
+    DATE_LIBERATION_INITIALE,
+    calculer_dimensionnement,
+)
+
+CHEMIN_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'table_standard.bin')
+
+SIGNATURE = b'PIGT'
+VERSION = 1
+VIDES_STANDARD = range(3, 8)
+
+ENTETE = struct.Struct('<4sHH')
+ENTREE = struct.Struct('<BBB5H5BI')
+BLOC = struct.Struct('<BBBB')
+AUCUN = 255
+
+# Ordre de génération des occupations du moteur (ordre à date d'entrée égale)
+TYPES_TRUIES = ('AS', 'G', 'M')
+TYPES_PRODUITS = ('PS', 'E')
+
+# ============================================================================
+# LECTURE
+# ============================================================================
+
+class TableStandard:
+    """Table projetée en mémoire ; les blocs d'une configuration sont localisés à la première lecture"""
+
+    def __init__(self, chemin=CHEMIN_TABLE):
+        with open(chemin, 'rb') as fichier:
+            self._mm = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+
+        signature, version, nb_configurations = ENTETE.unpack_from(self._mm, 0)
+        if signature != SIGNATURE or version != VERSION:
+            raise ValueError(f"{chemin} : table de version inconnue (attendu : {VERSION})")
+
+        self.repertoire = {}
+        for i in range(nb_configurations):
+            intervalle, vide, nb_bandes, *valeurs, position = ENTREE.unpack_from(self._mm, ENTETE.size + i * ENTREE.size)
+            self.repertoire[(intervalle, vide)] = {
+                'nb_bandes': nb_bandes,
+                'durees': dict(zip(TYPES_SALLES, valeurs[:5])),
+                'nb_salles': dict(zip(TYPES_SALLES, valeurs[5:])),
+                'position': position
+            }
+        self._blocs = {}
+
+    def configuration(self, params):
+        """Entrée du répertoire si params est une configuration standard, sinon None"""
+        config = self.repertoire.get((params['intervalle_bandes'], params['vide_sanitaire']))
+        if (config is None or params['nb_bandes'] != config['nb_bandes']
+                or params['durees'] != config['durees'] or params['nb_salles'] != config['nb_salles']
+                or (config['nb_bandes'] - 1) * params['intervalle_bandes'] >= CYCLE_TRUIE_ATTENDU):
+            return None
+        return config
+
+    def blocs(self, config):
+        """type_salle -> (position des lignes, cycles de démarrage, période, (bande, cycle) du régime)"""
+        cle = (config['position'], config['nb_bandes'])
+        if cle not in self._blocs:
+            blocs = {}
+            position = config['position']
+            for type_salle in TYPES_SALLES.values():
+                demarrage, periode, bande_regime, cycle_regime = BLOC.unpack_from(self._mm, position)
+                position += BLOC.size
+                regime = None if bande_regime == AUCUN else (bande_regime, cycle_regime)
+                blocs[type_salle] = (position, demarrage, periode, regime)
+                position += (demarrage + periode) * config['nb_bandes'] * 2
+            self._blocs[cle] = blocs
+        return self._blocs[cle]
+
+    def planning(self, params):
+        """
+        Occupations et affectation lues dans la table, au format de
+        moteur.calculer_planning (None si la configuration n'est pas standard).
+        """
+        config = self.configuration(params)
+        if config is None:
+            return None
+
+        blocs = self.blocs(config)
+        nb_bandes = config['nb_bandes']
+        durees = params['durees']
+        mm = self._mm
+        delta_vide = timedelta(days=params['vide_sanitaire'])
+        pas_cycle = timedelta(days=CYCLE_TRUIE_ATTENDU)
+        avant_saillie = timedelta(days=params['jours_avant_saillie'])
+        decalages_bandes = [timedelta(days=b * params['intervalle_bandes']) for b in range(nb_bandes)]
+
+        occupations = []
+        salles_disponibilite = {}
+        conflits = []
+        sur_dim = []
+        dates_regime = {}
+
+        for code, type_salle in TYPES_SALLES.items():
+            # Même arithmétique que les générateurs du moteur : date d'entrée de la
+            # bande 1 au cycle 0, et fin de la génération (saillie ou sevrage après l'horizon)
+            famille = 0 if code in TYPES_TRUIES else 1
+            suite = TYPES_PRODUITS if famille else TYPES_TRUIES
+            rang = suite.index(code)
+            decalage = timedelta(days=sum(durees[c] for c in suite[:rang]))
+            if famille:
+                premiere = params['date_saillie_b1'] - avant_saillie + pas_cycle + decalage
+            else:
+                decalage -= avant_saillie
+                premiere = params['date_saillie_b1'] + decalage
+            limite = params['date_horizon'] + decalage
+            lettre = 'S' if famille else 'C'
+            duree = durees[code]
+            delta_duree = timedelta(days=duree)
+            position, demarrage, periode, regime = blocs[type_salle]
+
+            salles = [
+                {'num_salle': i, 'date_liberation': DATE_LIBERATION_INITIALE, 'historique': [], 'premiere_utilisation': None}
+                for i in range(config['nb_salles'][code])
+            ]
+            salles_disponibilite[type_salle] = salles
+
+            for cycle in range(NB_CYCLES_MAX):
+                debut_cycle = premiere + cycle * pas_cycle
+                if debut_cycle > limite:
+                    break
+                ligne = cycle if cycle < demarrage + periode else demarrage + (cycle - demarrage) % periode
+                cellule = position + 2 * nb_bandes * ligne
+
+                for b, decalage_bande in enumerate(decalages_bandes):
+                    date_entree = debut_cycle + decalage_bande
+                    if date_entree > limite:
+                        break
+                    bande = b + 1
+                    date_sortie = date_entree + delta_duree
+                    id_unique = f"B{bande}_{lettre}{cycle}_{code}"
+                    occ = {
+                        'bande': bande,
+                        'cycle': cycle,
+                        'type_salle': type_salle,
+                        'date_entree': date_entree,
+                        'date_sortie': date_sortie,
+                        'duree_totale': duree,
+                        'id_unique': id_unique
+                    }
+                    if famille:
+                        occ['date_sevrage'] = date_entree - decalage
+                    elif code == 'M':
+                        occ['date_sevrage'] = date_sortie
+                    occupations.append(occ)
+
+                    # Clé de l'ordre d'affectation du moteur (date, puis ordre de génération)
+                    ordre = (date_entree, famille, bande, cycle, rang)
+                    salle = salles[mm[cellule + 2 * b]]
+                    if salle['date_liberation'] > date_entree:
+                        conflits.append((ordre, {
+                            'type_salle': type_salle,
+                            'bande': bande,
+                            'date_entree': date_entree,
+                            'id': id_unique,
+                            'salle': salle['num_salle'] + 1,
+                            'date_liberation_salle': salle['date_liberation'],
+                            'jours_chevauchement': (salle['date_liberation'] - date_entree).days
+                        }))
+                    elif mm[cellule + 2 * b + 1]:
+                        sur_dim.append((ordre, {
+                            'type_salle': type_salle,
+                            'nb_vides': mm[cellule + 2 * b + 1],
+                            'date': date_entree,
+                            'en_regime_croisiere': True
+                        }))
+
+                    if regime == (bande, cycle):
+                        dates_regime[type_salle] = date_entree
+
+                    if salle['premiere_utilisation'] is None:
+                        salle['premiere_utilisation'] = date_entree
+                    salle['date_liberation'] = date_sortie + delta_vide
+                    salle['historique'].append({
+                        'id_unique': id_unique,
+                        'date_entree': date_entree,
+                        'date_sortie': date_sortie,
+                        'date_liberation': salle['date_liberation'],
+                        'bande': bande,
+                        'cycle': cycle,
+                        'duree_totale': duree
+                    })
+
+        conflits.sort(key=lambda c: c[0])
+        sur_dim.sort(key=lambda s: s[0])
+        return {
+            'occupations': occupations,
+            'salles_disponibilite': salles_disponibilite,
+            'conflits': [c for _, c in conflits],
+            'sur_dim': [s for _, s in sur_dim],
+            'dates_regime': dates_regime
+        }
+
+_table = None
+
+def table_standard():
+    """Table du dépôt, ouverte au premier appel (None si le fichier n'a pas été construit)"""
+    global _table
+    if _table is None and os.path.exists(CHEMIN_TABLE):
+        _table = TableStandard(CHEMIN_TABLE)
+    return _table
+
+def planning_precalcule(params):
+    """Planning lu dans la table précalculée, ou None (configuration non standard, table absente)"""
+    table = table_standard()
+    if table is None:
+        return None
+    return table.planning(params)
+
+# ============================================================================
+# ÉCRITURE (construire_table_standard.py)
+# ============================================================================
+
+def configurations_standard():
+    """(intervalle, vide, nb_bandes, durées, nombres de salles) de chaque configuration standard"""
+    for intervalle_bandes in INTERVALLES_POSSIBLES:
+        for vide_sanitaire in VIDES_STANDARD:
+            nb_bandes, nb_optimal, durees_optimales, _ = calculer_dimensionnement(intervalle_bandes, vide_sanitaire)
+            durees = {code: int(duree) for code, duree in durees_optimales.items()}
+            yield intervalle_bandes, vide_sanitaire, nb_bandes, durees, nb_optimal
+
+def periode_lignes(lignes):
+    """
+    Plus petit (démarrage, période) tel que toute ligne c se retrouve en
+    démarrage + (c - démarrage) % période.
+    """
+    nb = len(lignes)
+    for longueur in range(1, nb + 1):
+        for demarrage in range(longueur):
+            periode = longueur - demarrage
+            if all(lignes[c] == lignes[demarrage + (c - demarrage) % periode] for c in range(longueur, nb)):
+                return demarrage, periode
+    return nb, 0
+
+def ecrire_table(chemin, configurations):
+    """
+    Écrit la table.
+
+    Args:
+        configurations: liste de (intervalle, vide, nb_bandes, durees, nb_salles, blocs),
+            blocs étant par type de salle (démarrage, période, regime, lignes) avec
+            lignes = bytes de chaque cycle stocké
+    """
+    repertoire = bytearray()
+    donnees = bytearray()
+    debut_donnees = ENTETE.size + len(configurations) * ENTREE.size
+
+    for intervalle_bandes, vide_sanitaire, nb_bandes, durees, nb_salles, blocs in configurations:
+        repertoire += ENTREE.pack(
+            intervalle_bandes, vide_sanitaire, nb_bandes,
+            *(durees[code] for code in TYPES_SALLES), *(nb_salles[code] for code in TYPES_SALLES),
+            debut_donnees + len(donnees)
+        )
+        for type_salle in TYPES_SALLES.values():
+            demarrage, periode, regime, lignes = blocs[type_salle]
+            bande_regime, cycle_regime = regime if regime is not None else (AUCUN, AUCUN)
+            donnees += BLOC.pack(demarrage, periode, bande_regime, cycle_regime)
+            for ligne in lignes[:demarrage + periode]:
+                donnees += ligne
+
+    with open(chemin, 'wb') as fichier:
+        fichier.write(ENTETE.pack(SIGNATURE, VERSION, len(configurations)))
+        fichier.write(repertoire)
+        fichier.write(donnees)
@@ -0,0 +1,14 @@
+"""
+Vérification différentielle des moteurs optimisés (graine fixe, pour l'intégration continue).
+
+    python -m pytest -q test_verification.py
+"""
+from verification import MOTEURS, verifier
+
+NB_CAS = 300
+GRAINE = 0
+
+def test_moteurs_identiques_a_la_reference():
+    resultat = verifier(NB_CAS, graine=GRAINE, processus=1)
+    assert resultat['moteurs'] == list(MOTEURS)
+    assert not resultat['echecs'], resultat['minimal']
@@ -0,0 +1,396 @@
+"""
+Vérification par propriétés des moteurs d'affectation optimisés.
+
+Des configurations tirées au hasard (intervalle, vide, durées, nombres de
+salles, date de saillie, horizon) passent dans l'implémentation de référence
+(moteur.affecter_salles) et dans chaque moteur optimisé ; les affectations
+(historique de chaque salle), conflits, surdimensionnements et dates de régime
+de croisière doivent être identiques.
+
+Le planning réconcilié reçoit en plus un journal d'événements aléatoire
+(entrées et sorties décalées, salles imposées, mises hors service), appliqué
+par étapes : il est comparé à une affectation complète, sans instantanés, des
+occupations corrigées par ce journal.
+
+Un cas en échec est réduit (horizon, salles, durées, vide... un paramètre à la
+fois tant que l'écart persiste) jusqu'à une configuration minimale, donnée
+sous forme de ligne de commande reproductible.
+
+    python cli.py verifier --cas 20000 --processus 4
+"""
+import os
+import random
+from datetime import timedelta
+
+from moteur import (
+    DATE_LIBERATION_INITIALE,
+    DATE_SAILLIE_B1_DEFAUT,
+    INTERVALLES_POSSIBLES,
+    TYPES_SALLES,
+    Allocateur,
+    calculer_dimensionnement,
+    parametres_conduite,
+    salles_config_depuis,
+    calculer_toutes_occupations,
+    calculer_planning,
+    affecter_salles,
+    affecter_salles_indexe,
+)
+
+CHAMPS = ('affectations', 'conflits', 'sur_dim', 'dates_regime')
+
+# Cas par lot envoyé à un processus du pool, au moins (en deçà, le démarrage
+# du pool coûte plus que les cas : tout tourne dans le processus courant)
+CAS_PAR_LOT = 250
+
+# Évaluations au plus pendant la réduction d'un cas en échec
+ESSAIS_REDUCTION_MAX = 2000
+
+# Occupations affectées entre deux instantanés du planning réconcilié vérifié
+# (petit : les horizons courts passent aussi par la reprise sur instantané)
+PAS_INSTANTANE_VERIFIE = 8
+
+CODES = {nom: code for code, nom in TYPES_SALLES.items()}
+
+# ============================================================================
+# MOTEURS COMPARÉS
+# ============================================================================
+
+def _moteur_indexe(params, occupations, journal):
+    return affecter_salles_indexe(occupations, salles_config_depuis(params), params['vide_sanitaire'])
+
+def _moteur_table(params, occupations, journal):
+    from table_standard import planning_precalcule
+    planning = planning_precalcule(params)
+    if planning is None:
+        return None
+    return planning['salles_disponibilite'], planning['conflits'], planning['sur_dim'], planning['dates_regime']
+
+def _moteur_planning(params, occupations, journal):
+    planning = calculer_planning(params)
+    return planning['salles_disponibilite'], planning['conflits'], planning['sur_dim'], planning['dates_regime']
+
+def _moteur_scenarios(params, occupations, journal):
+    from scenarios import planning_scenario
+    planning = planning_scenario(params)
+    return planning['salles_disponibilite'], planning['conflits'], planning['sur_dim'], planning['dates_regime']
+
+def _moteur_reconcilie(params, occupations, journal):
+    """Journal appliqué en trois étapes (ajouts, retraits) : reprises sur instantané"""
+    from evenements import PlanningReconcilie
+    if not journal:
+        planning = PlanningReconcilie(params).planning()
+        return planning['salles_disponibilite'], planning['conflits'], planning['sur_dim'], planning['dates_regime']
+    moitie = len(journal) // 2
+    reconcilie = PlanningReconcilie(params, journal[:moitie], pas_instantane=PAS_INSTANTANE_VERIFIE)
+    reconcilie.mettre_a_jour(journal[moitie:])
+    reconcilie.mettre_a_jour(journal)
+    planning = reconcilie.planning()
+    return planning['salles_disponibilite'], planning['conflits'], planning['sur_dim'], planning['dates_regime']
+
+def _reference_reconciliee(params, occupations, journal):
+    """Affectation complète des occupations corrigées par le journal, sans instantanés"""
+    from evenements import fusionner_evenements
+    fusion = fusionner_evenements(occupations, journal, params['date_horizon'], params['nb_salles'])
+    allocateur = Allocateur(salles_config_depuis(params), params['vide_sanitaire'])
+    for occ in sorted(fusion, key=lambda x: (x['date_entree'], x['ordre'])):
+        allocateur.affecter(occ)
+    return allocateur.salles, allocateur.conflits, allocateur.sur_dim, allocateur.dates_regime_croisiere
+
+def _salles_depuis_historiques(historiques):
+    """Salles au format de moteur.affecter_salles, à partir de l'historique de chacune"""
+    return {
+        type_salle: [
+            {
+                'num_salle': num_salle,
+                'date_liberation': historique[-1]['date_liberation'] if historique else DATE_LIBERATION_INITIALE,
+                'historique': historique,
+                'premiere_utilisation': historique[0]['date_entree'] if historique else None
+            }
+            for num_salle, historique in enumerate(par_salle)
+        ]
+        for type_salle, par_salle in historiques.items()
+    }
+
+class _Enregistreur:
+    """Puits du mode glissant qui garde tout ce qui lui passe"""
+
+    def __init__(self, salles_config):
+        self.historiques = {type_salle: [[] for _ in range(nb)] for type_salle, nb in salles_config.items()}
+        self.conflits = []
+        self.sur_dim = []
+
+    def occupation(self, type_salle, num_salle, entree, vide_reel):
+        self.historiques[type_salle][num_salle].append(entree)
+
+    def conflit(self, conflit):
+        self.conflits.append(conflit)
+
+    def sur_dimensionnement(self, sur_dim):
+        self.sur_dim.append(sur_dim)
+
+def _moteur_glissant(params, occupations, journal):
+    from glissant import simuler_glissant
+    enregistreur = _Enregistreur(salles_config_depuis(params))
+    resultat = simuler_glissant(params, [enregistreur])
+    return (_salles_depuis_historiques(enregistreur.historiques), enregistreur.conflits,
+            enregistreur.sur_dim, resultat['dates_regime'])
+
+def _moteur_repartition(params, occupations, journal):
+    """Historiques reconstitués à partir des salles lues dans le tampon partagé"""
+    from repartition import simuler_sites
+    resultat = simuler_sites([(None, params)], params['date_saillie_b1'], processus=1)[0]
+    historiques = {type_salle: [[] for _ in range(nb)] for type_salle, nb in salles_config_depuis(params).items()}
+    delta_vide = timedelta(days=params['vide_sanitaire'])
+    for occ in sorted(occupations, key=lambda x: x['date_entree']):
+        salle = resultat['affectations'][occ['type_salle']][occ['bande'] - 1][occ['cycle']]
+        historiques[occ['type_salle']][salle - 1].append({
+            'id_unique': occ['id_unique'],
+            'date_entree': occ['date_entree'],
+            'date_sortie': occ['date_sortie'],
+            'date_liberation': occ['date_sortie'] + delta_vide,
+            'bande': occ['bande'],
+            'cycle': occ['cycle'],
+            'duree_totale': occ['duree_totale']
+        })
+    return _salles_depuis_historiques(historiques), resultat['conflits'], resultat['sur_dim'], resultat['dates_regime']
+
+# nom -> (fonction(params, occupations, journal), même ordre global des conflits et
+# surdimensionnements, référence(params, occupations, journal) ou None pour affecter_salles ;
+# sans journal, toute référence revient à affecter_salles, calculée une fois par cas)
+# Une fonction retourne None quand elle ne s'applique pas à la configuration.
+# scenarios fusionne les types de salle par date : l'ordre n'est garanti qu'au sein d'un type.
+MOTEURS = {
+    'indexe': (_moteur_indexe, True, None),
+    'table': (_moteur_table, True, None),
+    'planning': (_moteur_planning, True, None),
+    'scenarios': (_moteur_scenarios, False, None),
+    'reconcilie': (_moteur_reconcilie, True, _reference_reconciliee),
+    'glissant': (_moteur_glissant, True, None),
+    'repartition': (_moteur_repartition, True, None)
+}
+
+def _par_type(evenements):
+    return {type_salle: [e for e in evenements if e['type_salle'] == type_salle] for type_salle in TYPES_SALLES.values()}
+
+def _champs(resultat, ordre_global):
+    salles_disponibilite, conflits, sur_dim, dates_regime = resultat
+    if not ordre_global:
+        conflits, sur_dim = _par_type(conflits), _par_type(sur_dim)
+    return dict(zip(CHAMPS, (salles_disponibilite, conflits, sur_dim, dates_regime)))
+
+# ============================================================================
+# CONFIGURATIONS
+# ============================================================================
+
+def configuration_aleatoire(rng):
+    """
+    Configuration tirée au hasard (valeurs entières seulement, pour la réduction).
+
+    Un tiers des cas reprend une configuration standard (table précalculée) ;
+    les horizons courts sont favorisés : plus de cas par seconde, et les écarts
+    apparaissent en général dès les premiers cycles.
+    """
+    intervalle = rng.choice(INTERVALLES_POSSIBLES)
+    standard = rng.random() < 1 / 3
+    vide = rng.randint(3, 7) if standard else rng.randint(0, 10)
+    _, nb_optimal, durees_optimales, _ = calculer_dimensionnement(intervalle, vide)
+
+    if standard:
+        durees = {code: int(duree) for code, duree in durees_optimales.items()}
+        nb_salles = dict(nb_optimal)
+    else:
+        durees = {code: max(1, int(duree) + rng.randint(-8, 8)) for code, duree in durees_optimales.items()}
+        nb_salles = {code: max(1, nb + rng.randint(-2, 2)) for code, nb in nb_optimal.items()}
+
+    return {
+        'intervalle': intervalle,
+        'vide': vide,
+        'decalage': rng.randint(0, 730),
+        'jours_avant_saillie': rng.randint(0, 7),
+        'durees': durees,
+        'nb_salles': nb_salles,
+        'horizon': rng.randint(30, 500) if rng.random() < 0.8 else rng.randint(500, 2500),
+        'evenements': rng.randint(1, 12) if rng.random() < 0.5 else 0,
+        'graine_journal': rng.randrange(2 ** 32)
+    }
+
+def params_depuis_configuration(config):
+    date_saillie_b1 = DATE_SAILLIE_B1_DEFAUT + timedelta(days=config['decalage'])
+    return parametres_conduite(
+        config['intervalle'], config['vide'], date_saillie_b1,
+        jours_avant_saillie=config['jours_avant_saillie'],
+        durees=config['durees'], nb_salles=config['nb_salles'],
+        date_horizon=date_saillie_b1 + timedelta(days=config['horizon'])
+    )
+
+def journal_aleatoire(params, occupations, nb_evenements, graine):
+    """
+    Journal d'événements réels plausible : entrées et sorties décalées de
+    quelques jours (salle parfois imposée), mises hors service. Un événement
+    au plus par occupation, toujours cohérent (sortie après l'entrée).
+    """
+    rng = random.Random(graine)
+    evenements = []
+    for occ in rng.sample(occupations, min(nb_evenements, len(occupations))):
+        type_salle = occ['type_salle']
+        nb_salles = params['nb_salles'][CODES[type_salle]]
+        evenement = {'type_salle': type_salle, 'bande': occ['bande'], 'cycle': occ['cycle'],
+                     'salle': None, 'date_fin': None}
+        tirage = rng.random()
+        if tirage < 0.15:
+            date = occ['date_entree'] + timedelta(days=rng.randint(0, 30))
+            evenement.update(evenement='hors_service', date=date, bande=None, cycle=None,
+                             salle=rng.randint(1, nb_salles), date_fin=date + timedelta(days=rng.randint(0, 30)))
+        elif tirage < 0.6:
+            evenement.update(evenement='entree',
+                             date=min(occ['date_entree'] + timedelta(days=rng.randint(-3, 3)), occ['date_sortie']))
+            if rng.random() < 0.3:
+                evenement['salle'] = rng.randint(1, nb_salles)
+        else:
+            evenement.update(evenement='sortie',
+                             date=max(occ['date_sortie'] + timedelta(days=rng.randint(-5, 5)), occ['date_entree']))
+        evenements.append(evenement)
+    return evenements
+
+def ligne_de_commande(config):
+    """Commande diagnostic qui reproduit la configuration"""
+    date_saillie_b1 = DATE_SAILLIE_B1_DEFAUT + timedelta(days=config['decalage'])
+    options = [
+        f"--intervalle {config['intervalle']}",
+        f"--vide {config['vide']}",
+        f"--date-saillie {date_saillie_b1:%Y-%m-%d}",
+        f"--jours-avant-saillie {config['jours_avant_saillie']}",
+        f"--horizon {date_saillie_b1 + timedelta(days=config['horizon']):%Y-%m-%d}"
+    ]
+    for code in TYPES_SALLES:
+        options.append(f"--duree-{code.lower()} {config['durees'][code]}")
+        options.append(f"--nb-{code.lower()} {config['nb_salles'][code]}")
+    return "python cli.py diagnostic " + ' '.join(options)
+
+# ============================================================================
+# COMPARAISON ET RÉDUCTION
+# ============================================================================
+
+def ecarts_configuration(config, moteurs):
+    """Liste des (moteur, champ) qui diffèrent de la référence"""
+    params = params_depuis_configuration(config)
+    occupations = calculer_toutes_occupations(params)
+    journal = journal_aleatoire(params, occupations, config['evenements'], config['graine_journal'])
+    reference = affecter_salles(occupations, salles_config_depuis(params), params['vide_sanitaire'])
+
+    ecarts = []
+    for nom in moteurs:
+        fonction, ordre_global, fonction_reference = MOTEURS[nom]
+        resultat = fonction(params, occupations, journal)
+        if resultat is None:
+            continue
+        attendu = reference if fonction_reference is None or not journal else fonction_reference(params, occupations, journal)
+        attendu, obtenu = _champs(attendu, ordre_global), _champs(resultat, ordre_global)
+        ecarts.extend((nom, champ) for champ in CHAMPS if obtenu[champ] != attendu[champ])
+    return ecarts
+
+def simplifications(config):
+    """Configurations voisines plus simples, de la plus grande réduction à la plus petite"""
+    def variante(**changements):
+        return dict(config, **changements)
+
+    horizon = config['horizon']
+    for nouveau in (horizon // 2, horizon - 147, horizon - config['intervalle'], horizon - 1):
+        if 0 < nouveau < horizon:
+            yield variante(horizon=nouveau)
+
+    plus_grands = [i for i in INTERVALLES_POSSIBLES if i > config['intervalle']]
+    if plus_grands:
+        yield variante(intervalle=plus_grands[0])
+
+    for cle in ('evenements', 'decalage', 'jours_avant_saillie', 'vide'):
+        if config[cle] > 0:
+            yield variante(**{cle: 0})
+            yield variante(**{cle: config[cle] - 1})
+
+    for cle in ('nb_salles', 'durees'):
+        for code, valeur in config[cle].items():
+            for nouvelle in (1, valeur // 2, valeur - 1):
+                if 1 <= nouvelle < valeur:
+                    yield variante(**{cle: dict(config[cle], **{code: nouvelle})})
+
+def reduire(config, moteurs, essais_max=ESSAIS_REDUCTION_MAX):
+    """
+    Réduit une configuration en échec tant qu'une simplification échoue encore.
+
+    Returns:
+        tuple (configuration minimale, écarts, nombre d'essais)
+    """
+    ecarts = ecarts_configuration(config, moteurs)
+    essais = 1
+    progres = True
+    while progres and essais < essais_max:
+        progres = False
+        for candidate in simplifications(config):
+            essais += 1
+            ecarts_candidate = ecarts_configuration(candidate, moteurs)
+            if ecarts_candidate:
+                config, ecarts, progres = candidate, ecarts_candidate, True
+                break
+            if essais >= essais_max:
+                break
+    return config, ecarts, essais
+
+# ============================================================================
+# CAMPAGNE
+# ============================================================================
+
+def _verifier_lot(graine, debut, fin, moteurs):
+    """Cas debut..fin-1 (exécuté dans un processus du pool) ; retourne les cas en échec"""
+    echecs = []
+    for i in range(debut, fin):
+        config = configuration_aleatoire(random.Random(f"{graine}:{i}"))
+        ecarts = ecarts_configuration(config, moteurs)
+        if ecarts:
+            echecs.append((i, config, ecarts))
+    return echecs
+
+def verifier(nb_cas, graine=0, processus=None, moteurs=None):
+    """
+    Compare les moteurs à la référence sur nb_cas configurations aléatoires.
+
+    Le cas i ne dépend que de (graine, i) : un échec se rejoue quel que soit
+    le nombre de processus.
+
+    Returns:
+        dict avec 'nb_cas', 'moteurs', 'echecs' (liste de (i, configuration, écarts))
+        et 'minimal' (None, ou premier échec réduit : {'cas', 'configuration',
+        'ecarts', 'essais', 'commande', 'journal' (événements du planning réconcilié)})
+    """
+    moteurs = list(moteurs or MOTEURS)
+    processus = max(1, min(processus or os.cpu_count() or 1, nb_cas // CAS_PAR_LOT))
+    # Environ quatre lots par processus (équilibrage), chacun d'au moins CAS_PAR_LOT cas
+    taille_lot = max(CAS_PAR_LOT, -(-nb_cas // (4 * processus))) if processus > 1 else max(nb_cas, 1)
+    lots = [(graine, debut, min(debut + taille_lot, nb_cas), moteurs) for debut in range(0, nb_cas, taille_lot)]
+
+    if processus <= 1:
+        resultats = [_verifier_lot(*args) for args in lots]
+    else:
+        # Importé ici : cli.py importe MOTEURS au démarrage de chaque commande
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processus) as pool:
+            resultats = list(pool.map(_verifier_lot, *zip(*lots)))
+
+    echecs = [echec for lot in resultats for echec in lot]
+    minimal = None
+    if echecs:
+        i, config, _ = echecs[0]
+        config_minimale, ecarts, essais = reduire(config, moteurs)
+        params = params_depuis_configuration(config_minimale)
+        minimal = {
+            'cas': i,
+            'configuration': config_minimale,
+            'ecarts': ecarts,
+            'essais': essais,
+            'commande': ligne_de_commande(config_minimale),
+            'journal': journal_aleatoire(params, calculer_toutes_occupations(params),
+                                         config_minimale['evenements'], config_minimale['graine_journal'])
+        }
+
+    return {'nb_cas': nb_cas, 'moteurs': moteurs, 'echecs': echecs, 'minimal': minimal}